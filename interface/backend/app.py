@@ -1,43 +1,248 @@
-from flask import Flask, request, jsonify
+import math
+import time
+
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
-from models.predictor import predict_price
+from models.predictor import (predict_price, predict_batch, prediction_cache, registry,
+                              observe_single, observe_batch)
 from utils.constants import VILLES, CATEGORIES, TYPES_TRANSACTION
+from utils.market_stats import MarketStats
+from utils.metrics import metrics
+from utils.payload_log import PayloadRecorder
+from config import (BATCH_MAX_SIZE, MODEL_WATCH_INTERVAL,
+                    PAYLOAD_LOG_PATH, PAYLOAD_LOG_SAMPLE,
+                    DATASET_DIR, MARKET_STATS_PATH, MARKET_STATS_REFRESH_INTERVAL)
 
 app = Flask(__name__)
 CORS(app)
 
+# Enregistrement des requêtes de prédiction (rejeu par benchmarks/loadtest.py)
+payload_recorder = (PayloadRecorder(PAYLOAD_LOG_PATH, PAYLOAD_LOG_SAMPLE)
+                    if PAYLOAD_LOG_PATH else None)
+RECORDED_PATHS = {"/predict", "/predict/batch"}
+
+# Statistiques du marché: tables chargées au premier appel, puis complétées
+# avec les nouveaux segments du jeu
+market_stats = MarketStats(DATASET_DIR, MARKET_STATS_PATH)
+
+# Métriques HTTP (endpoint = règle Flask, pas l'URL brute: cardinalité bornée)
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    'http_request_duration_seconds', 'HTTP request duration', ('endpoint', 'method', 'status'))
+metrics.gauge('prediction_cache_entries', 'Entries in the prediction cache', (),
+              lambda: {(): prediction_cache.stats()['size']})
+metrics.gauge('prediction_cache_lookups', 'Prediction cache lookups by result', ('result',),
+              lambda: {(result,): prediction_cache.stats()[result]
+                       for result in ('hits', 'misses')})
+metrics.gauge('model_active', 'Active model version (value 1)', ('version',),
+              lambda: {(registry.active.version,): 1})
+
+
+def start_background_tasks():
+    """
+    Démarre les threads de fond (rechargement à chaud quand
+    output/bundle/CURRENT change, agrégation des nouvelles données du
+    marché). Appelé dans chaque processus qui sert: les threads ne
+    survivent pas à un fork.
+    """
+    if MODEL_WATCH_INTERVAL > 0:
+        registry.watch(MODEL_WATCH_INTERVAL)
+    if MARKET_STATS_REFRESH_INTERVAL > 0:
+        market_stats.watch(MARKET_STATS_REFRESH_INTERVAL)
+
+
+def parse_property(data):
+    """Valide et normalise les champs d'un bien reçu en JSON"""
+    room_count = int(data.get('room_count'))
+    bathroom_count = int(data.get('bathroom_count'))
+    size = float(data.get('size'))
+    location = data.get('location', 'Tunis')
+    category = data.get('category', 'Appartements')
+    transaction_type = data.get('type', 'À Vendre')
+
+    if not math.isfinite(size):
+        raise ValueError("size must be a finite number")
+    if not isinstance(location, str) or location.strip().lower() not in VILLES:
+        location = 'Tunis'
+    if category not in CATEGORIES:
+        category = 'Appartements'
+    if transaction_type not in TYPES_TRANSACTION:
+        transaction_type = 'À Vendre'
+
+    return room_count, bathroom_count, size, location, category, transaction_type
+
+
+@app.before_request
+def start_timer():
+    if metrics.enabled:
+        g.request_start = time.perf_counter()
+
+
+@app.after_request
+def observe_request(response):
+    start = g.get('request_start')
+    if start is not None:
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start,
+                                     (endpoint, request.method, str(response.status_code)))
+    return response
+
+
+@app.after_request
+def record_payload(response):
+    if payload_recorder is not None and request.path in RECORDED_PATHS:
+        body = request.get_json(silent=True)
+        if body is not None:
+            payload_recorder.record(request.path, body, response.status_code)
+    return response
+
+
 @app.route("/health", methods=["GET"])
 def health():
     return jsonify({"status": "API running"}), 200
 
+@app.route("/metrics", methods=["GET"])
+def metrics_route():
+    """Métriques du processus au format texte Prometheus"""
+    if not metrics.enabled:
+        return jsonify({"error": "metrics disabled"}), 404
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    return jsonify(prediction_cache.stats()), 200
+
+@app.route("/models", methods=["GET"])
+def models_status():
+    return jsonify(registry.status()), 200
+
+@app.route("/models/reload", methods=["POST"])
+def models_reload():
+    """Charge en arrière-plan la version pointée par CURRENT puis l'active"""
+    started = registry.check_for_update(force=True)
+    return jsonify({"reloading": started, **registry.status()}), 202 if started else 200
+
+@app.route("/models/<version>/activate", methods=["POST"])
+def models_activate(version):
+    try:
+        registry.load(version)
+        registry.activate(version)
+        return jsonify(registry.status()), 200
+    except FileNotFoundError:
+        return jsonify({"error": f"unknown model version {version}"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route("/models/candidate", methods=["POST"])
+def models_candidate():
+    """Route un pourcentage du trafic vers une version candidate"""
+    try:
+        data = request.get_json()
+        version = data.get('version')
+        percent = float(data.get('percent', 0))
+        if version is not None:
+            registry.load(version)
+        registry.set_candidate(version, percent)
+        return jsonify(registry.status()), 200
+    except FileNotFoundError:
+        return jsonify({"error": f"unknown model version {data.get('version')}"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route("/market/<view>", methods=["GET"])
+def market_view(view):
+    """
+    Agrégats du marché précalculés (locations, categories, types);
+    ETag pour les requêtes conditionnelles (304 si inchangés)
+    """
+    if not market_stats.available:
+        return jsonify({"error": "market statistics unavailable (no dataset)"}), 503
+    payload = market_stats.payload(view)
+    if payload is None:
+        return jsonify({"error": f"unknown view {view}"}), 404
+    body, etag = payload
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
 @app.route("/predict", methods=["POST"])
 def predict():
+    observe = observe_single
     try:
+        if observe is not None:
+            start = time.perf_counter()
         data = request.get_json()
-        room_count = int(data.get('room_count'))
-        bathroom_count = int(data.get('bathroom_count'))
-        size = float(data.get('size'))
-        location = data.get('location', 'Tunis')
-        category = data.get('category', 'Appartements')
-        transaction_type = data.get('type', 'À Vendre')
-
-        if location not in VILLES:
-            location = 'Tunis'
-        if category not in CATEGORIES:
-            category = 'Appartements'
-        if transaction_type not in TYPES_TRANSACTION:
-            transaction_type = 'À Vendre'
-
-        price, conf_low, conf_high = predict_price(room_count, bathroom_count, size, location, category, transaction_type)
-
-        response = {
+        prop = parse_property(data)
+        if observe is not None:
+            observe('parse', time.perf_counter() - start)
+
+        price, conf_low, conf_high = predict_price(*prop)
+
+        if observe is not None:
+            start = time.perf_counter()
+        response = jsonify({
             "predicted_price": float(price),
             "conf_low": float(conf_low),
             "conf_high": float(conf_high),
-        }
-        return jsonify(response)
+        })
+        if observe is not None:
+            observe('serialize', time.perf_counter() - start)
+        return response
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
+@app.route("/predict/batch", methods=["POST"])
+def predict_batch_route():
+    observe = observe_batch
+    if observe is not None:
+        start = time.perf_counter()
+    data = request.get_json(silent=True)
+    items = data.get('properties') if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        return jsonify({"error": "expected a list of properties"}), 400
+    if len(items) > BATCH_MAX_SIZE:
+        return jsonify({"error": f"batch too large (max {BATCH_MAX_SIZE})"}), 413
+
+    # Validation par bien: les erreurs n'empêchent pas de prédire les autres
+    results = [None] * len(items)
+    valid_idx, valid_props = [], []
+    for i, item in enumerate(items):
+        try:
+            if not isinstance(item, dict):
+                raise ValueError("property must be a JSON object")
+            valid_props.append(parse_property(item))
+            valid_idx.append(i)
+        except Exception as e:
+            results[i] = {"error": str(e)}
+
+    if observe is not None:
+        observe('parse', time.perf_counter() - start)
+
+    try:
+        prices, conf_low, conf_high = predict_batch(valid_props)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+    if observe is not None:
+        start = time.perf_counter()
+
+    for j, i in enumerate(valid_idx):
+        results[i] = {
+            "predicted_price": float(prices[j]),
+            "conf_low": float(conf_low[j]),
+            "conf_high": float(conf_high[j]),
+        }
+
+    response = jsonify({
+        "results": results,
+        "count": len(items),
+        "errors": len(items) - len(valid_idx),
+    })
+    if observe is not None:
+        observe('serialize', time.perf_counter() - start)
+    return response
+
 if __name__ == "__main__":
+    # Serveur de développement (reloader, debug). En production: python serve.py
+    start_background_tasks()
     app.run(host="0.0.0.0", port=5000, debug=True)
@@ -0,0 +1,75 @@
+# =============================================================================
+# cold_start.py - Démarrage à froid: pickles joblib vs bundle memory-mappé
+#
+# Chaque mesure tourne dans un nouvel interpréteur (imports compris).
+# Usage (depuis interface/backend):
+#     python -m benchmarks.cold_start [--runs 5]
+# =============================================================================
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Chaque scénario affiche le temps (s) passé dans la partie mesurée
+SCENARIOS = {
+    "pickles (joblib.load x6)": """
+import time
+start = time.perf_counter()
+import joblib
+from models.predictor import PICKLE_PATHS
+objects = [joblib.load(path) for path in PICKLE_PATHS.values()]
+print(time.perf_counter() - start)
+""",
+    "bundle (manifest + mmap)": """
+import time
+start = time.perf_counter()
+import os
+from config import BUNDLE_DIR
+from models.bundle import ModelBundle, current_version
+bundle = ModelBundle.load(os.path.join(BUNDLE_DIR, current_version(BUNDLE_DIR)))
+print(time.perf_counter() - start)
+""",
+    "1re prédiction via pickles": """
+import time
+start = time.perf_counter()
+from models.bundle import ModelBundle
+from models.predictor import PICKLE_PATHS, NUM_COLS, BIAS_FACTORS, ServingModel
+model = ServingModel(ModelBundle.from_pickles(PICKLE_PATHS, NUM_COLS, BIAS_FACTORS))
+model.predict_one(3, 2, 120.0, 'tunis', 'Appartements', 'À Vendre')
+print(time.perf_counter() - start)
+""",
+    "1re prédiction via bundle": """
+import time
+start = time.perf_counter()
+from models.predictor import predict_price
+predict_price(3, 2, 120.0, 'tunis', 'Appartements', 'À Vendre')
+print(time.perf_counter() - start)
+""",
+}
+
+
+def run_scenario(code):
+    """Lance un interpréteur neuf; retourne (temps mesuré, temps total du process)"""
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR,
+                            capture_output=True, text=True, check=True).stdout
+    total = time.perf_counter() - start
+    return float(output.strip().splitlines()[-1]), total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de démarrage à froid du modèle")
+    parser.add_argument("--runs", type=int, default=5, help="Répétitions par scénario")
+    args = parser.parse_args()
+
+    print(f"{'Scénario':32s} {'chargement (ms)':>16s} {'process (ms)':>14s}")
+    for name, code in SCENARIOS.items():
+        timings = [run_scenario(code) for _ in range(args.runs)]
+        load_ms = statistics.median(t[0] for t in timings) * 1000
+        total_ms = statistics.median(t[1] for t in timings) * 1000
+        print(f"{name:32s} {load_ms:16.1f} {total_ms:14.1f}")
@@ -0,0 +1,51 @@
+# =============================================================================
+# feature_builder.py - Coût CPU du chemin rapide de prepare_input (et de sa
+# version vectorisée build_many, utilisée par le micro-batching)
+#
+# La parité bit à bit avec le chemin pandas est vérifiée par
+# tests/test_feature_builder.py.
+#
+# Usage (depuis interface/backend):
+#     python -m benchmarks.feature_builder
+# =============================================================================
+
+import itertools
+import time
+
+from models.predictor import get_model, prepare_batch, prepare_input
+from utils.constants import VILLES, CATEGORIES, TYPES_TRANSACTION
+
+
+def benchmark_cases():
+    """Grille de biens couvrant toutes les villes/catégories/types et les cas limites"""
+    locations = VILLES + ['Tunis', '  Sousse ', 'inconnue']
+    categories = CATEGORIES + ['Autre']
+    shapes = [(0, 0, 0.0), (1, 1, 35.0), (3, 2, 120.0), (5, 3, 300.0), (12, 6, 1500.5)]
+    for (rooms, baths, size), location, category, transaction_type in itertools.product(
+            shapes, locations, categories, TYPES_TRANSACTION):
+        yield rooms, baths, size, location, category, transaction_type
+
+
+def time_per_call(fn, cases, repeat=3):
+    """Meilleur temps CPU moyen par appel (µs)"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.process_time()
+        for case in cases:
+            fn(case)
+        best = min(best, (time.process_time() - start) / len(cases))
+    return best * 1e6
+
+
+if __name__ == "__main__":
+    cases = list(itertools.islice(itertools.cycle(benchmark_cases()), 2000))
+    fast_us = time_per_call(lambda c: prepare_input(*c), cases)
+    pandas_us = time_per_call(lambda c: prepare_batch([c]), cases[:200])
+    print(f"prepare_input (FeatureBuilder): {fast_us:8.1f} µs/appel")
+    print(f"prepare_batch (pandas, 1 bien): {pandas_us:8.1f} µs/appel")
+    print(f"Gain: x{pandas_us / fast_us:.1f}")
+
+    builder = get_model().feature_builder
+    batches = [cases[i:i + 64] for i in range(0, len(cases), 64)]
+    many_us = time_per_call(lambda batch: builder.build_many(batch, scale=False), batches) / 64
+    print(f"build_many (lots de 64):        {many_us:8.1f} µs/bien")
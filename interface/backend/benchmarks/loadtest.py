@@ -0,0 +1,381 @@
+# =============================================================================
+# loadtest.py - Test de charge et rejeu de requêtes pour l'API de prédiction
+#
+# Deux sources de requêtes:
+#   - synthétique: biens tirés de data/clean/cleaned_data.csv (distribution
+#     jointe réelle des villes, catégories, surfaces...), mélange d'endpoints
+#   - rejeu: journal enregistré par l'API (PAYLOAD_LOG_PATH, voir config.py)
+#
+# Deux cibles: un serveur HTTP (--url) ou l'application Flask dans le
+# processus (--in-process, sans serveur: mesure predictor.py seul).
+#
+# Usage (depuis interface/backend):
+#     python -m benchmarks.loadtest --in-process --requests 5000
+#     python -m benchmarks.loadtest --url http://localhost:5000 --rate 200
+#     python -m benchmarks.loadtest --replay payloads.jsonl --speed 2
+#     python -m benchmarks.loadtest --in-process --save-baseline base.json
+#     python -m benchmarks.loadtest --in-process --baseline base.json  # exit 1 si régression
+# =============================================================================
+
+import argparse
+import http.client
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_PATH = os.path.join(BACKEND_DIR, '..', '..', 'data', 'clean', 'cleaned_data.csv')
+
+# Mélange d'endpoints par défaut (proportions)
+DEFAULT_MIX = "predict=0.9,batch=0.05,health=0.05"
+
+# Métriques comparées à la baseline: (clé, sens) avec +1 = plus haut est pire
+BASELINE_METRICS = [('p50_ms', +1), ('p95_ms', +1), ('p99_ms', +1), ('throughput', -1)]
+
+
+# -------------------------
+# Génération des requêtes
+# -------------------------
+def parse_mix(spec):
+    """'predict=0.9,batch=0.1' -> {'predict': 0.9, 'batch': 0.1} (normalisé)"""
+    mix = {}
+    for part in spec.split(','):
+        name, _, weight = part.partition('=')
+        mix[name.strip()] = float(weight)
+    unknown = set(mix) - {'predict', 'batch', 'health'}
+    if unknown:
+        raise ValueError(f"unknown endpoints in mix: {sorted(unknown)}")
+    total = sum(mix.values())
+    return {name: weight / total for name, weight in mix.items()}
+
+
+def load_properties(path=DATA_PATH):
+    """Biens du dataset nettoyé, au format JSON attendu par /predict"""
+    import pandas as pd
+    data = pd.read_csv(path, usecols=['room_count', 'bathroom_count', 'size',
+                                      'location', 'category', 'type'])
+    return [
+        {"room_count": int(row.room_count), "bathroom_count": int(row.bathroom_count),
+         "size": float(row.size), "location": row.location.title(),
+         "category": row.category, "type": row.type}
+        for row in data.itertuples(index=False)
+    ]
+
+
+def synthetic_requests(n, mix, properties, batch_size=50, jitter=0.0, seed=42):
+    """
+    Génère n requêtes selon le mélange d'endpoints.
+
+    Args:
+        n (int): Nombre de requêtes
+        mix (dict): Proportion par endpoint ('predict', 'batch', 'health')
+        properties (list): Biens à échantillonner (avec remise)
+        batch_size (int): Biens par requête /predict/batch
+        jitter (float): Perturbation relative de la surface (0 = biens du
+            dataset tels quels, donc taux de hit du cache élevé)
+        seed (int): Graine
+
+    Returns:
+        list: Tuples (méthode, chemin, corps JSON ou None)
+    """
+    rng = np.random.default_rng(seed)
+    names = list(mix)
+    kinds = rng.choice(len(names), size=n, p=[mix[name] for name in names])
+
+    def sample():
+        prop = dict(properties[rng.integers(len(properties))])
+        if jitter > 0:
+            prop['size'] = round(prop['size'] * (1 + rng.uniform(-jitter, jitter)), 1)
+        return prop
+
+    requests = []
+    for kind in kinds:
+        name = names[kind]
+        if name == 'predict':
+            requests.append(('POST', '/predict', sample()))
+        elif name == 'batch':
+            requests.append(('POST', '/predict/batch',
+                             {"properties": [sample() for _ in range(batch_size)]}))
+        else:
+            requests.append(('GET', '/health', None))
+    return requests
+
+
+def replay_requests(path):
+    """
+    Requêtes d'un journal enregistré par l'API.
+
+    Returns:
+        tuple: (liste (méthode, chemin, corps), décalages en s depuis la
+            première requête, statuts enregistrés)
+    """
+    from utils.payload_log import read_payloads
+    entries = read_payloads(path)
+    if not entries:
+        raise ValueError(f"no payloads in {path}")
+    t0 = entries[0]["t"]
+    requests = [('POST', entry["p"], entry["b"]) for entry in entries]
+    offsets = [max(entry["t"] - t0, 0.0) for entry in entries]
+    statuses = [entry.get("s") for entry in entries]
+    return requests, offsets, statuses
+
+
+# -------------------------
+# Cibles
+# -------------------------
+class HttpTarget:
+    """Serveur HTTP; une connexion keep-alive par thread client"""
+
+    def __init__(self, url, timeout=30):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def send(self, method, path, body):
+        """Retourne le statut HTTP"""
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        headers = {'Content-Type': 'application/json'} if data is not None else {}
+        conn = self._connection()
+        try:
+            conn.request(method, path, body=data, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            return response.status
+        except Exception:
+            conn.close()
+            self._local.conn = None
+            raise
+
+
+class InProcessTarget:
+    """Application Flask dans le processus (client de test, sans réseau)"""
+
+    def __init__(self):
+        from app import app
+        self.app = app
+        self._local = threading.local()
+
+    def send(self, method, path, body):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        return client.open(path, method=method, json=body).status_code
+
+
+# -------------------------
+# Exécution
+# -------------------------
+def run_load(target, requests, concurrency=8, rate=None, offsets=None, expected=None):
+    """
+    Envoie les requêtes et mesure chaque latence.
+
+    Sans rate ni offsets: boucle fermée, concurrency clients enchaînent les
+    requêtes (débit maximal). Sinon: boucle ouverte, chaque requête part à
+    son heure planifiée et sa latence est mesurée depuis cette heure (un
+    serveur saturé n'est pas masqué par des clients qui attendent).
+
+    Args:
+        target: HttpTarget ou InProcessTarget
+        requests (list): Tuples (méthode, chemin, corps)
+        concurrency (int): Clients simultanés
+        rate (float): Débit cible en requêtes/s
+        offsets (list): Heures de départ relatives (rejeu)
+        expected (list): Statuts attendus (rejeu); sinon erreur = exception ou 5xx
+
+    Returns:
+        tuple: (résultats [(chemin, latence s, erreur bool)], durée totale s)
+    """
+    results = [None] * len(requests)
+
+    def execute(i, scheduled):
+        method, path, body = requests[i]
+        try:
+            status = target.send(method, path, body)
+            if expected is not None and expected[i] is not None:
+                error = status != expected[i]
+            else:
+                error = status >= 500
+        except Exception:
+            error = True
+        results[i] = (path, time.perf_counter() - scheduled, error)
+
+    start = time.perf_counter()
+    if rate is None and offsets is None:
+        counter = itertools.count()
+
+        def client():
+            while True:
+                i = next(counter)
+                if i >= len(requests):
+                    return
+                execute(i, time.perf_counter())
+
+        threads = [threading.Thread(target=client) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    else:
+        if rate is not None:
+            offsets = [i / rate for i in range(len(requests))]
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for i, offset in enumerate(offsets):
+                scheduled = start + offset
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(execute, i, scheduled)
+
+    return results, time.perf_counter() - start
+
+
+def summarize(results, elapsed):
+    """Latences (ms), débit et taux d'erreur par endpoint et au total"""
+    groups = {}
+    for path, latency, error in results:
+        groups.setdefault(path, []).append((latency, error))
+    groups['total'] = [(latency, error) for _, latency, error in results]
+
+    report = {}
+    for path, rows in groups.items():
+        latencies = np.array([latency for latency, _ in rows]) * 1000
+        errors = sum(error for _, error in rows)
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        report[path] = {
+            "count": len(rows),
+            "errors": int(errors),
+            "error_rate": errors / len(rows),
+            "throughput": len(rows) / elapsed,
+            "mean_ms": float(latencies.mean()),
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+            "max_ms": float(latencies.max()),
+        }
+    return report
+
+
+def print_report(report):
+    print(f"{'Endpoint':16s} {'n':>7s} {'err %':>7s} {'req/s':>9s} "
+          f"{'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} {'max ms':>8s}")
+    for path, stats in report.items():
+        print(f"{path:16s} {stats['count']:7d} {stats['error_rate'] * 100:7.2f} "
+              f"{stats['throughput']:9.1f} {stats['p50_ms']:8.2f} {stats['p95_ms']:8.2f} "
+              f"{stats['p99_ms']:8.2f} {stats['max_ms']:8.2f}")
+
+
+def compare_to_baseline(report, baseline, tolerance=0.2, error_tolerance=0.01):
+    """
+    Compare un rapport à une baseline enregistrée.
+
+    Args:
+        report (dict): Rapport courant (summarize)
+        baseline (dict): Rapport de référence
+        tolerance (float): Dégradation relative tolérée (latences, débit)
+        error_tolerance (float): Hausse absolue tolérée du taux d'erreur
+
+    Returns:
+        list: Messages de régression (vide si aucune)
+    """
+    regressions = []
+    for path, reference in baseline.items():
+        current = report.get(path)
+        if current is None:
+            continue
+        for metric, direction in BASELINE_METRICS:
+            before, after = reference[metric], current[metric]
+            if before <= 0:
+                continue
+            change = (after - before) / before * direction
+            if change > tolerance:
+                regressions.append(f"{path} {metric}: {before:.2f} -> {after:.2f} "
+                                   f"({change * 100:+.0f}% worse, tolerance {tolerance * 100:.0f}%)")
+        if current['error_rate'] - reference['error_rate'] > error_tolerance:
+            regressions.append(f"{path} error_rate: {reference['error_rate']:.4f} -> "
+                               f"{current['error_rate']:.4f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge de l'API de prédiction")
+    target_group = parser.add_mutually_exclusive_group()
+    target_group.add_argument("--url", default="http://localhost:5000", help="Serveur cible")
+    target_group.add_argument("--in-process", action="store_true",
+                              help="Application Flask dans le processus (sans serveur)")
+    parser.add_argument("--replay", help="Journal de requêtes à rejouer (PAYLOAD_LOG_PATH)")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Accélération du rejeu au rythme enregistré")
+    parser.add_argument("--requests", type=int, default=2000, help="Requêtes synthétiques")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Proportions par endpoint")
+    parser.add_argument("--batch-size", type=int, default=50, help="Biens par /predict/batch")
+    parser.add_argument("--jitter", type=float, default=0.0,
+                        help="Perturbation relative des surfaces (réduit les hits du cache)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--rate", type=float, help="Débit cible (req/s); défaut: maximal")
+    parser.add_argument("--concurrency", type=int, default=8, help="Clients simultanés")
+    parser.add_argument("--warmup", type=int, default=50, help="Requêtes non mesurées")
+    parser.add_argument("--output", help="Écrire le rapport JSON")
+    parser.add_argument("--save-baseline", help="Enregistrer le rapport comme baseline")
+    parser.add_argument("--baseline", help="Baseline à comparer (exit 1 si régression)")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Dégradation relative tolérée vs baseline")
+    args = parser.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+    target = InProcessTarget() if args.in_process else HttpTarget(args.url)
+
+    offsets = expected = None
+    if args.replay:
+        requests, offsets, expected = replay_requests(args.replay)
+        if args.rate is None:
+            offsets = [offset / args.speed for offset in offsets]
+        else:
+            offsets = None
+    else:
+        requests = synthetic_requests(args.requests, parse_mix(args.mix), load_properties(),
+                                      args.batch_size, args.jitter, args.seed)
+
+    # Préchauffage (connexions, modèle, imports) hors mesure
+    warmup = requests[:args.warmup]
+    if warmup:
+        run_load(target, warmup, args.concurrency)
+
+    results, elapsed = run_load(target, requests, args.concurrency, args.rate, offsets, expected)
+    report = summarize(results, elapsed)
+    print_report(report)
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(report, baseline, args.tolerance)
+        if regressions:
+            print("\n❌ Régressions vs baseline:")
+            for message in regressions:
+                print(f"  - {message}")
+            return 1
+        print("\n✓ Aucune régression vs baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,65 @@
 import os
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(BASE_DIR, '..', '..'))
 OUTPUT_DIR = os.path.join(BASE_DIR, 'output')
 
 MODEL_PATH = os.path.join(OUTPUT_DIR, 'best_model.pkl')
 SCALER_PATH = os.path.join(OUTPUT_DIR, 'scaler.pkl')
 FEATURES_PATH = os.path.join(OUTPUT_DIR, 'feature_cols.pkl')
 LOCATION_STATS_PATH = os.path.join(OUTPUT_DIR, 'location_stats.pkl')
-PREMIUM_LOCATIONS_PATH = os.path.join(OUTPUT_DIR, 'premium_locations.pkl')
\ No newline at end of file
+PREMIUM_LOCATIONS_PATH = os.path.join(OUTPUT_DIR, 'premium_locations.pkl')
+UPSCALE_LOCATIONS_PATH = os.path.join(OUTPUT_DIR, 'upscale_locations.pkl')
+
+# Bundles versionnés: un dossier <version>/ (manifest + tableaux .npy
+# memory-mappés) par version, CURRENT pointe sur la version à servir
+BUNDLE_DIR = os.path.join(OUTPUT_DIR, 'bundle')
+
+# Entraînement (models/train.py): CSV nettoyé par défaut et cache des
+# factorisations des folds de validation croisée
+TRAINING_DATA_PATH = os.path.join(BASE_DIR, '..', '..', 'data', 'clean', 'cleaned_data_filtered.csv')
+TRAINING_CACHE_DIR = os.path.join(OUTPUT_DIR, 'train_cache')
+
+# Statistiques du marché (/market/<vue>): jeu nettoyé en colonnes
+# (preprocessing/dataset.py), tables d'agrégats matérialisées, intervalle
+# de prise en compte des nouveaux segments (0 = jamais après le démarrage)
+DATASET_DIR = os.environ.get('DATASET_DIR', os.path.join(PROJECT_ROOT, 'data', 'store'))
+MARKET_STATS_PATH = os.environ.get('MARKET_STATS_PATH', os.path.join(OUTPUT_DIR, 'market_stats.npz'))
+MARKET_STATS_REFRESH_INTERVAL = float(os.environ.get('MARKET_STATS_REFRESH_INTERVAL', 60))
+
+# Nombre maximal de biens acceptés par /predict/batch
+BATCH_MAX_SIZE = int(os.environ.get('BATCH_MAX_SIZE', 10000))
+
+# Cache des prédictions (taille 0 = désactivé, TTL 0 = sans expiration)
+PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', 10000))
+PREDICTION_CACHE_TTL = float(os.environ.get('PREDICTION_CACHE_TTL', 0))
+
+# Registre des modèles: versions gardées en mémoire, entrées du cache
+# recalculées avant un swap, surveillance de CURRENT (0 = désactivée)
+MODEL_MAX_RESIDENT = int(os.environ.get('MODEL_MAX_RESIDENT', 3))
+MODEL_WARMUP_SIZE = int(os.environ.get('MODEL_WARMUP_SIZE', 1000))
+MODEL_WATCH_INTERVAL = float(os.environ.get('MODEL_WATCH_INTERVAL', 0))
+
+# Serveur de production (serve.py): processus pré-forkés partageant le
+# modèle en copy-on-write, threads par processus, timeout keep-alive
+SERVE_HOST = os.environ.get('SERVE_HOST', '0.0.0.0')
+SERVE_PORT = int(os.environ.get('SERVE_PORT', 5000))
+SERVE_WORKERS = int(os.environ.get('SERVE_WORKERS', 0)) or os.cpu_count() or 1
+SERVE_THREADS = int(os.environ.get('SERVE_THREADS', 4))
+SERVE_BACKLOG = int(os.environ.get('SERVE_BACKLOG', 1024))
+SERVE_KEEPALIVE_TIMEOUT = float(os.environ.get('SERVE_KEEPALIVE_TIMEOUT', 5))
+SERVE_ACCESS_LOG = os.environ.get('SERVE_ACCESS_LOG', '0') == '1'
+
+# Journal des requêtes /predict pour rejeu (benchmarks/loadtest.py);
+# vide = désactivé
+PAYLOAD_LOG_PATH = os.environ.get('PAYLOAD_LOG_PATH', '')
+PAYLOAD_LOG_SAMPLE = float(os.environ.get('PAYLOAD_LOG_SAMPLE', 1.0))
+
+# Métriques par étape et endpoint /metrics (0 = aucune mesure)
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+
+# Micro-batching des /predict concurrents (opt-in): fenêtre d'attente
+# après la première requête et taille maximale d'un lot
+MICROBATCH_ENABLED = os.environ.get('MICROBATCH_ENABLED', '0') == '1'
+MICROBATCH_MAX_WAIT_MS = float(os.environ.get('MICROBATCH_MAX_WAIT_MS', 2))
+MICROBATCH_MAX_SIZE = int(os.environ.get('MICROBATCH_MAX_SIZE', 64))
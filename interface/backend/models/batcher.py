@@ -0,0 +1,92 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """
+    Regroupe les prédictions unitaires concurrentes en petits lots.
+
+    Chaque appelant dépose un bien et attend son résultat. Un thread
+    collecteur prend le premier bien en attente, attend au plus max_wait
+    secondes (ou max_batch_size biens), puis lance une seule prédiction
+    vectorisée par modèle et rend à chaque appelant son propre prix.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=64, max_wait=0.002, observe_size=None):
+        """
+        Args:
+            predict_fn (callable): (modèle, liste de biens) -> prix (même ordre)
+            max_batch_size (int): Nombre maximal de biens par lot
+            max_wait (float): Attente maximale (s) après le premier bien
+                (0 = ne prendre que les biens déjà en attente)
+            observe_size (callable): Reçoit la taille de chaque lot (métriques)
+        """
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(max_batch_size, 1)
+        self.max_wait = max_wait
+        self.observe_size = observe_size
+        self._lock = threading.Lock()
+        self._queue = None
+        self._pid = None
+
+    def _ensure_worker(self):
+        """Démarre le collecteur (de nouveau après un fork: les threads ne survivent pas)"""
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._queue = queue.SimpleQueue()
+                    threading.Thread(target=self._run, args=(self._queue,),
+                                     name="micro-batcher", daemon=True).start()
+                    self._pid = os.getpid()
+        return self._queue
+
+    def submit(self, model, item):
+        """Dépose un bien; retourne un Future résolu avec son prix"""
+        future = Future()
+        self._ensure_worker().put((model, item, future))
+        return future
+
+    def predict(self, model, item):
+        """Prix d'un bien, calculé dans le prochain lot (bloquant)"""
+        return self.submit(model, item).result()
+
+    def _collect(self, pending):
+        """Un lot: premier bien en attente, puis les suivants jusqu'à max_wait / max_batch_size"""
+        batch = [pending.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                timeout = deadline - time.monotonic()
+                if timeout > 0:
+                    batch.append(pending.get(timeout=timeout))
+                else:
+                    batch.append(pending.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self, pending):
+        while True:
+            batch = self._collect(pending)
+            if self.observe_size is not None:
+                self.observe_size(len(batch))
+
+            # Un appel vectorisé par version du modèle (active / candidate)
+            groups = {}
+            for model, item, future in batch:
+                items, futures = groups.setdefault(model, ([], []))
+                items.append(item)
+                futures.append(future)
+
+            for model, (items, futures) in groups.items():
+                try:
+                    prices = self.predict_fn(model, items)
+                except BaseException as e:
+                    for future in futures:
+                        future.set_exception(e)
+                    continue
+                for future, price in zip(futures, prices):
+                    future.set_result(price)
@@ -0,0 +1,338 @@
+# =============================================================================
+# bundle.py - Bundle versionné du modèle (manifest JSON + tableaux NumPy)
+#
+# Construire le bundle à partir des pickles (depuis interface/backend):
+#     python -m models.bundle
+# =============================================================================
+
+import hashlib
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+
+from .linear_kernel import LinearKernel, artifacts_fingerprint
+
+BUNDLE_FORMAT_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+CURRENT_NAME = 'CURRENT'
+
+
+class ModelBundle:
+    """
+    Artefacts du modèle sous une forme sans pickle.
+
+    Le manifest décrit le modèle et les listes (features, villes...), les
+    tableaux sont des fichiers .npy ouverts en memory-map lecture seule:
+    les workers forkés partagent les mêmes pages.
+    """
+
+    def __init__(self, manifest, arrays, model=None):
+        """
+        Args:
+            manifest (dict): Manifest du bundle
+            arrays (dict): Tableaux NumPy par nom
+            model: Estimateur sklearn, seulement pour un modèle non linéaire
+                chargé depuis les pickles
+        """
+        self.manifest = manifest
+        self.arrays = arrays
+        self.model = model
+
+    @property
+    def version(self):
+        return self.manifest['version']
+
+    @property
+    def source_fingerprint(self):
+        return self.manifest.get('source_fingerprint', '')
+
+    @property
+    def feature_cols(self):
+        return self.manifest['feature_cols']
+
+    @property
+    def num_cols(self):
+        return self.manifest['num_cols']
+
+    @property
+    def bias_factors(self):
+        return self.manifest['bias_factors']
+
+    @property
+    def premium_locations(self):
+        return self.manifest['premium_locations']
+
+    @property
+    def upscale_locations(self):
+        return self.manifest['upscale_locations']
+
+    @property
+    def price_levels(self):
+        """Niveau de prix par ville (minuscules)"""
+        return dict(zip(self.manifest['locations'],
+                        self.arrays['location_price_level'].tolist()))
+
+    @property
+    def scaler_mean(self):
+        return self.arrays['scaler_mean']
+
+    @property
+    def scaler_scale(self):
+        return self.arrays['scaler_scale']
+
+    @property
+    def is_linear(self):
+        return 'kernel_weights' in self.arrays
+
+    def kernel(self):
+        """Noyau linéaire fusionné (None pour un modèle non linéaire)"""
+        if not self.is_linear:
+            return None
+        return LinearKernel(self.arrays['kernel_weights'], self.arrays['kernel_intercept'][0],
+                            self.feature_cols, self.version)
+
+    def linear_params(self):
+        """(coef, intercept) du modèle en espace standardisé"""
+        return self.arrays['coef'], self.arrays['intercept'][0]
+
+    @classmethod
+    def from_artifacts(cls, model, scaler, feature_cols, location_stats, premium_locations,
+                       upscale_locations, num_cols, bias_factors, source_fingerprint=''):
+        """
+        Construit un bundle en mémoire à partir des objets dépicklés.
+
+        Args:
+            model: Modèle ajusté (linéaire: coef_ et intercept_)
+            scaler (StandardScaler): Scaler ajusté sur num_cols
+            feature_cols (list): Colonnes attendues par le modèle
+            location_stats (pd.DataFrame): Colonnes 'location' et 'location_price_level'
+            premium_locations (list): Liste des zones premium
+            upscale_locations (list): Liste des zones haut de gamme
+            num_cols (list): Features numériques standardisées, dans l'ordre du scaler
+            bias_factors (dict): Facteur multiplicatif par type de transaction
+            source_fingerprint (str): Empreinte des pickles sources
+
+        Returns:
+            ModelBundle: Bundle (non encore écrit sur disque)
+        """
+        arrays = {
+            'scaler_mean': np.asarray(scaler.mean_, dtype=float),
+            'scaler_scale': np.asarray(scaler.scale_, dtype=float),
+            'location_price_level': np.asarray(location_stats['location_price_level'], dtype=float),
+        }
+        is_linear = hasattr(model, 'coef_')
+        if is_linear:
+            kernel = LinearKernel.compile(model, scaler, feature_cols, num_cols, bias_factors)
+            arrays['coef'] = np.asarray(model.coef_, dtype=float).ravel()
+            arrays['intercept'] = np.ravel(model.intercept_).astype(float)
+            arrays['kernel_weights'] = kernel.weights
+            arrays['kernel_intercept'] = np.array([kernel.intercept])
+
+        manifest = {
+            'format_version': BUNDLE_FORMAT_VERSION,
+            'source_fingerprint': source_fingerprint,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'model': {'type': type(model).__name__, 'params': _json_params(model)},
+            'feature_cols': list(feature_cols),
+            'num_cols': list(num_cols),
+            'locations': [str(loc).lower() for loc in location_stats['location']],
+            'premium_locations': list(premium_locations),
+            'upscale_locations': list(upscale_locations),
+            'bias_factors': dict(bias_factors),
+        }
+        manifest['version'] = _content_version(manifest, arrays)
+        return cls(manifest, arrays, model=None if is_linear else model)
+
+    @classmethod
+    def from_pickles(cls, paths, num_cols, bias_factors):
+        """
+        Construit un bundle en mémoire à partir des pickles joblib.
+
+        Args:
+            paths (dict): Chemins 'model', 'scaler', 'feature_cols',
+                'location_stats', 'premium_locations', 'upscale_locations'
+            num_cols (list): Features numériques standardisées
+            bias_factors (dict): Facteur multiplicatif par type de transaction
+        """
+        import joblib  # Import différé: inutile quand le bundle est à jour
+
+        objects = {name: joblib.load(path) for name, path in paths.items()}
+        return cls.from_artifacts(
+            objects['model'], objects['scaler'], objects['feature_cols'],
+            objects['location_stats'], objects['premium_locations'],
+            objects['upscale_locations'], num_cols, bias_factors,
+            source_fingerprint=pickles_fingerprint(paths, num_cols, bias_factors),
+        )
+
+    def save(self, bundle_root, make_current=True):
+        """
+        Écrit le bundle dans <bundle_root>/<version>/ (un .npy par tableau et
+        le manifest), puis pointe CURRENT dessus.
+
+        Chaque version a son propre dossier, jamais réécrit: les workers qui
+        ont déjà mappé une version ne voient pas ses fichiers changer.
+
+        Returns:
+            str: Dossier de la version
+        """
+        if self.model is not None:
+            raise ValueError("only linear models can be stored in a bundle")
+
+        version_dir = os.path.join(bundle_root, self.version)
+        if not os.path.exists(os.path.join(version_dir, MANIFEST_NAME)):
+            tmp_dir = os.path.join(bundle_root, f'.tmp-{self.version}-{os.getpid()}')
+            os.makedirs(tmp_dir, exist_ok=True)
+            manifest = dict(self.manifest, arrays={})
+            for name, array in self.arrays.items():
+                filename = f'{name}.npy'
+                np.save(os.path.join(tmp_dir, filename), np.ascontiguousarray(array))
+                manifest['arrays'][name] = {
+                    'file': filename,
+                    'dtype': array.dtype.str,
+                    'shape': list(array.shape),
+                }
+            with open(os.path.join(tmp_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_dir, version_dir)
+
+        if make_current:
+            set_current_version(bundle_root, self.version)
+        return version_dir
+
+    @classmethod
+    def load(cls, bundle_dir, mmap_mode='r'):
+        """
+        Ouvre une version de bundle écrite par save().
+
+        Args:
+            bundle_dir (str): Dossier de la version
+            mmap_mode (str): Mode memory-map NumPy (None pour tout lire)
+
+        Raises:
+            ValueError: Si le format du bundle n'est pas supporté
+        """
+        with open(os.path.join(bundle_dir, MANIFEST_NAME), encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('format_version') != BUNDLE_FORMAT_VERSION:
+            raise ValueError(f"unsupported bundle format {manifest.get('format_version')}")
+
+        arrays = {}
+        for name, spec in manifest['arrays'].items():
+            array = np.load(os.path.join(bundle_dir, spec['file']),
+                            mmap_mode=mmap_mode, allow_pickle=False)
+            if array.dtype.str != spec['dtype'] or list(array.shape) != spec['shape']:
+                raise ValueError(f"bundle array '{name}' does not match its manifest")
+            arrays[name] = array
+        return cls(manifest, arrays)
+
+
+def current_version(bundle_root):
+    """Version pointée par <bundle_root>/CURRENT (None si absente)"""
+    try:
+        with open(os.path.join(bundle_root, CURRENT_NAME), encoding='utf-8') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def set_current_version(bundle_root, version):
+    """Pointe CURRENT sur une version (renommage atomique)"""
+    tmp_path = os.path.join(bundle_root, f'{CURRENT_NAME}.tmp-{os.getpid()}')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(version + '\n')
+    os.replace(tmp_path, os.path.join(bundle_root, CURRENT_NAME))
+
+
+def pickles_fingerprint(paths, num_cols, bias_factors):
+    """Empreinte des pickles sources et des constantes de serving"""
+    return artifacts_fingerprint([paths[name] for name in sorted(paths)],
+                                 extra=repr((num_cols, bias_factors)))
+
+
+def load_serving_bundle(bundle_root, pickle_paths, num_cols, bias_factors):
+    """
+    Charge la version courante du bundle si elle correspond aux pickles,
+    sinon reconstruit le bundle en mémoire depuis les pickles (chemin lent).
+
+    Args:
+        bundle_root (str): Dossier racine des bundles
+        pickle_paths (dict): Chemins des pickles (voir from_pickles)
+        num_cols (list): Features numériques standardisées
+        bias_factors (dict): Facteur multiplicatif par type de transaction
+
+    Returns:
+        ModelBundle: Bundle prêt à servir
+    """
+    has_pickles = all(os.path.exists(path) for path in pickle_paths.values())
+    version = current_version(bundle_root)
+
+    if version is not None:
+        bundle = ModelBundle.load(os.path.join(bundle_root, version))
+        if not has_pickles or bundle.source_fingerprint == pickles_fingerprint(
+                pickle_paths, num_cols, bias_factors):
+            return bundle
+        print(f"⚠️  Bundle {version} périmé, rechargement depuis les pickles "
+              f"(python -m models.bundle pour le reconstruire)")
+
+    return ModelBundle.from_pickles(pickle_paths, num_cols, bias_factors)
+
+
+def _json_params(model):
+    """Hyperparamètres sérialisables en JSON"""
+    if not hasattr(model, 'get_params'):
+        return {}
+    return {key: value for key, value in model.get_params().items()
+            if isinstance(value, (str, int, float, bool, type(None)))}
+
+
+def _content_version(manifest, arrays):
+    """Version du bundle: hash du contenu (manifest + tableaux)"""
+    digest = hashlib.sha256(json.dumps(
+        {key: value for key, value in manifest.items() if key != 'created_at'},
+        sort_keys=True, ensure_ascii=False).encode('utf-8'))
+    for name in sorted(arrays):
+        digest.update(name.encode('utf-8'))
+        digest.update(np.ascontiguousarray(arrays[name]).tobytes())
+    return digest.hexdigest()[:16]
+
+
+if __name__ == "__main__":
+    import itertools
+
+    import joblib
+
+    from config import BUNDLE_DIR
+    from models.linear_kernel import verify_kernel
+    from models.predictor import PICKLE_PATHS, NUM_COLS, BIAS_FACTORS, ServingModel
+    from utils.constants import VILLES, CATEGORIES, TYPES_TRANSACTION
+
+    bundle = ModelBundle.from_pickles(PICKLE_PATHS, NUM_COLS, BIAS_FACTORS)
+    serving = ServingModel(bundle)
+    model = joblib.load(PICKLE_PATHS['model'])
+    scaler = joblib.load(PICKLE_PATHS['scaler'])
+
+    def reference_predict(cases):
+        """Pipeline joblib d'origine: scaler.transform + model.predict + bias"""
+        X_pred, prop_types = serving.prepare_batch(cases, scale=False)
+        num_cols = [col for col in NUM_COLS if col in X_pred.columns]
+        X_pred[num_cols] = scaler.transform(X_pred[num_cols].astype(float))
+        bias = np.array([BIAS_FACTORS.get(t, 1.0) for t in prop_types])
+        return 10 ** model.predict(X_pred) * bias
+
+    def prepare_raw(cases):
+        return serving.prepare_batch(cases, scale=False)[0].to_numpy(dtype=float)
+
+    cases = [
+        (rooms, baths, size, location, category, transaction_type)
+        for (rooms, baths, size), location, category, transaction_type in itertools.product(
+            [(1, 1, 35.0), (3, 2, 120.0), (5, 3, 300.0), (12, 6, 1500.5)],
+            VILLES + ['inconnue'], CATEGORIES, TYPES_TRANSACTION)
+    ]
+    max_rel_error = verify_kernel(serving.kernel, reference_predict, prepare_raw, cases)
+    print(f"Noyau vérifié contre le pipeline joblib sur {len(cases)} biens "
+          f"(écart relatif max {max_rel_error:.2e})")
+
+    version_dir = bundle.save(BUNDLE_DIR)
+    print(f"Bundle {bundle.version} écrit dans {version_dir} (CURRENT mis à jour)")
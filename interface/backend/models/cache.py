@@ -0,0 +1,100 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """
+    Cache LRU borné (avec TTL optionnel) des prédictions.
+
+    Les clés sont (version du modèle, entrées normalisées d'un bien): une
+    nouvelle version des artefacts ne lit jamais les prix de l'ancienne.
+    """
+
+    def __init__(self, max_size=10000, ttl=None, clock=time.monotonic):
+        """
+        Args:
+            max_size (int): Nombre maximal d'entrées (0 désactive le cache)
+            ttl (float): Durée de vie d'une entrée en secondes (None = illimitée)
+            clock (callable): Horloge monotone (injectable)
+        """
+        self.max_size = max_size
+        self.ttl = ttl or None
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    def get(self, key):
+        """Retourne la valeur en cache ou None (compte hit/miss)"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at is not None and self.clock() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Ajoute une entrée, en évinçant la moins récemment utilisée si plein"""
+        if not self.enabled:
+            return
+        expires_at = self.clock() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        """Vide le cache"""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def drop(self, predicate):
+        """Supprime les entrées dont la clé vérifie predicate (ex: une version déchargée)"""
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+    def recent_keys(self, limit):
+        """Clés les plus récemment utilisées (pour préchauffer une nouvelle version)"""
+        with self._lock:
+            keys = list(self._entries)
+        return keys[-limit:][::-1]
+
+    def stats(self):
+        """Compteurs du cache (pour l'API)"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
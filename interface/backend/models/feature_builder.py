@@ -0,0 +1,227 @@
+import math
+import time
+
+import numpy as np
+
+
+class FeatureBuilder:
+    """
+    Construit la ligne de features d'un bien sans passer par pandas.
+
+    Tout ce qui ne dépend pas de la requête est précalculé au chargement:
+    index des colonnes de feature_cols, niveaux de prix par ville,
+    moyennes/écarts-types du scaler. Le résultat est bit à bit identique
+    à celui de predictor.prepare_batch pour un seul bien.
+    """
+
+    # Features recalculées puis nettoyées (inf/NaN) par engineer_features
+    ENGINEERED_COLS = ['room_bathroom_ratio', 'total_rooms', 'size_per_room',
+                       'bathroom_density', 'size_x_rooms', 'size_x_bathrooms',
+                       'luxury_score']
+
+    def __init__(self, feature_cols, scaler_mean, scaler_scale, price_levels,
+                 premium_locations, upscale_locations, num_cols, villes, categories):
+        """
+        Args:
+            feature_cols (list): Colonnes attendues par le modèle
+            scaler_mean (np.ndarray): Moyennes du StandardScaler (ordre de num_cols)
+            scaler_scale (np.ndarray): Écarts-types du StandardScaler
+            price_levels (dict): Niveau de prix par ville (minuscules)
+            premium_locations (list): Liste des zones premium
+            upscale_locations (list): Liste des zones haut de gamme
+            num_cols (list): Features numériques standardisées, dans l'ordre du scaler
+            villes (list): Villes acceptées
+            categories (list): Catégories acceptées
+        """
+        self.n_features = len(feature_cols)
+        self.col_index = {col: i for i, col in enumerate(feature_cols)}
+
+        self.villes = {v.lower() for v in villes}
+        self.categories = set(categories)
+        self.premium_locations = set(premium_locations)
+        self.upscale_locations = set(upscale_locations)
+        self.price_levels = dict(price_levels)
+
+        # Colonnes numériques présentes, avec leurs paramètres de standardisation
+        self.num_cols = [col for col in num_cols if col in self.col_index]
+        self.num_idx = np.array([self.col_index[col] for col in self.num_cols], dtype=np.intp)
+        self.mean = np.asarray(scaler_mean, dtype=float)
+        self.scale = np.asarray(scaler_scale, dtype=float)
+
+    def normalize_location(self, location):
+        """Normalise une ville (case-insensitive), 'tunis' par défaut"""
+        location_normalized = location.strip().lower()
+        if location_normalized not in self.villes:
+            location_normalized = 'tunis'  # Ville par défaut
+        return location_normalized
+
+    def build(self, room_count, bathroom_count, size, location, category, transaction_type,
+              scale=True, observe=None):
+        """
+        Construit la ligne de features d'un bien.
+
+        Args:
+            scale (bool): Standardiser les features numériques (False pour
+                un noyau linéaire qui intègre déjà le scaler)
+            observe (callable): observe(étape, secondes) pour mesurer chaque
+                étape (None = aucune mesure)
+
+        Returns:
+            np.ndarray: Matrice (1, n_features)
+        """
+        if observe is not None:
+            start = time.perf_counter()
+
+        location = self.normalize_location(location)
+        if category not in self.categories:
+            category = 'Appartements'  # Catégorie par défaut
+
+        if observe is not None:
+            now = time.perf_counter()
+            observe('normalize', now - start)
+            start = now
+
+        # Mêmes formules (et même ordre d'opérations) que engineer_features
+        features = {
+            'room_count': room_count,
+            'bathroom_count': bathroom_count,
+            'size': size,
+            'room_bathroom_ratio': room_count / max(bathroom_count, 1),
+            'total_rooms': room_count + bathroom_count,
+            'size_per_room': size / max(room_count, 1),
+            'bathroom_density': bathroom_count / max(size, 1),
+            'size_x_rooms': size * room_count,
+            'size_x_bathrooms': size * bathroom_count,
+            'is_premium_location': int(location in self.premium_locations),
+            'is_upscale_location': int(location in self.upscale_locations),
+            'location_price_level': self.price_levels.get(location, 1.0),
+        }
+        features['luxury_score'] = (
+            (size / 100) * 0.3 +
+            (room_count / 5) * 0.2 +
+            (bathroom_count / 2) * 0.2 +
+            features['is_premium_location'] * 0.3 +
+            features['is_upscale_location'] * 0.15
+        )
+
+        # Valeurs infinies/NaN -> 0 (médiane d'une seule ligne indisponible)
+        for col in self.ENGINEERED_COLS:
+            if not math.isfinite(features[col]):
+                features[col] = 0
+        luxury_score = features['luxury_score']
+
+        # Property tier basé sur luxury_score
+        if luxury_score < 0.5:
+            property_tier = 'standard'
+        elif luxury_score < 1.0:
+            property_tier = 'upscale'
+        else:
+            property_tier = 'luxury'
+
+        if observe is not None:
+            now = time.perf_counter()
+            observe('engineer_features', now - start)
+            start = now
+
+        row = np.zeros((1, self.n_features))
+
+        # Standardiser les features numériques
+        values = np.array([features[col] for col in self.num_cols], dtype=float)
+        row[0, self.num_idx] = (values - self.mean) / self.scale if scale else values
+
+        if observe is not None:
+            now = time.perf_counter()
+            observe('scale', now - start)
+            start = now
+
+        # One-hot encoding
+        for col in (f'category_{category}', f'type_{transaction_type}',
+                    f'location_{location}', f'property_tier_{property_tier}'):
+            idx = self.col_index.get(col)
+            if idx is not None:
+                row[0, idx] = 1.0
+
+        if observe is not None:
+            observe('one_hot', time.perf_counter() - start)
+
+        return row
+
+    def build_many(self, properties, scale=True):
+        """
+        Construit en NumPy vectorisé les lignes de features de N biens
+        (mêmes formules, même ordre d'opérations que build: résultat identique
+        ligne à ligne).
+
+        Args:
+            properties (list): Tuples (room_count, bathroom_count, size,
+                location, category, transaction_type)
+            scale (bool): Standardiser les features numériques
+
+        Returns:
+            np.ndarray: Matrice (N, n_features)
+        """
+        n = len(properties)
+        rows = np.zeros((n, self.n_features))
+        if n == 0:
+            return rows
+
+        room_counts, bathroom_counts, sizes, locations, categories, types = zip(*properties)
+        locations = [self.normalize_location(loc) for loc in locations]
+        categories = [c if c in self.categories else 'Appartements' for c in categories]
+
+        room_count = np.array(room_counts, dtype=float)
+        bathroom_count = np.array(bathroom_counts, dtype=float)
+        size = np.array(sizes, dtype=float)
+        is_premium = np.array([loc in self.premium_locations for loc in locations], dtype=float)
+        is_upscale = np.array([loc in self.upscale_locations for loc in locations], dtype=float)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            features = {
+                'room_count': room_count,
+                'bathroom_count': bathroom_count,
+                'size': size,
+                'room_bathroom_ratio': room_count / np.maximum(bathroom_count, 1),
+                'total_rooms': room_count + bathroom_count,
+                'size_per_room': size / np.maximum(room_count, 1),
+                'bathroom_density': bathroom_count / np.maximum(size, 1),
+                'size_x_rooms': size * room_count,
+                'size_x_bathrooms': size * bathroom_count,
+                'is_premium_location': is_premium,
+                'is_upscale_location': is_upscale,
+                'location_price_level': np.array(
+                    [self.price_levels.get(loc, 1.0) for loc in locations], dtype=float),
+            }
+            features['luxury_score'] = (
+                (size / 100) * 0.3 +
+                (room_count / 5) * 0.2 +
+                (bathroom_count / 2) * 0.2 +
+                is_premium * 0.3 +
+                is_upscale * 0.15
+            )
+
+        # Valeurs infinies/NaN -> 0
+        for col in self.ENGINEERED_COLS:
+            values = features[col]
+            features[col] = np.where(np.isfinite(values), values, 0.0)
+        luxury_score = features['luxury_score']
+
+        property_tiers = np.select([luxury_score < 0.5, luxury_score < 1.0],
+                                   ['standard', 'upscale'], 'luxury')
+
+        # Standardiser les features numériques
+        values = np.column_stack([features[col] for col in self.num_cols])
+        rows[:, self.num_idx] = (values - self.mean) / self.scale if scale else values
+
+        # One-hot encoding: (ligne, colonne) des indicateurs présents dans feature_cols
+        row_idx, col_idx = [], []
+        col_index = self.col_index
+        for i, one_hot in enumerate(zip(categories, types, locations, property_tiers)):
+            for col in (f'category_{one_hot[0]}', f'type_{one_hot[1]}',
+                        f'location_{one_hot[2]}', f'property_tier_{one_hot[3]}'):
+                idx = col_index.get(col)
+                if idx is not None:
+                    row_idx.append(i)
+                    col_idx.append(idx)
+        rows[row_idx, col_idx] = 1.0
+
+        return rows
@@ -1,6 +1,13 @@
 import numpy as np
 
-def engineer_features(data, location, premium_locations):
+def _location_flag(location, locations):
+    """Indicateur 0/1 d'appartenance à une liste de zones (scalaire ou vecteur)"""
+    if isinstance(location, str):
+        return int(location in locations)
+    return np.isin(np.asarray(location), list(locations)).astype(int)
+
+
+def engineer_features(data, location, premium_locations, upscale_locations=()):
     """
     Applique le feature engineering SANS DATA LEAKAGE.
     
@@ -8,8 +15,9 @@ def engineer_features(data, location, premium_locations):
     
     Args:
         data (pd.DataFrame): DataFrame avec les features de base
-        location (str): Nom de la ville
+        location (str | array-like): Nom de la ville, ou une ville par ligne
         premium_locations (list): Liste des zones premium
+        upscale_locations (list): Liste des zones haut de gamme
     
     Returns:
         pd.DataFrame: DataFrame avec features ajoutées
@@ -23,15 +31,17 @@ def engineer_features(data, location, premium_locations):
     data['size_x_rooms'] = data['size'] * data['room_count']
     data['size_x_bathrooms'] = data['size'] * data['bathroom_count']
     
-    # Premium location indicator (liste prédéfinie)
-    data['is_premium_location'] = int(location in premium_locations)
+    # Premium / upscale location indicators (listes prédéfinies)
+    data['is_premium_location'] = _location_flag(location, premium_locations)
+    data['is_upscale_location'] = _location_flag(location, upscale_locations)
     
     # Luxury score (SANS LEAKAGE - basé uniquement sur features disponibles)
     data['luxury_score'] = (
         (data['size'] / 100) * 0.3 +           # Surface normalisée
         (data['room_count'] / 5) * 0.2 +       # Nombre de chambres normalisé
         (data['bathroom_count'] / 2) * 0.2 +   # Nombre de SdB normalisé
-        data['is_premium_location'] * 0.3      # Bonus zone premium
+        data['is_premium_location'] * 0.3 +    # Bonus zone premium
+        data['is_upscale_location'] * 0.15     # Bonus zone upscale
     )
     
     # Gestion des valeurs infinies/NaN
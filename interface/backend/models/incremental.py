@@ -0,0 +1,276 @@
+# =============================================================================
+# incremental.py - Mise à jour incrémentale du Ridge servi
+#
+# L'entraînement (models/train.py) enregistre les statistiques suffisantes
+# du jeu sur les features brutes: poids total, moyennes et co-moments
+# centrés de [X, y]. De nouvelles annonces nettoyées y sont fusionnées,
+# puis scaler et Ridge sont recalculés (système p x p) sans relire
+# l'historique. Un facteur --decay < 1 réduit le poids des données déjà
+# apprises à chaque mise à jour.
+#
+# feature_cols, location_stats et les bornes de property_tier restent ceux
+# du dernier entraînement complet (ville absente -> niveau 1.0, comme au
+# serving): python -m models.train les recalcule.
+#
+# Usage (depuis interface/backend):
+#     python -m models.incremental nouvelles_annonces.csv
+#     python -m models.incremental nouvelles_annonces.csv --decay 0.9
+# =============================================================================
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+STATS_FILENAME = 'ridge_stats.npz'
+STATS_FORMAT_VERSION = 1
+
+
+class RidgeStatistics:
+    """
+    Statistiques suffisantes d'un StandardScaler + Ridge sur features brutes.
+
+    Les co-moments centrés (plutôt que XᵀX brut) évitent les pertes de
+    précision sur les features de grande amplitude (size_x_rooms...);
+    XᵀX, Xᵀy et les moments du scaler s'en déduisent.
+    """
+
+    def __init__(self, feature_cols, num_cols, weight, mean, comoment, rows,
+                 tier_edges, alpha, fit_intercept):
+        """
+        Args:
+            feature_cols (list): Colonnes du modèle (ordre de X)
+            num_cols (list): Colonnes standardisées, dans l'ordre du scaler
+            weight (float): Somme des poids des lignes apprises
+            mean (np.ndarray): Moyenne pondérée de [X, y] (p + 1)
+            comoment (np.ndarray): Σ w (z - mean)(z - mean)ᵀ pour z = [x, y]
+            rows (int): Nombre de lignes apprises
+            tier_edges (np.ndarray): Bornes de property_tier de l'entraînement
+            alpha (float): Régularisation du Ridge
+            fit_intercept (bool): Ridge avec intercept
+        """
+        self.feature_cols = list(feature_cols)
+        self.num_cols = [col for col in num_cols if col in self.feature_cols]
+        self.weight = float(weight)
+        self.mean = np.asarray(mean, dtype=float)
+        self.comoment = np.asarray(comoment, dtype=float)
+        self.rows = int(rows)
+        self.tier_edges = np.asarray(tier_edges, dtype=float)
+        self.alpha = float(alpha)
+        self.fit_intercept = bool(fit_intercept)
+
+    @staticmethod
+    def _moments(X, y, sample_weight=None):
+        """(poids, moyenne, co-moment) d'un paquet de lignes"""
+        Z = np.column_stack([np.asarray(X, dtype=float), np.asarray(y, dtype=float)])
+        w = np.ones(len(Z)) if sample_weight is None else np.asarray(sample_weight, dtype=float)
+        weight = w.sum()
+        mean = w @ Z / weight
+        centered = Z - mean
+        return weight, mean, centered.T @ (centered * w[:, None])
+
+    @classmethod
+    def from_rows(cls, X, y, feature_cols, num_cols, tier_edges, alpha, fit_intercept,
+                  sample_weight=None):
+        """Statistiques d'un jeu complet (features brutes, non standardisées)"""
+        weight, mean, comoment = cls._moments(X, y, sample_weight)
+        return cls(feature_cols, num_cols, weight, mean, comoment, len(X),
+                   tier_edges, alpha, fit_intercept)
+
+    def update(self, X, y, decay=1.0, sample_weight=None):
+        """
+        Fusionne de nouvelles lignes (formule de Chan pour moyennes et co-moments).
+
+        Args:
+            X (array-like): Features brutes des nouvelles lignes (ordre feature_cols)
+            y (array-like): log_price des nouvelles lignes
+            decay (float): Facteur appliqué au poids des données déjà apprises
+            sample_weight (array-like): Poids des nouvelles lignes (défaut 1)
+        """
+        if not 0 < decay <= 1:
+            raise ValueError(f"decay must be in (0, 1], got {decay}")
+        self.weight *= decay
+        self.comoment *= decay
+        if len(X) == 0:
+            return self
+
+        weight, mean, comoment = self._moments(X, y, sample_weight)
+        total = self.weight + weight
+        delta = mean - self.mean
+        self.comoment += comoment + np.outer(delta, delta) * (self.weight * weight / total)
+        self.mean = self.mean + delta * (weight / total)
+        self.weight = total
+        self.rows += len(X)
+        return self
+
+    def _standardization(self):
+        """Décalage et échelle par colonne de X (identité hors num_cols), variance des num_cols"""
+        p = len(self.feature_cols)
+        num_idx = [self.feature_cols.index(col) for col in self.num_cols]
+        var = np.diag(self.comoment)[:p][num_idx] / self.weight
+        scale = np.sqrt(var)
+        # Colonne constante: échelle 1 (comme StandardScaler)
+        scale[scale < 10 * np.finfo(float).eps] = 1.0
+        shift, factor = np.zeros(p), np.ones(p)
+        shift[num_idx] = self.mean[:p][num_idx]
+        factor[num_idx] = scale
+        return shift, factor, var
+
+    def scaler(self):
+        """StandardScaler équivalent à un fit sur toutes les lignes apprises"""
+        from sklearn.preprocessing import StandardScaler
+
+        shift, factor, var = self._standardization()
+        num_idx = [self.feature_cols.index(col) for col in self.num_cols]
+        scaler = StandardScaler()
+        scaler.mean_ = shift[num_idx]
+        scaler.var_ = var
+        scaler.scale_ = factor[num_idx]
+        scaler.n_samples_seen_ = self.rows
+        scaler.n_features_in_ = len(self.num_cols)
+        scaler.feature_names_in_ = np.array(self.num_cols, dtype=object)
+        return scaler
+
+    def solve(self, alpha=None, random_state=42):
+        """
+        Ridge sur les features standardisées, résolu depuis les statistiques.
+
+        Args:
+            alpha (float): Régularisation (défaut: celle de l'entraînement)
+
+        Returns:
+            Ridge: Modèle avec coef_ et intercept_ renseignés
+        """
+        from sklearn.linear_model import Ridge
+
+        alpha = self.alpha if alpha is None else float(alpha)
+        p = len(self.feature_cols)
+        shift, factor, _ = self._standardization()
+        C_xx, C_xy = self.comoment[:p, :p], self.comoment[:p, p]
+        mean_x, mean_y = self.mean[:p], self.mean[p]
+
+        if self.fit_intercept:
+            # Données centrées: le décalage du scaler disparaît
+            gram = C_xx / np.outer(factor, factor)
+            rhs = C_xy / factor
+        else:
+            # Z = (X - shift) / factor non centrée: ZᵀZ = C + w (m - shift)(m - shift)ᵀ
+            offset = mean_x - shift
+            gram = (C_xx + self.weight * np.outer(offset, offset)) / np.outer(factor, factor)
+            rhs = (C_xy + self.weight * offset * mean_y) / factor
+
+        coef = np.linalg.solve(gram + alpha * np.eye(p), rhs)
+        intercept = mean_y - ((mean_x - shift) / factor) @ coef if self.fit_intercept else 0.0
+
+        model = Ridge(alpha=alpha, fit_intercept=self.fit_intercept, random_state=random_state)
+        model.coef_ = coef
+        model.intercept_ = float(intercept)
+        model.n_features_in_ = p
+        model.feature_names_in_ = np.array(self.feature_cols, dtype=object)
+        return model
+
+    def save(self, path):
+        """Écrit les statistiques (.npz sans pickle, métadonnées en JSON)"""
+        meta = {
+            'format_version': STATS_FORMAT_VERSION,
+            'feature_cols': self.feature_cols,
+            'num_cols': self.num_cols,
+            'weight': self.weight,
+            'rows': self.rows,
+            'alpha': self.alpha,
+            'fit_intercept': self.fit_intercept,
+        }
+        tmp_path = f'{path}.tmp-{os.getpid()}.npz'
+        np.savez(tmp_path, meta=np.array(json.dumps(meta, ensure_ascii=False)),
+                 mean=self.mean, comoment=self.comoment, tier_edges=self.tier_edges)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Raises:
+            ValueError: Si le format n'est pas supporté
+        """
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta.get('format_version') != STATS_FORMAT_VERSION:
+                raise ValueError(f"unsupported statistics format {meta.get('format_version')}")
+            return cls(meta['feature_cols'], meta['num_cols'], meta['weight'], data['mean'],
+                       data['comoment'], meta['rows'], data['tier_edges'], meta['alpha'],
+                       meta['fit_intercept'])
+
+
+def featurize(df, stats, location_stats, premium_locations, upscale_locations):
+    """
+    Features brutes de nouvelles lignes nettoyées, dans la disposition de
+    l'entraînement (feature_cols, niveaux de prix et bornes figés).
+
+    Returns:
+        tuple: (X np.ndarray, y np.ndarray)
+    """
+    from .train import add_features, encode
+
+    df, _ = add_features(df, stats.tier_edges, premium_locations, upscale_locations)
+    X, y, _ = encode(df, location_stats, stats.feature_cols)
+    return X.to_numpy(dtype=float), y.to_numpy(dtype=float)
+
+
+def main():
+    import joblib
+    import pandas as pd
+    import sklearn.linear_model  # noqa: F401 (import hors de la mesure de temps)
+    import sklearn.preprocessing  # noqa: F401
+
+    from config import OUTPUT_DIR
+    from .train import pickle_paths, publish_bundle
+
+    parser = argparse.ArgumentParser(description="Mise à jour incrémentale du Ridge servi")
+    parser.add_argument('data', nargs='+', help="CSV nettoyés des nouvelles annonces")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR,
+                        help="Dossier des pickles, des statistiques et du bundle")
+    parser.add_argument('--decay', type=float, default=1.0,
+                        help="Poids gardé par les données déjà apprises (1 = aucun oubli)")
+    parser.add_argument('--alpha', type=float,
+                        help="Nouvelle régularisation, gardée pour les mises à jour suivantes "
+                             "(défaut: celle des statistiques)")
+    parser.add_argument('--no-bundle', action='store_true', help="Ne pas écrire le bundle")
+    args = parser.parse_args()
+
+    stats_path = os.path.join(args.output_dir, STATS_FILENAME)
+    if not os.path.exists(stats_path):
+        print(f"❌ {stats_path} absent: lancer d'abord python -m models.train")
+        return 1
+    stats = RidgeStatistics.load(stats_path)
+    paths = pickle_paths(args.output_dir)
+    location_stats = joblib.load(paths['location_stats'])
+    premium_locations = joblib.load(paths['premium_locations'])
+    upscale_locations = joblib.load(paths['upscale_locations'])
+    new_rows = pd.concat([pd.read_csv(path) for path in args.data], ignore_index=True)
+
+    start = time.perf_counter()
+    X, y = featurize(new_rows, stats, location_stats, premium_locations, upscale_locations)
+    stats.update(X, y, decay=args.decay)
+    if args.alpha is not None:
+        # Enregistrée avec les statistiques: le modèle servi et les mises à
+        # jour suivantes utilisent la même régularisation
+        stats.alpha = args.alpha
+    scaler, model = stats.scaler(), stats.solve()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"{len(new_rows)} lignes ajoutées ({stats.rows} apprises, poids {stats.weight:.1f}) "
+          f"en {elapsed_ms:.1f} ms")
+
+    joblib.dump(model, paths['model'])
+    joblib.dump(scaler, paths['scaler'])
+    stats.save(stats_path)
+    print(f"Modèle et scaler écrits dans {args.output_dir}")
+
+    if not args.no_bundle:
+        publish_bundle(paths, args.output_dir)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+# =============================================================================
+# linear_kernel.py - Scaler + Ridge + bias compilés en un seul noyau affine
+# (persisté dans le bundle du modèle, voir bundle.py)
+# =============================================================================
+
+import hashlib
+
+import numpy as np
+
+
+def artifacts_fingerprint(paths, extra=''):
+    """Empreinte SHA-256 des artefacts sources (détecte un bundle périmé)"""
+    digest = hashlib.sha256(extra.encode('utf-8'))
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class LinearKernel:
+    """
+    Noyau linéaire fusionné: log10(prix) = X_brut @ weights + intercept.
+
+    Le StandardScaler est absorbé dans les coefficients du Ridge et les
+    facteurs de correction de biais par type de transaction sont ajoutés
+    (en log10) aux poids des colonnes one-hot 'type_*'. X_brut est la
+    ligne de features non standardisée.
+    """
+
+    def __init__(self, weights, intercept, feature_cols, fingerprint=''):
+        self.weights = np.ascontiguousarray(weights, dtype=float)
+        self.intercept = float(intercept)
+        self.feature_cols = list(feature_cols)
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def compile(cls, model, scaler, feature_cols, num_cols, bias_factors, fingerprint=''):
+        """
+        Replie scaler et bias dans les coefficients du modèle.
+
+        Args:
+            model: Modèle linéaire ajusté (coef_, intercept_)
+            scaler (StandardScaler): Scaler ajusté sur num_cols
+            feature_cols (list): Colonnes attendues par le modèle
+            num_cols (list): Features numériques standardisées, dans l'ordre du scaler
+            bias_factors (dict): Facteur multiplicatif par type de transaction
+            fingerprint (str): Empreinte des artefacts sources
+
+        Returns:
+            LinearKernel: Noyau compilé
+        """
+        col_index = {col: i for i, col in enumerate(feature_cols)}
+        weights = np.array(model.coef_, dtype=float).ravel().copy()
+        intercept = float(np.ravel(model.intercept_)[0])
+
+        # (x - mean) / scale  ->  x / scale - mean / scale
+        num_cols_present = [col for col in num_cols if col in col_index]
+        num_idx = np.array([col_index[col] for col in num_cols_present], dtype=np.intp)
+        mean = np.asarray(scaler.mean_, dtype=float)
+        scale = np.asarray(scaler.scale_, dtype=float)
+        intercept -= float(np.dot(weights[num_idx], mean / scale))
+        weights[num_idx] = weights[num_idx] / scale
+
+        # prix * bias[type]  ->  log10(prix) + log10(bias[type])
+        for transaction_type, factor in bias_factors.items():
+            idx = col_index.get(f'type_{transaction_type}')
+            if idx is not None:
+                weights[idx] += np.log10(factor)
+
+        return cls(weights, intercept, feature_cols, fingerprint)
+
+    def predict_log(self, X):
+        """log10 du prix corrigé pour une matrice de features brutes"""
+        return X @ self.weights + self.intercept
+
+    def predict(self, X):
+        """Prix corrigé (bias inclus) pour une matrice de features brutes"""
+        return 10 ** self.predict_log(X)
+
+
+def verify_kernel(kernel, reference_predict, prepare_raw, cases, rtol=1e-9):
+    """
+    Vérifie l'équivalence du noyau avec le pipeline joblib.
+
+    Args:
+        kernel (LinearKernel): Noyau compilé
+        reference_predict (callable): properties -> prix (pipeline scaler + modèle)
+        prepare_raw (callable): properties -> matrice de features brutes
+        cases (list): Biens de test
+        rtol (float): Tolérance relative
+
+    Returns:
+        float: Écart relatif maximal observé
+
+    Raises:
+        ValueError: Si l'écart dépasse rtol
+    """
+    expected = np.asarray(reference_predict(cases), dtype=float)
+    actual = kernel.predict(prepare_raw(cases))
+    max_rel_error = float(np.max(np.abs(actual - expected) / np.abs(expected)))
+    if max_rel_error > rtol:
+        raise ValueError(f"kernel mismatch: max relative error {max_rel_error:.3e} > {rtol:.0e}")
+    return max_rel_error
+
@@ -2,31 +2,309 @@
 # prediction.py - Module de prédiction sans data leakage
 # =============================================================================
 
-import joblib
-import pandas as pd
+import time
+
 import numpy as np
 from .feature_engineering import engineer_features
+from .feature_builder import FeatureBuilder
+from .bundle import load_serving_bundle
+from .cache import PredictionCache
+from .registry import ModelRegistry
+from .batcher import MicroBatcher
 from utils.constants import VILLES, CATEGORIES, TYPES_TRANSACTION
-from config import (MODEL_PATH, SCALER_PATH, FEATURES_PATH, 
-                   LOCATION_STATS_PATH, PREMIUM_LOCATIONS_PATH)
+from utils.metrics import metrics, stage_observer
+from config import (MODEL_PATH, SCALER_PATH, FEATURES_PATH,
+                   LOCATION_STATS_PATH, PREMIUM_LOCATIONS_PATH,
+                   UPSCALE_LOCATIONS_PATH, BUNDLE_DIR,
+                   PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL,
+                   MODEL_MAX_RESIDENT, MODEL_WARMUP_SIZE,
+                   MICROBATCH_ENABLED, MICROBATCH_MAX_WAIT_MS, MICROBATCH_MAX_SIZE)
+
+# Pickles produits par l'entraînement (sources du bundle)
+PICKLE_PATHS = {
+    'model': MODEL_PATH,
+    'scaler': SCALER_PATH,
+    'feature_cols': FEATURES_PATH,
+    'location_stats': LOCATION_STATS_PATH,  # Stats de location (train set)
+    'premium_locations': PREMIUM_LOCATIONS_PATH,  # Zones premium
+    'upscale_locations': UPSCALE_LOCATIONS_PATH,  # Zones haut de gamme
+}
+
+# Features numériques standardisées (même ordre que lors du fit du scaler)
+NUM_COLS = ['room_count', 'bathroom_count', 'size', 'room_bathroom_ratio',
+            'total_rooms', 'size_per_room', 'bathroom_density',
+            'size_x_rooms', 'size_x_bathrooms', 'luxury_score',
+            'is_premium_location', 'is_upscale_location', 'location_price_level']
+
+# Bias correction basé sur le type (calculé lors de l'entraînement)
+BIAS_FACTORS = {'À Vendre': 1.0022, 'À Louer': 0.9935}
+
+
+class ServingModel:
+    """
+    Une version du modèle prête à servir: bundle, FeatureBuilder (chemin
+    rapide sans pandas) et noyau linéaire fusionné.
+    """
+
+    def __init__(self, bundle):
+        self.bundle = bundle
+        self.version = bundle.version
+        self.feature_cols = bundle.feature_cols
+        self.premium_locations = bundle.premium_locations
+        self.upscale_locations = bundle.upscale_locations
+        self.feature_builder = FeatureBuilder(
+            bundle.feature_cols, bundle.scaler_mean, bundle.scaler_scale,
+            bundle.price_levels, bundle.premium_locations, bundle.upscale_locations,
+            bundle.num_cols, VILLES, CATEGORIES,
+        )
+        self.normalize_location = self.feature_builder.normalize_location
+
+        # Noyau fusionné: aucun appel sklearn au moment de la requête
+        self.kernel = bundle.kernel()
+
+    def _predict_log(self, X):
+        """Prédiction en log-space (features standardisées, sans bias)"""
+        if self.bundle.is_linear:
+            coef, intercept = self.bundle.linear_params()
+            return X @ coef + intercept
+        import pandas as pd
+        return self.bundle.model.predict(pd.DataFrame(X, columns=self.feature_cols))
+
+    def prepare_batch(self, properties, scale=True, observe=None):
+        """
+        Prépare en une seule passe la matrice de features de N biens.
+
+        Le feature engineering, l'encodage one-hot et la standardisation sont
+        appliqués une seule fois sur l'ensemble du lot.
+
+        Args:
+            properties (list): Tuples (room_count, bathroom_count, size,
+                location, category, transaction_type)
+            scale (bool): Standardiser les features numériques
+            observe (callable): observe(étape, secondes) (None = aucune mesure)
+
+        Returns:
+            tuple: (X_pred DataFrame de N lignes, liste des transaction_type)
+        """
+
+        # Import différé: le chemin unitaire n'a pas besoin de pandas
+        import pandas as pd
+
+        if observe is not None:
+            start = time.perf_counter()
+
+        room_counts, bathroom_counts, sizes, locations, categories, types = (
+            zip(*properties) if properties else ([],) * 6
+        )
+
+        # Normaliser les inputs
+        locations = [self.normalize_location(loc) for loc in locations]
+        categories = [c if c in CATEGORIES else 'Appartements' for c in categories]
+
+        # Créer DataFrame de base
+        input_data = pd.DataFrame({
+            'room_count': room_counts,
+            'bathroom_count': bathroom_counts,
+            'size': sizes,
+            'category': categories,
+            'type': types,
+            'location': locations
+        })
+
+        if observe is not None:
+            now = time.perf_counter()
+            observe('normalize', now - start)
+            start = now
+
+        # Feature engineering (sans leakage!)
+        input_data = engineer_features(input_data, input_data['location'],
+                                       self.premium_locations, self.upscale_locations)
+
+        # Ajouter location_price_level (calculé sur train set)
+        # Ville inconnue -> utiliser la médiane (1.0)
+        input_data['location_price_level'] = (
+            input_data['location'].map(self.feature_builder.price_levels).fillna(1.0)
+        )
+
+        # Créer property_tier basé sur luxury_score
+        luxury_score = input_data['luxury_score'].values
+        input_data['property_tier'] = np.select(
+            [luxury_score < 0.5, luxury_score < 1.0], ['standard', 'upscale'], 'luxury'
+        )
+
+        if observe is not None:
+            now = time.perf_counter()
+            observe('engineer_features', now - start)
+            start = now
+
+        # One-hot encoding, aligné sur les features attendues
+        input_encoded = pd.get_dummies(input_data,
+                                        columns=['category', 'type', 'location', 'property_tier'])
+        X_pred = input_encoded.reindex(columns=self.feature_cols, fill_value=0)
+
+        if observe is not None:
+            now = time.perf_counter()
+            observe('one_hot', now - start)
+            start = now
+
+        # Standardiser les features numériques (mêmes opérations que StandardScaler)
+        num_cols_present = self.feature_builder.num_cols
+        if scale:
+            X_pred[num_cols_present] = (
+                (X_pred[num_cols_present].to_numpy(dtype=float) - self.feature_builder.mean)
+                / self.feature_builder.scale
+            )
+
+        if observe is not None:
+            observe('scale', time.perf_counter() - start)
+
+        return X_pred, list(types)
+
+    def predict_prices(self, properties, observe=None):
+        """Prix corrigés (bias inclus) de N biens, sans cache"""
+        if self.kernel is not None:
+            # Noyau fusionné: scaler et bias déjà inclus dans les poids
+            X_raw, _ = self.prepare_batch(properties, scale=False, observe=observe)
+            if observe is not None:
+                start = time.perf_counter()
+            prices = self.kernel.predict(X_raw.to_numpy(dtype=float))
+            if observe is not None:
+                observe('model_predict', time.perf_counter() - start)
+            return prices
+
+        X_pred, prop_types = self.prepare_batch(properties, observe=observe)
+        if observe is not None:
+            start = time.perf_counter()
+
+        # Prédiction en log-space puis back-transform
+        price_pred = 10 ** self._predict_log(X_pred.to_numpy(dtype=float))
+
+        # Bias correction par type de transaction
+        bias = np.array([self.bundle.bias_factors.get(t, 1.0) for t in prop_types])
+        if observe is not None:
+            observe('model_predict', time.perf_counter() - start)
+        return price_pred * bias
+
+    def predict_many(self, properties):
+        """
+        Prix corrigés de N biens par le chemin NumPy (FeatureBuilder.build_many):
+        mêmes features que N appels à predict_one, prix égaux à l'arrondi
+        près (ordre de sommation du produit matriciel). Utilisé par le
+        micro-batching.
+        """
+        if self.kernel is not None:
+            return self.kernel.predict(self.feature_builder.build_many(properties, scale=False))
+
+        price_pred = 10 ** self._predict_log(self.feature_builder.build_many(properties))
+        bias = np.array([self.bundle.bias_factors.get(prop[5], 1.0) for prop in properties])
+        return price_pred * bias
+
+    def predict_one(self, room_count, bathroom_count, size, location, category,
+                    transaction_type, observe=None):
+        """Prix corrigé (bias inclus) d'un bien, sans cache"""
+        if self.kernel is not None:
+            # Noyau fusionné: une ligne brute, un produit scalaire
+            X_raw = self.feature_builder.build(room_count, bathroom_count, size, location,
+                                               category, transaction_type, scale=False,
+                                               observe=observe)
+            if observe is not None:
+                start = time.perf_counter()
+            price_pred = self.kernel.predict(X_raw)[0]
+            if observe is not None:
+                observe('model_predict', time.perf_counter() - start)
+            return price_pred
+
+        # Préparer les données (sans leakage!)
+        X_pred = self.feature_builder.build(
+            room_count, bathroom_count, size, location, category, transaction_type,
+            observe=observe
+        )
+        if observe is not None:
+            start = time.perf_counter()
+
+        # Prédiction en log-space puis back-transform
+        price_pred = 10 ** self._predict_log(X_pred)[0]
+
+        # Bias correction basé sur le type
+        price_pred *= self.bundle.bias_factors.get(transaction_type, 1.0)
+        if observe is not None:
+            observe('model_predict', time.perf_counter() - start)
+        return price_pred
+
+
+# Cache des prédictions, clés préfixées par la version du modèle
+prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL)
+
+# Registre des versions: la version initiale est chargée paresseusement au
+# premier appel (import du module quasi gratuit), les suivantes à chaud
+registry = ModelRegistry(
+    BUNDLE_DIR,
+    model_factory=ServingModel,
+    initial_loader=lambda: load_serving_bundle(BUNDLE_DIR, PICKLE_PATHS, NUM_COLS, BIAS_FACTORS),
+    cache=prediction_cache,
+    max_resident=MODEL_MAX_RESIDENT,
+    warmup_size=MODEL_WARMUP_SIZE,
+)
+
+# Mesure des étapes (None si METRICS_ENABLED=0: aucune lecture d'horloge)
+observe_single = stage_observer('single')
+observe_batch = stage_observer('batch')
+PREDICTIONS_TOTAL = metrics.counter(
+    'predictions_total', 'Predicted properties by model version and source (cache or model)',
+    ('version', 'source'))
+
+# Micro-batching des prédictions unitaires concurrentes (opt-in)
+MICROBATCH_SIZE = metrics.histogram(
+    'microbatch_size', 'Properties per coalesced micro-batch',
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256))
+batcher = MicroBatcher(
+    lambda model, properties: model.predict_many(properties),
+    max_batch_size=MICROBATCH_MAX_SIZE,
+    max_wait=MICROBATCH_MAX_WAIT_MS / 1000,
+    observe_size=MICROBATCH_SIZE.observe if metrics.enabled else None,
+) if MICROBATCH_ENABLED else None
+
+
+def get_model():
+    """Retourne la version active du modèle (bundle memory-mappé chargé au premier appel)"""
+    return registry.active
+
+
+def normalize_location(location):
+    """Normalise une ville (case-insensitive), 'tunis' par défaut"""
+    return get_model().normalize_location(location)
 
-# Charger les objets
-model = joblib.load(MODEL_PATH)
-scaler = joblib.load(SCALER_PATH)
-feature_cols = joblib.load(FEATURES_PATH)
-location_stats = joblib.load(LOCATION_STATS_PATH)  # Stats de location (train set)
-premium_locations = joblib.load(PREMIUM_LOCATIONS_PATH)  # Zones premium
+
+def cache_key(room_count, bathroom_count, size, location, category, transaction_type):
+    """Entrées après normalisation ville/catégorie (sans la version du modèle)"""
+    if category not in CATEGORIES:
+        category = 'Appartements'
+    return (room_count, bathroom_count, size, normalize_location(location),
+            category, transaction_type)
+
+
+def prepare_batch(properties, scale=True):
+    """
+    Prépare la matrice de features de N biens (voir ServingModel.prepare_batch).
+
+    Returns:
+        tuple: (X_pred DataFrame de N lignes, liste des transaction_type)
+    """
+    return get_model().prepare_batch(properties, scale=scale)
 
 
 def prepare_input(room_count, bathroom_count, size, location, category, transaction_type):
     """
     Prépare les données d'entrée pour la prédiction SANS DATA LEAKAGE.
-    
+
+    Chemin rapide sans pandas (FeatureBuilder précompilé), identique
+    bit à bit à prepare_batch pour un seul bien.
+
     Utilise:
     - luxury_score: calculé à partir de features disponibles
     - location_price_level: stats calculées sur train set
     - property_tier: basé sur luxury_score
-    
+
     Args:
         room_count (int): Nombre de chambres
         bathroom_count (int): Nombre de salles de bain
@@ -34,83 +312,76 @@ def prepare_input(room_count, bathroom_count, size, location, category, transact
         location (str): Ville
         category (str): Type de bien
         transaction_type (str): 'À Vendre' ou 'À Louer'
-    
+
     Returns:
-        tuple: (X_pred DataFrame, transaction_type)
+        tuple: (X_pred np.ndarray (1, n_features), transaction_type)
     """
-    
-    # Normaliser les inputs (case-insensitive pour les villes)
-    location_normalized = location.strip()
-    if location_normalized.lower() not in [v.lower() for v in VILLES]:
-        location_normalized = 'tunis'  # Ville par défaut
-    
-    if category not in CATEGORIES:
-        category = 'Appartements'  # Catégorie par défaut
-    
-    # Créer DataFrame de base
-    input_data = pd.DataFrame({
-        'room_count': [room_count],
-        'bathroom_count': [bathroom_count],
-        'size': [size],
-        'category': [category],
-        'type': [transaction_type],
-        'location': [location_normalized]
-    })
-    
-    # Feature engineering (sans leakage!)
-    input_data = engineer_features(input_data, location_normalized, premium_locations)
-    
-    # Ajouter location_price_level (calculé sur train set)
-    location_match = location_stats[
-        location_stats['location'].str.lower() == location_normalized.lower()
-    ]
-    
-    if len(location_match) > 0:
-        input_data['location_price_level'] = location_match['location_price_level'].values[0]
-    else:
-        # Ville inconnue -> utiliser la médiane (1.0)
-        input_data['location_price_level'] = 1.0
-    
-    # Créer property_tier basé sur luxury_score
-    luxury_score = input_data['luxury_score'].values[0]
-    if luxury_score < 0.5:
-        property_tier = 'standard'
-    elif luxury_score < 1.0:
-        property_tier = 'upscale'
-    else:
-        property_tier = 'luxury'
-    
-    input_data['property_tier'] = property_tier
-    
-    # One-hot encoding
-    input_encoded = pd.get_dummies(input_data, 
-                                    columns=['category', 'type', 'location', 'property_tier'])
-    
-    # Créer DataFrame avec toutes les features attendues
-    X_pred = pd.DataFrame(0, index=[0], columns=feature_cols)
-    
-    # Remplir les colonnes présentes
-    for col in input_encoded.columns:
-        if col in X_pred.columns:
-            X_pred[col] = input_encoded[col].values
-    
-    # Standardiser les features numériques
-    num_cols = ['room_count', 'bathroom_count', 'size', 'room_bathroom_ratio', 
-                'total_rooms', 'size_per_room', 'bathroom_density',
-                'size_x_rooms', 'size_x_bathrooms', 'luxury_score',
-                'is_premium_location', 'location_price_level']
-    
-    # Ne transformer que les colonnes présentes
-    num_cols_present = [col for col in num_cols if col in X_pred.columns]
-    X_pred[num_cols_present] = scaler.transform(X_pred[num_cols_present])
-    
+
+    X_pred = get_model().feature_builder.build(
+        room_count, bathroom_count, size, location, category, transaction_type
+    )
     return X_pred, transaction_type
 
 
+def predict_batch(properties):
+    """
+    Prédit le prix de N propriétés en un seul appel au modèle.
+
+    Les biens déjà en cache ne repassent pas par le modèle.
+
+    Args:
+        properties (list): Tuples (room_count, bathroom_count, size,
+            location, category, transaction_type)
+
+    Returns:
+        tuple: (prix_prédits, conf_bas, conf_haut) sous forme de np.ndarray
+    """
+
+    observe = observe_batch
+    if observe is not None:
+        start = time.perf_counter()
+
+    price_pred = np.empty(len(properties))
+    keys = [cache_key(*prop) for prop in properties]
+
+    if observe is not None:
+        now = time.perf_counter()
+        observe('cache_key', now - start)
+        start = now
+
+    # Biens manquants, groupés par version servie (active ou candidate)
+    missing = {}
+    hits = {}
+    for i, key in enumerate(keys):
+        model = registry.route(key)
+        cached = prediction_cache.get((model.version,) + key)
+        if cached is None:
+            missing.setdefault(model, []).append(i)
+        else:
+            price_pred[i] = cached
+            hits[model.version] = hits.get(model.version, 0) + 1
+
+    if observe is not None:
+        observe('cache_lookup', time.perf_counter() - start)
+        for version, count in hits.items():
+            PREDICTIONS_TOTAL.inc((version, 'cache'), count)
+
+    for model, indices in missing.items():
+        computed = model.predict_prices([properties[i] for i in indices], observe=observe)
+        price_pred[indices] = computed
+        for i, price in zip(indices, computed):
+            prediction_cache.put((model.version,) + keys[i], price)
+        if observe is not None:
+            PREDICTIONS_TOTAL.inc((model.version, 'model'), len(indices))
+
+    # Intervalle de confiance (±20% pour l'immobilier)
+    return price_pred, price_pred * 0.8, price_pred * 1.2
+
+
 def predict_price(room_count, bathroom_count, size, location, category, transaction_type):
     """
     Prédit le prix d'une propriété.
-    
+
     Args:
         room_count (int): Nombre de chambres
         bathroom_count (int): Nombre de salles de bain
@@ -118,29 +389,51 @@ def predict_price(room_count, bathroom_count, size, location, category, transact
         location (str): Ville
         category (str): Type de bien
         transaction_type (str): 'À Vendre' ou 'À Louer'
-    
+
     Returns:
         tuple: (prix_prédit, intervalle_conf_bas, intervalle_conf_haut)
     """
-    
-    # Préparer les données (sans leakage!)
-    X_pred, prop_type = prepare_input(
-        room_count, bathroom_count, size, location, category, transaction_type
-    )
-    
-    # Prédiction en log-space
-    log_price_pred = model.predict(X_pred)[0]
-    
-    # Back-transform
-    price_pred = 10 ** log_price_pred
-    
-    # Bias correction basé sur le type (calculé lors de l'entraînement)
-    bias_factors = {'À Vendre': 1.0022, 'À Louer': 0.9935}
-    price_pred = price_pred * bias_factors.get(prop_type, 1.0)
-    
+
+    observe = observe_single
+    if observe is not None:
+        start = time.perf_counter()
+
+    key = cache_key(room_count, bathroom_count, size, location, category, transaction_type)
+
+    if observe is not None:
+        now = time.perf_counter()
+        observe('cache_key', now - start)
+        start = now
+
+    model = registry.route(key)
+    price_pred = prediction_cache.get((model.version,) + key)
+
+    if observe is not None:
+        observe('cache_lookup', time.perf_counter() - start)
+
+    if price_pred is None:
+        if batcher is not None:
+            # Regroupé avec les requêtes concurrentes (une passe vectorisée)
+            if observe is not None:
+                start = time.perf_counter()
+            price_pred = batcher.predict(model, (room_count, bathroom_count, size, location,
+                                                 category, transaction_type))
+            if observe is not None:
+                observe('microbatch', time.perf_counter() - start)
+        else:
+            price_pred = model.predict_one(
+                room_count, bathroom_count, size, location, category, transaction_type,
+                observe=observe
+            )
+        prediction_cache.put((model.version,) + key, price_pred)
+        source = 'model'
+    else:
+        source = 'cache'
+    if observe is not None:
+        PREDICTIONS_TOTAL.inc((model.version, source))
+
     # Intervalle de confiance (±20% pour l'immobilier)
     conf_low = price_pred * 0.8
     conf_high = price_pred * 1.2
-    
-    return price_pred, conf_low, conf_high
 
+    return price_pred, conf_low, conf_high
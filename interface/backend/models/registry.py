@@ -0,0 +1,265 @@
+import math
+import os
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+from .bundle import ModelBundle, current_version
+
+# État de routage immuable: remplacé d'un bloc (swap atomique)
+Routing = namedtuple('Routing', ['active', 'candidate', 'candidate_percent'])
+
+# Biens de contrôle pour valider une version avant de la servir
+PROBE_PROPERTIES = [
+    (3, 2, 120.0, 'tunis', 'Appartements', 'À Vendre'),
+    (1, 1, 35.0, 'sousse', 'Appartements', 'À Louer'),
+    (5, 3, 300.0, 'sfax', 'Maisons et Villas', 'À Vendre'),
+]
+
+
+class ModelRegistry:
+    """
+    Registre des versions du modèle résidentes en mémoire.
+
+    Une version est chargée et validée en arrière-plan, préchauffée dans le
+    cache, puis activée par remplacement atomique de l'état de routage: les
+    requêtes en cours gardent la référence vers leur version. Une version
+    candidate peut recevoir un pourcentage du trafic.
+    """
+
+    def __init__(self, bundle_root, model_factory, initial_loader, cache=None,
+                 max_resident=3, warmup_size=1000):
+        """
+        Args:
+            bundle_root (str): Dossier racine des bundles (<version>/, CURRENT)
+            model_factory (callable): ModelBundle -> ServingModel
+            initial_loader (callable): () -> ModelBundle servi au démarrage
+            cache (PredictionCache): Cache à préchauffer lors d'un swap
+            max_resident (int): Nombre maximal de versions gardées en mémoire
+            warmup_size (int): Nombre d'entrées récentes recalculées avant un swap
+        """
+        self.bundle_root = bundle_root
+        self.model_factory = model_factory
+        self.initial_loader = initial_loader
+        self.cache = cache
+        self.max_resident = max(max_resident, 2)
+        self.warmup_size = warmup_size
+
+        self._routing = None
+        self._models = {}
+        self._served = {}
+        self._lock = threading.RLock()
+        self._loading = set()
+        self._watcher = None
+        self._stop = threading.Event()
+        self.last_error = None
+        self.last_swap_at = None
+        # Dernière valeur de CURRENT prise en compte: seul un changement de
+        # CURRENT déclenche un rechargement (pas un écart avec la version active)
+        self._seen_current = None
+
+    # -------------------------
+    # Chargement et validation
+    # -------------------------
+    def _ensure_started(self):
+        """Charge la version initiale au premier appel"""
+        if self._routing is None:
+            with self._lock:
+                if self._routing is None:
+                    # Lu avant le chargement: un CURRENT publié pendant celui-ci sera vu
+                    self._seen_current = current_version(self.bundle_root)
+                    model = self._validate(self.model_factory(self.initial_loader()))
+                    self._models[model.version] = model
+                    self._routing = Routing(model, None, 0)
+
+    @staticmethod
+    def _validate(model):
+        """Vérifie qu'une version prédit des prix finis et positifs"""
+        if model.kernel is not None and len(model.kernel.weights) != len(model.feature_cols):
+            raise ValueError(f"model {model.version}: kernel does not match feature_cols")
+        prices = [model.predict_one(*prop) for prop in PROBE_PROPERTIES]
+        if not all(math.isfinite(p) and p > 0 for p in prices):
+            raise ValueError(f"model {model.version}: invalid probe predictions {list(prices)}")
+        return model
+
+    def load(self, version):
+        """
+        Charge et valide une version de <bundle_root>/<version>/ (sans l'activer).
+
+        Returns:
+            ServingModel: Version résidente
+        """
+        if not version or version.startswith('.') or os.sep in version or '/' in version:
+            raise ValueError(f"invalid model version {version!r}")
+        with self._lock:
+            if version in self._models:
+                return self._models[version]
+        bundle = ModelBundle.load(os.path.join(self.bundle_root, version))
+        model = self._validate(self.model_factory(bundle))
+        with self._lock:
+            return self._models.setdefault(model.version, model)
+
+    def load_async(self, version, activate=False):
+        """Charge une version dans un thread; l'active ensuite si demandé"""
+        with self._lock:
+            if version in self._loading:
+                return False
+            self._loading.add(version)
+
+        def worker():
+            try:
+                self.load(version)
+                if activate:
+                    self.activate(version)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = f"{version}: {e}"
+                print(f"⚠️  Échec du chargement du modèle {version}: {e}")
+            finally:
+                with self._lock:
+                    self._loading.discard(version)
+
+        threading.Thread(target=worker, name=f"model-load-{version}", daemon=True).start()
+        return True
+
+    # -------------------------
+    # Routage et swap atomique
+    # -------------------------
+    @property
+    def active(self):
+        self._ensure_started()
+        return self._routing.active
+
+    def route(self, key):
+        """
+        Version à utiliser pour une entrée. Le partage vers la candidate est
+        déterministe (hash de la clé): une même entrée va toujours au même modèle.
+        """
+        self._ensure_started()
+        routing = self._routing
+        model = routing.active
+        if routing.candidate is not None and routing.candidate_percent > 0:
+            if zlib.crc32(repr(key).encode('utf-8')) % 100 < routing.candidate_percent:
+                model = routing.candidate
+        # Compteur indicatif (non verrouillé pour rester hors du chemin critique)
+        self._served[model.version] = self._served.get(model.version, 0) + 1
+        return model
+
+    def activate(self, version):
+        """Active une version résidente après avoir préchauffé le cache"""
+        self._ensure_started()
+        with self._lock:
+            model = self._models[version]
+            previous = self._routing.active
+            if model is previous:
+                return model
+            self._warm_cache(previous, model)
+            candidate = self._routing.candidate
+            if candidate is model:
+                self._routing = Routing(model, None, 0)
+            else:
+                self._routing = Routing(model, candidate, self._routing.candidate_percent)
+            self.last_swap_at = time.time()
+            self._evict()
+        print(f"✓ Modèle {version} activé (précédent: {previous.version})")
+        return model
+
+    def set_candidate(self, version, percent):
+        """Route percent % du trafic vers une version résidente (None pour arrêter)"""
+        self._ensure_started()
+        if not 0 <= percent <= 100:
+            raise ValueError("percent must be between 0 and 100")
+        with self._lock:
+            candidate = self._models[version] if version is not None else None
+            if candidate is self._routing.active:
+                raise ValueError(f"model {version} is already active")
+            if candidate is not None and percent > 0:
+                self._warm_cache(self._routing.active, candidate)
+            self._routing = Routing(self._routing.active, candidate,
+                                    percent if candidate is not None else 0)
+            self._evict()
+
+    def _warm_cache(self, previous, model):
+        """Recalcule avec la nouvelle version les entrées récentes de l'ancienne"""
+        if self.cache is None or not self.cache.enabled or self.warmup_size <= 0:
+            return
+        keys = [key for key in self.cache.recent_keys(self.warmup_size)
+                if key[0] == previous.version]
+        if not keys:
+            return
+        prices = model.predict_prices([key[1:] for key in keys])
+        for key, price in zip(keys, prices):
+            self.cache.put((model.version,) + key[1:], price)
+
+    def _evict(self):
+        """Décharge les versions les plus anciennes au-delà de max_resident"""
+        routing = self._routing
+        in_use = {routing.active.version}
+        if routing.candidate is not None:
+            in_use.add(routing.candidate.version)
+        for version in list(self._models):
+            if len(self._models) <= self.max_resident:
+                break
+            if version not in in_use:
+                del self._models[version]
+                if self.cache is not None:
+                    self.cache.drop(lambda key, v=version: key[0] == v)
+
+    # -------------------------
+    # Surveillance de CURRENT
+    # -------------------------
+    def check_for_update(self, force=False):
+        """
+        Lance le chargement de la version pointée par CURRENT si CURRENT a
+        changé depuis la dernière vérification. Une version activée à la main
+        (retour arrière) ou reconstruite depuis les pickles au démarrage n'est
+        donc pas remplacée tant que CURRENT ne bouge pas.
+
+        Args:
+            force (bool): Charger CURRENT dès qu'elle diffère de la version
+                active, même déjà vue (rechargement explicite)
+        """
+        self._ensure_started()
+        version = current_version(self.bundle_root)
+        with self._lock:
+            changed = version != self._seen_current
+            self._seen_current = version
+        if version is None or version == self.active.version or not (changed or force):
+            return False
+        return self.load_async(version, activate=True)
+
+    def watch(self, interval):
+        """Surveille CURRENT toutes les interval secondes (thread démon)"""
+        if self._watcher is not None:
+            return
+
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.check_for_update()
+                except Exception as e:
+                    self.last_error = str(e)
+
+        self._watcher = threading.Thread(target=loop, name="model-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self):
+        """État du registre (pour l'API)"""
+        self._ensure_started()
+        routing = self._routing
+        with self._lock:
+            return {
+                "active": routing.active.version,
+                "candidate": routing.candidate.version if routing.candidate else None,
+                "candidate_percent": routing.candidate_percent,
+                "resident": sorted(self._models),
+                "loading": sorted(self._loading),
+                "current_on_disk": current_version(self.bundle_root),
+                "served": dict(self._served),
+                "last_swap_at": self.last_swap_at,
+                "last_error": self.last_error,
+            }
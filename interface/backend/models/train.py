@@ -0,0 +1,559 @@
+# =============================================================================
+# train.py - Entraînement reproductible du modèle servi (Ridge)
+#
+# Reconstruit les artefacts de output/ (best_model.pkl, scaler.pkl,
+# feature_cols.pkl, location_stats.pkl, premium_locations.pkl,
+# upscale_locations.pkl), les statistiques de models/incremental.py
+# (ridge_stats.npz) et le bundle à partir d'un CSV nettoyé, avec les
+# mêmes étapes que prediction/modeles_lineaires.ipynb:
+#   1. recherche de (alpha, fit_intercept) en CV 3-fold
+#   2. évaluation du meilleur modèle en CV 5-fold (métriques, bias factors)
+#   3. ajustement final sur toutes les données
+#
+# Une seule SVD par fold donne la solution Ridge pour tous les alphas; les
+# folds sont calculés en parallèle (threads: la SVD NumPy libère le GIL et
+# les workers partagent les données sans copie) et leurs factorisations
+# gardées en cache (clé: contenu du fold + configuration).
+#
+# Usage (depuis interface/backend):
+#     python -m models.train
+#     python -m models.train --data ../../data/clean/cleaned_data_filtered.csv --n-jobs 4
+#     python -m models.train --data ../../data/store
+#     python -m models.train --alphas 0.1 1 10 --output-dir /tmp/model --no-bundle
+# =============================================================================
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from .feature_engineering import engineer_features
+
+# Zones utilisées par les indicateurs is_premium_location / is_upscale_location
+PREMIUM_LOCATIONS = ['tunis', 'ariana', 'ben arous', 'la manouba']
+UPSCALE_LOCATIONS = ['nabeul', 'sousse', 'monastir', 'mahdia', 'bizerte']
+
+CATEGORICAL_COLS = ['category', 'type', 'location', 'property_tier']
+PROPERTY_TIERS = ['standard', 'upscale', 'luxury']
+TARGET = 'log_price'
+
+# Grille du notebook: le solver n'y change pas la solution (même minimum
+# pour auto/svd/cholesky/lsqr), seuls alpha et fit_intercept sont cherchés
+DEFAULT_CONFIG = {
+    'alphas': [0.001, 0.01, 0.1, 1.0, 10.0, 100.0],
+    'fit_intercept': [True, False],
+    'search_folds': 3,
+    'eval_folds': 5,
+    'random_state': 42,
+    'solver': 'auto',
+}
+
+# Changer ce numéro invalide le cache des folds
+CACHE_FORMAT_VERSION = 1
+
+# Noms des pickles lus par le serving (mêmes que le notebook)
+PICKLE_FILENAMES = {
+    'model': 'best_model.pkl',
+    'scaler': 'scaler.pkl',
+    'feature_cols': 'feature_cols.pkl',
+    'location_stats': 'location_stats.pkl',
+    'premium_locations': 'premium_locations.pkl',
+    'upscale_locations': 'upscale_locations.pkl',
+}
+
+
+# -------------------------
+# Préparation des données
+# -------------------------
+def property_tier_edges(luxury_score):
+    """Bornes des 3 intervalles égaux du luxury score (pd.cut bins=3), extrémités ouvertes"""
+    _, edges = pd.cut(luxury_score, bins=3, retbins=True)
+    edges[0], edges[-1] = -np.inf, np.inf
+    return edges
+
+
+def add_features(df, tier_edges=None, premium_locations=PREMIUM_LOCATIONS,
+                 upscale_locations=UPSCALE_LOCATIONS):
+    """
+    Features indépendantes du split (ratios, indicateurs de zone, luxury
+    score) et property_tier.
+
+    Args:
+        df (pd.DataFrame): Lignes nettoyées
+        tier_edges (array): Bornes de property_tier (None = calculées sur df)
+        premium_locations (list): Liste des zones premium
+        upscale_locations (list): Liste des zones haut de gamme
+
+    Returns:
+        tuple: (copie de df avec les features ajoutées, bornes de property_tier)
+    """
+    df = engineer_features(df.copy(), df['location'].str.lower(), premium_locations, upscale_locations)
+    if tier_edges is None:
+        tier_edges = property_tier_edges(df['luxury_score'])
+    df['property_tier'] = pd.cut(df['luxury_score'], bins=tier_edges, labels=PROPERTY_TIERS)
+    return df, tier_edges
+
+
+def location_levels(df):
+    """Prix médian par ville, relatif à la médiane des villes (calculé sur le train)"""
+    stats = df.groupby('location')['price'].median().reset_index()
+    stats['location_price_level'] = stats['price'] / stats['price'].median()
+    return stats
+
+
+def encode(df, stats, feature_cols=None):
+    """
+    Ajoute location_price_level et encode en one-hot.
+
+    Args:
+        df (pd.DataFrame): Lignes avec features (add_features)
+        stats (pd.DataFrame): Sortie de location_levels
+        feature_cols (list): Colonnes attendues (None = celles de df)
+
+    Returns:
+        tuple: (X DataFrame, y Series, feature_cols)
+    """
+    data = df.merge(stats[['location', 'location_price_level']], on='location', how='left')
+    # Ville absente du train -> niveau médian (comme au serving)
+    data['location_price_level'] = data['location_price_level'].fillna(1.0)
+    encoded = pd.get_dummies(data, columns=CATEGORICAL_COLS, drop_first=False)
+    if feature_cols is None:
+        feature_cols = [col for col in encoded.columns if col not in ('price', TARGET)]
+    return encoded.reindex(columns=feature_cols, fill_value=0), encoded[TARGET], feature_cols
+
+
+def standardize(X_train, X_test, num_cols):
+    """StandardScaler ajusté sur le train, appliqué aux deux; retourne des tableaux float"""
+    from sklearn.preprocessing import StandardScaler
+
+    num_cols_present = [col for col in num_cols if col in X_train.columns]
+    X_train, X_test = X_train.astype(float), X_test.astype(float)
+    scaler = StandardScaler()
+    X_train[num_cols_present] = scaler.fit_transform(X_train[num_cols_present])
+    X_test[num_cols_present] = scaler.transform(X_test[num_cols_present])
+    return X_train.to_numpy(), X_test.to_numpy()
+
+
+# -------------------------
+# Ridge par SVD (chemin de régularisation)
+# -------------------------
+def factorize(X, y, fit_intercept):
+    """
+    SVD des données centrées: suffit pour la solution Ridge de tout alpha.
+
+    Returns:
+        dict: s, Vt, Uty (Uᵀy), x_offset, y_offset
+    """
+    if fit_intercept:
+        x_offset, y_offset = X.mean(axis=0), y.mean()
+    else:
+        x_offset, y_offset = np.zeros(X.shape[1]), 0.0
+    U, s, Vt = np.linalg.svd(X - x_offset, full_matrices=False)
+    return {'s': s, 'Vt': Vt, 'Uty': U.T @ (y - y_offset),
+            'x_offset': x_offset, 'y_offset': np.array(y_offset)}
+
+
+def ridge_path(factors, alphas):
+    """
+    Solutions Ridge pour plusieurs alphas à partir d'une factorisation.
+
+    Returns:
+        tuple: (coefs (n_features, n_alphas), intercepts (n_alphas,))
+    """
+    s = factors['s'][:, None]
+    alphas = np.asarray(alphas, dtype=float)[None, :]
+    # Valeurs singulières nulles ignorées (même seuil que le solver 'svd' de sklearn)
+    shrink = np.where(s > 1e-15, s / (s ** 2 + alphas), 0.0)
+    coefs = factors['Vt'].T @ (shrink * factors['Uty'][:, None])
+    intercepts = factors['y_offset'] - factors['x_offset'] @ coefs
+    return coefs, intercepts
+
+
+def r2_scores(y_true, predictions):
+    """R² de chaque colonne de predictions"""
+    residual = ((y_true[:, None] - predictions) ** 2).sum(axis=0)
+    total = ((y_true - y_true.mean()) ** 2).sum()
+    return 1 - residual / total
+
+
+# -------------------------
+# Cache des folds
+# -------------------------
+class FoldCache:
+    """
+    Factorisations des folds sur disque (un .npz par clé).
+
+    La clé couvre le contenu du fold et la configuration: un fold inchangé
+    (relance, nouvelle grille d'alphas) n'est pas recalculé.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def load(self, key):
+        if not self.directory:
+            return None
+        try:
+            with np.load(os.path.join(self.directory, f'{key}.npz')) as data:
+                return dict(data)
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+
+    def save(self, key, arrays):
+        if not self.directory:
+            return
+        path = os.path.join(self.directory, f'{key}.npz')
+        tmp_path = f'{path}.tmp-{os.getpid()}.npz'
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+
+def rows_digest(df):
+    """Empreinte des lignes, indépendante de leur ordre"""
+    hashes = np.sort(pd.util.hash_pandas_object(df, index=False).to_numpy())
+    return hashlib.sha256(hashes.tobytes()).hexdigest()
+
+
+def fold_key(*parts):
+    digest = hashlib.sha256(f'ridge-fold-v{CACHE_FORMAT_VERSION}'.encode('utf-8'))
+    for part in parts:
+        digest.update(repr(part).encode('utf-8'))
+    return digest.hexdigest()[:32]
+
+
+def search_fold(df_train, df_test, fit_intercept, num_cols, cache_dir):
+    """
+    Un fold de la recherche: préparation (niveaux de prix, one-hot, scaler
+    du fold), SVD, projection du test. Exécuté dans un worker.
+
+    Returns:
+        tuple: (factorisation + X_test/y_test, servie par le cache ou non)
+    """
+    cache = FoldCache(cache_dir)
+    key = fold_key(rows_digest(df_train), rows_digest(df_test), fit_intercept, num_cols)
+    cached = cache.load(key)
+    if cached is not None:
+        return cached, True
+
+    X_train, y_train, feature_cols = encode(df_train, location_levels(df_train))
+    X_test, y_test, _ = encode(df_test, location_levels(df_train), feature_cols)
+    X_train, X_test = standardize(X_train, X_test, num_cols)
+    factors = factorize(X_train, y_train.to_numpy(dtype=float), fit_intercept)
+    factors.update(X_test=X_test, y_test=y_test.to_numpy(dtype=float))
+    cache.save(key, factors)
+    return factors, False
+
+
+def eval_fold(X, y, train_idx, test_idx, fit_intercept, cache_dir):
+    """Un fold de l'évaluation finale (features déjà préparées sur tout le jeu)"""
+    cache = FoldCache(cache_dir)
+    key = fold_key(hashlib.sha256(X[train_idx].tobytes() + y[train_idx].tobytes()).hexdigest(),
+                   fit_intercept)
+    factors = cache.load(key)
+    hit = factors is not None
+    if not hit:
+        factors = factorize(X[train_idx], y[train_idx], fit_intercept)
+        cache.save(key, factors)
+    return factors, hit
+
+
+# -------------------------
+# Entraînement
+# -------------------------
+def search(df, config, num_cols, cache_dir=None, n_jobs=-1):
+    """
+    Recherche de (alpha, fit_intercept) en CV: un job par (fold, fit_intercept),
+    tous les alphas évalués sur la même SVD.
+
+    Returns:
+        tuple: (meilleurs paramètres, tableau des scores, folds servis par le cache)
+    """
+    from joblib import Parallel, delayed
+    from sklearn.model_selection import KFold
+
+    kf = KFold(n_splits=config['search_folds'], shuffle=True, random_state=config['random_state'])
+    tasks = [(df.iloc[train_idx], df.iloc[test_idx], fit_intercept)
+             for train_idx, test_idx in kf.split(df)
+             for fit_intercept in config['fit_intercept']]
+    results = Parallel(n_jobs=n_jobs, prefer='threads')(
+        delayed(search_fold)(df_train, df_test, fit_intercept, num_cols, cache_dir)
+        for df_train, df_test, fit_intercept in tasks)
+
+    scores = {}
+    for (_, _, fit_intercept), (factors, _) in zip(tasks, results):
+        coefs, intercepts = ridge_path(factors, config['alphas'])
+        fold_scores = r2_scores(factors['y_test'], factors['X_test'] @ coefs + intercepts)
+        scores.setdefault(fit_intercept, []).append(fold_scores)
+
+    table = [{'alpha': alpha, 'fit_intercept': fit_intercept,
+              'mean_r2': float(np.mean(fold_scores, axis=0)[i]),
+              'std_r2': float(np.std(fold_scores, axis=0)[i])}
+             for fit_intercept, fold_scores in scores.items()
+             for i, alpha in enumerate(config['alphas'])]
+    # Premier meilleur dans l'ordre de la grille (comme le notebook)
+    best = max(table, key=lambda row: row['mean_r2'])
+    cached = sum(hit for _, hit in results)
+    return {'alpha': best['alpha'], 'fit_intercept': best['fit_intercept']}, table, cached
+
+
+def evaluate(X, y, transaction_types, params, config, cache_dir=None, n_jobs=-1):
+    """
+    Évaluation du modèle retenu en CV (prédictions hors fold): métriques en
+    log-space et en TND, facteurs de correction de biais par type.
+
+    Returns:
+        tuple: (métriques, bias_factors, folds servis par le cache)
+    """
+    from joblib import Parallel, delayed
+    from sklearn.model_selection import KFold
+
+    kf = KFold(n_splits=config['eval_folds'], shuffle=True, random_state=config['random_state'])
+    splits = list(kf.split(X))
+    results = Parallel(n_jobs=n_jobs, prefer='threads')(
+        delayed(eval_fold)(X, y, train_idx, test_idx, params['fit_intercept'], cache_dir)
+        for train_idx, test_idx in splits)
+
+    y_pred = np.zeros_like(y)
+    fold_r2 = []
+    for (_, test_idx), (factors, _) in zip(splits, results):
+        coefs, intercepts = ridge_path(factors, [params['alpha']])
+        y_pred[test_idx] = (X[test_idx] @ coefs + intercepts)[:, 0]
+        fold_r2.append(r2_scores(y[test_idx], y_pred[test_idx, None])[0])
+
+    types = np.asarray(transaction_types)
+    bias_factors = {str(t): float(10 ** (y[types == t].mean() - y_pred[types == t].mean()))
+                    for t in pd.unique(types)}
+    y_actual = 10 ** y
+    y_corrected = 10 ** y_pred * np.array([bias_factors[str(t)] for t in types])
+
+    metrics = {
+        'R2_log': float(r2_scores(y, y_pred[:, None])[0]),
+        'R2_std': float(np.std(fold_r2)),
+        'RMSE_log': float(np.sqrt(np.mean((y - y_pred) ** 2))),
+        'MAE_log': float(np.mean(np.abs(y - y_pred))),
+        'RMSE_actual': float(np.sqrt(np.mean((y_actual - y_corrected) ** 2))),
+        'MAE_actual': float(np.mean(np.abs(y_actual - y_corrected))),
+        'MAPE': float(np.mean(np.abs((y_actual - y_corrected) / y_actual)) * 100),
+    }
+    return metrics, bias_factors, sum(hit for _, hit in results)
+
+
+def fit_final(df, params, num_cols, solver='auto', random_state=42):
+    """
+    Ajuste scaler et Ridge sur toutes les données.
+
+    Returns:
+        dict: Artefacts 'model', 'scaler', 'feature_cols', 'location_stats'
+            et les matrices 'X_raw' (features brutes), 'X' (standardisée), 'y'
+    """
+    from sklearn.linear_model import Ridge
+    from sklearn.preprocessing import StandardScaler
+
+    stats = location_levels(df)
+    X_raw, y, feature_cols = encode(df, stats)
+    X_raw = X_raw.astype(float)
+    num_cols_present = [col for col in num_cols if col in feature_cols]
+    scaler = StandardScaler()
+    X = X_raw.copy()
+    X[num_cols_present] = scaler.fit_transform(X_raw[num_cols_present])
+    model = Ridge(alpha=params['alpha'], fit_intercept=params['fit_intercept'],
+                  solver=solver, random_state=random_state)
+    model.fit(X, y)
+    return {'model': model, 'scaler': scaler, 'feature_cols': feature_cols,
+            'location_stats': stats, 'X_raw': X_raw, 'X': X, 'y': y}
+
+
+def read_data(data_path):
+    """
+    Lignes nettoyées depuis un CSV ou le jeu en colonnes.
+
+    Returns:
+        tuple: (empreinte SHA-256 du fichier ou du manifest, pd.DataFrame)
+    """
+    if not os.path.isdir(data_path):
+        with open(data_path, 'rb') as f:
+            data_sha256 = hashlib.sha256(f.read()).hexdigest()
+        return data_sha256, pd.read_csv(data_path)
+
+    from config import PROJECT_ROOT
+    if PROJECT_ROOT not in sys.path:
+        sys.path.insert(0, PROJECT_ROOT)
+    from preprocessing.dataset import CATEGORICAL_COLUMNS, MANIFEST_NAME, DatasetStore
+
+    # Segments jamais réécrits: le manifest identifie le contenu
+    with open(os.path.join(data_path, MANIFEST_NAME), 'rb') as f:
+        data_sha256 = hashlib.sha256(f.read()).hexdigest()
+    df = DatasetStore(data_path).load()
+    # Chaînes comme le CSV (get_dummies sur une catégorielle créerait une
+    # colonne par valeur du dictionnaire, même absente)
+    return data_sha256, df.astype({column: object for column in CATEGORICAL_COLUMNS})
+
+
+def train(data_path, config=None, num_cols=None, cache_dir=None, n_jobs=-1, log=print):
+    """
+    Entraînement complet: recherche, évaluation, ajustement final.
+
+    Args:
+        data_path (str): CSV nettoyé (schéma de data/clean/) ou dossier du
+            jeu en colonnes (preprocessing/dataset.py)
+        config (dict): Surcharge de DEFAULT_CONFIG
+        num_cols (list): Features standardisées (défaut: predictor.NUM_COLS)
+        cache_dir (str): Cache des folds (None = désactivé)
+        n_jobs (int): Threads joblib (-1 = tous les cœurs)
+        log (callable): Sortie des messages
+
+    Returns:
+        tuple: (artefacts de fit_final, rapport JSON-sérialisable)
+    """
+    if num_cols is None:
+        from .predictor import NUM_COLS
+        num_cols = NUM_COLS
+    config = dict(DEFAULT_CONFIG, **(config or {}))
+
+    data_sha256, raw = read_data(data_path)
+    df, tier_edges = add_features(raw)
+    log(f"Données: {len(df)} lignes ({data_path})")
+
+    start = time.perf_counter()
+    params, table, search_cached = search(df, config, num_cols, cache_dir, n_jobs)
+    search_s = time.perf_counter() - start
+    n_candidates = len(config['alphas']) * len(config['fit_intercept'])
+    n_tasks = config['search_folds'] * len(config['fit_intercept'])
+    log(f"Recherche: {n_candidates} candidats x {config['search_folds']} folds en {search_s:.2f} s "
+        f"({search_cached}/{n_tasks} folds en cache) -> alpha={params['alpha']}, "
+        f"fit_intercept={params['fit_intercept']}")
+
+    start = time.perf_counter()
+    artifacts = fit_final(df, params, num_cols, config['solver'], config['random_state'])
+    artifacts['tier_edges'] = tier_edges
+    X = artifacts['X'].to_numpy(dtype=float)
+    y = artifacts['y'].to_numpy(dtype=float)
+    metrics, bias_factors, eval_cached = evaluate(X, y, df['type'], params, config, cache_dir, n_jobs)
+    eval_s = time.perf_counter() - start
+    log(f"Évaluation {config['eval_folds']}-fold en {eval_s:.2f} s ({eval_cached} folds en cache): "
+        f"R²={metrics['R2_log']:.4f} (±{metrics['R2_std']:.4f}), "
+        f"MAE={metrics['MAE_actual']:,.0f} TND, MAPE={metrics['MAPE']:.2f}%")
+
+    report = {
+        'data': {'path': os.path.abspath(data_path), 'sha256': data_sha256, 'rows': len(df)},
+        'config': config,
+        'best_params': params,
+        'search': table,
+        'metrics': metrics,
+        'bias_factors': bias_factors,
+        'timings_s': {'search': search_s, 'evaluate_and_fit': eval_s},
+        'n_features': len(artifacts['feature_cols']),
+    }
+    return artifacts, report
+
+
+def pickle_paths(output_dir):
+    """Chemins des pickles du serving dans output_dir (clés de predictor.PICKLE_PATHS)"""
+    return {name: os.path.join(output_dir, filename) for name, filename in PICKLE_FILENAMES.items()}
+
+
+def save_artifacts(artifacts, output_dir, premium_locations=PREMIUM_LOCATIONS,
+                   upscale_locations=UPSCALE_LOCATIONS):
+    """
+    Écrit les pickles lus par le serving (mêmes noms que le notebook).
+
+    Returns:
+        dict: Chemins par artefact (clés de predictor.PICKLE_PATHS)
+    """
+    import joblib
+
+    os.makedirs(output_dir, exist_ok=True)
+    objects = {
+        'model': artifacts['model'],
+        'scaler': artifacts['scaler'],
+        'feature_cols': artifacts['feature_cols'],
+        'location_stats': artifacts['location_stats'],
+        'premium_locations': list(premium_locations),
+        'upscale_locations': list(upscale_locations),
+    }
+    paths = pickle_paths(output_dir)
+    for name, obj in objects.items():
+        joblib.dump(obj, paths[name])
+    return paths
+
+
+def save_statistics(artifacts, params, num_cols, output_dir):
+    """
+    Écrit les statistiques suffisantes du jeu d'entraînement, point de
+    départ de python -m models.incremental.
+
+    Returns:
+        str: Chemin du fichier écrit
+    """
+    from .incremental import STATS_FILENAME, RidgeStatistics
+
+    stats = RidgeStatistics.from_rows(artifacts['X_raw'].to_numpy(dtype=float),
+                                      artifacts['y'].to_numpy(dtype=float),
+                                      artifacts['feature_cols'], num_cols, artifacts['tier_edges'],
+                                      params['alpha'], params['fit_intercept'])
+    path = os.path.join(output_dir, STATS_FILENAME)
+    stats.save(path)
+    return path
+
+
+def publish_bundle(paths, output_dir):
+    """
+    Construit le bundle depuis les pickles écrits et met à jour CURRENT.
+
+    Returns:
+        ModelBundle: Bundle publié
+    """
+    from .bundle import ModelBundle
+    from .predictor import BIAS_FACTORS, NUM_COLS
+
+    # Mêmes constantes que le serving: le bundle n'est pas jugé périmé au chargement
+    bundle = ModelBundle.from_pickles(paths, NUM_COLS, BIAS_FACTORS)
+    version_dir = bundle.save(os.path.join(output_dir, 'bundle'))
+    print(f"Bundle {bundle.version} écrit dans {version_dir} (CURRENT mis à jour)")
+    return bundle
+
+
+def main():
+    from config import OUTPUT_DIR, TRAINING_CACHE_DIR, TRAINING_DATA_PATH
+    from .predictor import NUM_COLS
+
+    parser = argparse.ArgumentParser(description="Entraînement du modèle Ridge servi")
+    parser.add_argument('--data', default=TRAINING_DATA_PATH,
+                        help="CSV nettoyé ou dossier du jeu en colonnes (data/store)")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help="Dossier des pickles et du bundle")
+    parser.add_argument('--alphas', type=float, nargs='+', default=DEFAULT_CONFIG['alphas'])
+    parser.add_argument('--n-jobs', type=int, default=-1, help="Threads joblib (-1 = tous les cœurs)")
+    parser.add_argument('--cache-dir', default=TRAINING_CACHE_DIR, help="Cache des folds")
+    parser.add_argument('--no-cache', action='store_true', help="Ne pas lire ni écrire le cache")
+    parser.add_argument('--no-bundle', action='store_true', help="Ne pas écrire le bundle")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    artifacts, report = train(args.data, {'alphas': args.alphas}, NUM_COLS,
+                              None if args.no_cache else args.cache_dir, args.n_jobs)
+    paths = save_artifacts(artifacts, args.output_dir)
+    save_statistics(artifacts, report['best_params'], NUM_COLS, args.output_dir)
+    print(f"Pickles et statistiques écrits dans {args.output_dir}")
+
+    if not args.no_bundle:
+        report['bundle_version'] = publish_bundle(paths, args.output_dir).version
+
+    measured = ', '.join(f"{t}: {f:.4f}" for t, f in report['bias_factors'].items())
+    print(f"Bias factors mesurés: {measured} (servis: predictor.BIAS_FACTORS)")
+
+    report['timings_s']['total'] = time.perf_counter() - start
+    with open(os.path.join(args.output_dir, 'training_report.json'), 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Terminé en {report['timings_s']['total']:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
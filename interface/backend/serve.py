@@ -0,0 +1,217 @@
+# =============================================================================
+# serve.py - Point d'entrée de production (pré-fork multi-processus)
+#
+# Le processus maître ouvre le socket, charge et préchauffe le modèle, puis
+# forke SERVE_WORKERS processus qui acceptent sur le même socket. Le bundle
+# memory-mappé et les objets Python chargés avant le fork sont partagés en
+# copy-on-write. Chaque processus sert avec un pool de SERVE_THREADS threads.
+#
+#   python serve.py [--workers N] [--threads N] [--host H] [--port P]
+#
+# Note: chaque processus a son propre cache et son propre registre; utiliser
+# MODEL_WATCH_INTERVAL (ou un redémarrage) plutôt que /models/reload pour
+# changer de version sur tous les processus.
+# =============================================================================
+
+import argparse
+import os
+import signal
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+from config import (SERVE_HOST, SERVE_PORT, SERVE_WORKERS, SERVE_THREADS,
+                    SERVE_BACKLOG, SERVE_KEEPALIVE_TIMEOUT, SERVE_ACCESS_LOG)
+
+
+class RequestHandler(WSGIRequestHandler):
+    """Handler WSGI: keep-alive borné, log d'accès optionnel"""
+
+    protocol_version = "HTTP/1.1"
+    timeout = SERVE_KEEPALIVE_TIMEOUT
+
+    def log_request(self, code="-", size="-"):
+        if SERVE_ACCESS_LOG:
+            super().log_request(code, size)
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """
+    Serveur WSGI dont les connexions sont traitées par un pool de threads
+    borné (au lieu d'un thread par connexion).
+    """
+
+    multithread = True
+
+    def __init__(self, host, port, app, threads, fd=None, multiprocess=False):
+        self.multiprocess = multiprocess
+        self._pool = None
+        super().__init__(host, port, app, handler=RequestHandler, fd=fd)
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="http")
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self._process_request_thread, request, client_address)
+
+    def _process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        # Aussi appelé par BaseWSGIServer.__init__, avant la création du pool
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+
+
+def create_socket(host, port, backlog):
+    """Socket d'écoute partagé par tous les processus"""
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    # Non bloquant: un processus qui perd la course à accept() ne reste pas bloqué
+    sock.setblocking(False)
+    sock.set_inheritable(True)
+    return sock
+
+
+def preload():
+    """
+    Charge l'application, préchauffe le modèle et agrège les statistiques du
+    marché dans le maître, avant le fork: les processus héritent des pages
+    déjà chargées (copy-on-write).
+    """
+    from app import app, market_stats
+    from models.predictor import get_model
+    from models.registry import PROBE_PROPERTIES
+
+    # Appels directs au modèle: ni cache, ni métriques, ni compteurs de
+    # routage (hérités par chaque processus, ils fausseraient /metrics)
+    model = get_model()
+    model.predict_prices(PROBE_PROPERTIES)  # Importe pandas (chemin batch)
+    for prop in PROBE_PROPERTIES:
+        model.predict_one(*prop)
+    # Tables et réponses /market prêtes: aucun processus ne les recalcule
+    market_stats.refresh()
+    return app, model.version
+
+
+def run_worker(app, sock, threads, multiprocess):
+    """Boucle d'un processus: sert jusqu'à SIGTERM/SIGINT"""
+    from app import start_background_tasks
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    host, port = sock.getsockname()[:2]
+    server = PooledWSGIServer(host, port, app, threads,
+                              fd=sock.fileno(), multiprocess=multiprocess)
+    start_background_tasks()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def spawn_worker(app, sock, threads):
+    """Forke un processus qui sert; retourne son pid dans le maître"""
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            run_worker(app, sock, threads, multiprocess=True)
+        except BaseException:
+            code = 1
+            import traceback
+            traceback.print_exc()
+        finally:
+            os._exit(code)
+    return pid
+
+
+def serve(host=SERVE_HOST, port=SERVE_PORT, workers=SERVE_WORKERS, threads=SERVE_THREADS,
+          backlog=SERVE_BACKLOG):
+    """
+    Lance le serveur de production.
+
+    Args:
+        host (str): Adresse d'écoute
+        port (int): Port d'écoute
+        workers (int): Nombre de processus (1 = pas de fork)
+        threads (int): Threads par processus
+        backlog (int): File d'attente du socket d'écoute
+    """
+    sock = create_socket(host, port, backlog)
+    app, version = preload()
+
+    # Sans fork (Windows) ou avec un seul processus: servir dans le maître
+    if workers <= 1 or not hasattr(os, 'fork'):
+        print(f"✓ Modèle {version} chargé, 1 processus × {threads} threads sur {host}:{port}")
+        run_worker(app, sock, threads, multiprocess=False)
+        return
+
+    print(f"✓ Modèle {version} chargé, {workers} processus × {threads} threads sur {host}:{port}")
+
+    children = {spawn_worker(app, sock, threads): time.monotonic() for _ in range(workers)}
+    stopping = False
+    backoff = 0.1
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    # Supervision: un processus mort est remplacé (sauf à l'arrêt), avec un
+    # délai croissant s'il meurt dès son démarrage
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started_at = children.pop(pid, None)
+        if stopping or started_at is None:
+            continue
+        print(f"⚠️  Processus {pid} terminé (statut {status}), redémarrage")
+        backoff = min(backoff * 2, 10.0) if time.monotonic() - started_at < 1.0 else 0.1
+        time.sleep(backoff)
+        if not stopping:
+            children[spawn_worker(app, sock, threads)] = time.monotonic()
+
+    sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur de production de l'API de prédiction")
+    parser.add_argument('--host', default=SERVE_HOST)
+    parser.add_argument('--port', type=int, default=SERVE_PORT)
+    parser.add_argument('--workers', type=int, default=SERVE_WORKERS,
+                        help="Nombre de processus (défaut: nombre de cœurs)")
+    parser.add_argument('--threads', type=int, default=SERVE_THREADS,
+                        help="Threads par processus")
+    parser.add_argument('--backlog', type=int, default=SERVE_BACKLOG)
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.threads, args.backlog)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,10 @@
+import os
+import sys
+
+# Tests lancés depuis interface/backend ou la racine du projet: imports
+# absolus du backend (config, models, utils) et du projet (preprocessing)
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(BACKEND_DIR))
+for path in (PROJECT_ROOT, BACKEND_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
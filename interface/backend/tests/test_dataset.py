@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from preprocessing.dataset import COLUMNS, DatasetStore, import_csv
+
+
+def _listings(n, seed=0):
+    rng = np.random.default_rng(seed)
+    price = rng.uniform(50_000, 900_000, n).round()
+    return pd.DataFrame({
+        "price": price,
+        "type": rng.choice(["À Vendre", "À Louer"], n),
+        "size": rng.uniform(40, 400, n).round(),
+        "bathroom_count": rng.integers(1, 4, n).astype(float),
+        "room_count": rng.integers(1, 7, n).astype(float),
+        "location": rng.choice(["Tunis", "Ariana", "Sousse", "Sfax"], n),
+        "category": rng.choice(["Appartements", "Maisons et Villas", "Terrains et Fermes"], n),
+        "log_price": np.log(price),
+    })
+
+
+def _canonical(df):
+    df = df[COLUMNS].astype({"type": str, "location": str, "category": str})
+    return df.sort_values(COLUMNS, ignore_index=True)
+
+
+def test_load_matches_read_csv(tmp_path):
+    csv = tmp_path / "cleaned.csv"
+    _listings(500).to_csv(csv, index=False)
+    store_dir = str(tmp_path / "store")
+
+    assert import_csv([str(csv)], store_dir, chunksize=120) == (500, 500)
+    expected = pd.read_csv(csv)
+    store = DatasetStore(store_dir)
+    pd.testing.assert_frame_equal(_canonical(store.load()), _canonical(expected))
+    pd.testing.assert_frame_equal(_canonical(store.load(mmap_mode=None)), _canonical(expected))
+
+    # Sous-ensemble de partitions et de colonnes
+    subset = store.load(columns=["price", "location"], locations=["Sfax"],
+                        categories=["Appartements"])
+    mask = (expected["location"] == "Sfax") & (expected["category"] == "Appartements")
+    assert list(subset.columns) == ["price", "location"]
+    np.testing.assert_array_equal(np.sort(subset["price"].to_numpy()),
+                                  np.sort(expected.loc[mask, "price"].to_numpy()))
+    assert (subset["location"] == "Sfax").all()
+
+
+def test_reimport_is_idempotent(tmp_path):
+    csv = tmp_path / "cleaned.csv"
+    listings = _listings(300, seed=1)
+    listings.to_csv(csv, index=False)
+    store_dir = str(tmp_path / "store")
+
+    import_csv([str(csv)], store_dir, chunksize=100)
+    segments = len(DatasetStore(store_dir).segments)
+    assert import_csv([str(csv)], store_dir, chunksize=70) == (0, 300)
+
+    store = DatasetStore(store_dir)
+    assert store.rows == 300
+    assert len(store.segments) == segments
+
+    # Nouvelles lignes mêlées à des lignes connues et répétées: seules les
+    # nouvelles sont ajoutées, une fois
+    fresh = _listings(40, seed=2)
+    segment = store.append(pd.concat([listings.iloc[:50], fresh, fresh.iloc[:5]]))
+    assert segment["rows"] == 40
+    assert DatasetStore(store_dir).rows == 340
+    pd.testing.assert_frame_equal(_canonical(store.load()),
+                                  _canonical(pd.concat([listings, fresh])))
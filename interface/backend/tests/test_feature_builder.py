@@ -0,0 +1,36 @@
+import itertools
+
+import numpy as np
+
+from models.predictor import get_model, prepare_batch, prepare_input
+from utils.constants import CATEGORIES, TYPES_TRANSACTION, VILLES
+
+
+def parity_cases():
+    """Toutes les villes/catégories/types, ville inconnue ou mal saisie, catégorie et type de repli"""
+    locations = VILLES + ['TUNIS', '  Sousse ', 'inconnue']
+    categories = CATEGORIES + ['Autre']
+    types = TYPES_TRANSACTION + ['Autre']
+    shapes = [(0, 0, 0.0), (1, 1, 35.0), (3, 2, 120.0), (5, 3, 300.0), (12, 6, 1500.5)]
+    return [
+        (rooms, baths, size, location, category, transaction_type)
+        for (rooms, baths, size), location, category, transaction_type in itertools.product(
+            shapes, locations, categories, types)
+    ]
+
+
+def test_build_matches_pandas_path():
+    cases = parity_cases()
+    reference, _ = prepare_batch(cases)
+    reference = reference.to_numpy(dtype=float)
+    for i, case in enumerate(cases):
+        fast, _ = prepare_input(*case)
+        assert np.array_equal(fast, reference[i:i + 1]), case
+
+
+def test_build_many_matches_pandas_path():
+    builder = get_model().feature_builder
+    cases = parity_cases()
+    for scale in (True, False):
+        reference, _ = prepare_batch(cases, scale=scale)
+        assert np.array_equal(builder.build_many(cases, scale=scale), reference.to_numpy(dtype=float))
@@ -0,0 +1,115 @@
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import Ridge
+from sklearn.preprocessing import StandardScaler
+
+from config import TRAINING_DATA_PATH
+from models.incremental import STATS_FILENAME, RidgeStatistics, featurize
+from models.predictor import NUM_COLS
+from models.train import (PREMIUM_LOCATIONS, UPSCALE_LOCATIONS, add_features, fit_final,
+                          save_artifacts, save_statistics)
+
+ALPHA = 1.0
+
+
+@pytest.fixture(scope='module')
+def split():
+    """Entraînement sur les 3000 premières lignes, le reste en nouvelles annonces"""
+    raw = pd.read_csv(TRAINING_DATA_PATH)
+    return raw.iloc[:3000], raw.iloc[3000:]
+
+
+def base_statistics(old, fit_intercept):
+    df, tier_edges = add_features(old)
+    artifacts = fit_final(df, {'alpha': ALPHA, 'fit_intercept': fit_intercept}, NUM_COLS)
+    stats = RidgeStatistics.from_rows(
+        artifacts['X_raw'].to_numpy(dtype=float), artifacts['y'].to_numpy(dtype=float),
+        artifacts['feature_cols'], NUM_COLS, tier_edges, ALPHA, fit_intercept)
+    return artifacts, stats
+
+
+def full_refit(X, y, feature_cols, fit_intercept, sample_weight=None):
+    """StandardScaler + Ridge sur toutes les lignes (référence)"""
+    X = pd.DataFrame(X, columns=feature_cols)
+    num_cols = [col for col in NUM_COLS if col in feature_cols]
+    scaler = StandardScaler().fit(X[num_cols], sample_weight=sample_weight)
+    X[num_cols] = scaler.transform(X[num_cols])
+    model = Ridge(alpha=ALPHA, fit_intercept=fit_intercept).fit(X, y, sample_weight=sample_weight)
+    return scaler, model
+
+
+@pytest.mark.parametrize('fit_intercept', [True, False])
+def test_statistics_reproduce_training_fit(split, fit_intercept):
+    artifacts, stats = base_statistics(split[0], fit_intercept)
+    model = stats.solve()
+    np.testing.assert_allclose(model.coef_, artifacts['model'].coef_, atol=1e-9)
+    assert model.intercept_ == pytest.approx(artifacts['model'].intercept_, abs=1e-9)
+
+
+@pytest.mark.parametrize('fit_intercept', [True, False])
+def test_update_matches_full_retrain(split, tmp_path, fit_intercept):
+    old, new = split
+    artifacts, stats = base_statistics(old, fit_intercept)
+    stats.save(str(tmp_path / STATS_FILENAME))
+    stats = RidgeStatistics.load(str(tmp_path / STATS_FILENAME))
+
+    X_new, y_new = featurize(new, stats, artifacts['location_stats'],
+                             PREMIUM_LOCATIONS, UPSCALE_LOCATIONS)
+    stats.update(X_new, y_new)
+    X = np.vstack([artifacts['X_raw'].to_numpy(dtype=float), X_new])
+    y = np.concatenate([artifacts['y'].to_numpy(dtype=float), y_new])
+    ref_scaler, ref_model = full_refit(X, y, stats.feature_cols, fit_intercept)
+
+    scaler, model = stats.scaler(), stats.solve()
+    np.testing.assert_allclose(scaler.mean_, ref_scaler.mean_, rtol=1e-10)
+    np.testing.assert_allclose(scaler.scale_, ref_scaler.scale_, rtol=1e-10)
+    np.testing.assert_allclose(model.coef_, ref_model.coef_, atol=1e-9)
+    assert model.intercept_ == pytest.approx(ref_model.intercept_, abs=1e-9)
+    assert stats.rows == len(X)
+
+
+@pytest.mark.parametrize('fit_intercept', [True, False])
+def test_decay_matches_sample_weight(split, fit_intercept):
+    old, new = split
+    artifacts, stats = base_statistics(old, fit_intercept)
+    X_new, y_new = featurize(new, stats, artifacts['location_stats'],
+                             PREMIUM_LOCATIONS, UPSCALE_LOCATIONS)
+    stats.update(X_new, y_new, decay=0.5)
+
+    X = np.vstack([artifacts['X_raw'].to_numpy(dtype=float), X_new])
+    y = np.concatenate([artifacts['y'].to_numpy(dtype=float), y_new])
+    weights = np.concatenate([np.full(len(old), 0.5), np.ones(len(X_new))])
+    ref_scaler, ref_model = full_refit(X, y, stats.feature_cols, fit_intercept, weights)
+
+    np.testing.assert_allclose(stats.scaler().scale_, ref_scaler.scale_, rtol=1e-10)
+    model = stats.solve()
+    np.testing.assert_allclose(model.coef_, ref_model.coef_, atol=1e-9)
+    assert model.intercept_ == pytest.approx(ref_model.intercept_, abs=1e-9)
+
+
+def test_alpha_override_is_kept_for_next_updates(split, tmp_path, monkeypatch):
+    import joblib
+
+    from models import incremental
+
+    old, new = split
+    df, tier_edges = add_features(old)
+    artifacts = fit_final(df, {'alpha': ALPHA, 'fit_intercept': True}, NUM_COLS)
+    artifacts['tier_edges'] = tier_edges
+    save_artifacts(artifacts, str(tmp_path))
+    save_statistics(artifacts, {'alpha': ALPHA, 'fit_intercept': True}, NUM_COLS, str(tmp_path))
+    new_path = tmp_path / 'new.csv'
+    new.to_csv(new_path, index=False)
+
+    def run(*args):
+        monkeypatch.setattr(sys, 'argv', ['incremental', str(new_path), '--output-dir',
+                                          str(tmp_path), '--no-bundle', *args])
+        assert incremental.main() == 0
+        return joblib.load(tmp_path / 'best_model.pkl').alpha
+
+    assert run('--alpha', '10') == 10
+    assert RidgeStatistics.load(str(tmp_path / STATS_FILENAME)).alpha == 10
+    assert run() == 10
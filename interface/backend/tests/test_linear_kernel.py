@@ -0,0 +1,38 @@
+import itertools
+
+import joblib
+import numpy as np
+
+from models.bundle import ModelBundle
+from models.linear_kernel import LinearKernel
+from models.predictor import BIAS_FACTORS, NUM_COLS, PICKLE_PATHS, ServingModel
+from utils.constants import CATEGORIES, TYPES_TRANSACTION, VILLES
+
+
+def test_kernel_matches_joblib_pipeline():
+    model = joblib.load(PICKLE_PATHS['model'])
+    scaler = joblib.load(PICKLE_PATHS['scaler'])
+    feature_cols = joblib.load(PICKLE_PATHS['feature_cols'])
+    premium_locations = joblib.load(PICKLE_PATHS['premium_locations'])
+    kernel = LinearKernel.compile(model, scaler, feature_cols, NUM_COLS, BIAS_FACTORS)
+    serving = ServingModel(ModelBundle.from_pickles(PICKLE_PATHS, NUM_COLS, BIAS_FACTORS))
+
+    locations = VILLES + ['inconnue']
+    normalized = {serving.normalize_location(location) for location in locations}
+    assert normalized & set(premium_locations) and normalized - set(premium_locations)
+    cases = [
+        (rooms, baths, size, location, category, transaction_type)
+        for (rooms, baths, size), location, category, transaction_type in itertools.product(
+            [(1, 1, 35.0), (3, 2, 120.0), (5, 3, 300.0), (12, 6, 1500.5)],
+            locations, CATEGORIES, TYPES_TRANSACTION)
+    ]
+
+    X_raw, prop_types = serving.prepare_batch(cases, scale=False)
+    X_scaled = X_raw.copy()
+    num_cols = [col for col in NUM_COLS if col in X_raw.columns]
+    X_scaled[num_cols] = scaler.transform(X_raw[num_cols].astype(float))
+    bias = np.array([BIAS_FACTORS[t] for t in prop_types])
+    expected = 10 ** model.predict(X_scaled) * bias
+
+    actual = kernel.predict(X_raw.to_numpy(dtype=float))
+    np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=0)
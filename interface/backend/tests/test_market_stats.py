@@ -0,0 +1,76 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from preprocessing.dataset import DatasetStore
+from utils.market_stats import VIEWS, MarketStats
+
+
+def _listings(prices, location="Tunis", type_="À Vendre"):
+    prices = np.asarray(prices, dtype=float)
+    return pd.DataFrame({
+        "price": prices,
+        "type": type_,
+        "size": 100.0,
+        "bathroom_count": 1.0,
+        "room_count": 3.0,
+        "location": location,
+        "category": "Appartements",
+        "log_price": np.log(prices),
+    })
+
+
+def test_non_finite_price_keeps_payload_valid(tmp_path):
+    store_dir = str(tmp_path / "store")
+    DatasetStore(store_dir).append(_listings([100_000, np.nan, 300_000]))
+    DatasetStore(store_dir).append(_listings([np.inf], location="Sfax"))
+
+    stats = MarketStats(store_dir)
+    for view in VIEWS:
+        body, _ = stats.payload(view)
+        # NaN / Infinity ne sont pas du JSON
+        json.loads(body, parse_constant=pytest.fail)
+
+    rows = {row["location"]: row for row in json.loads(stats.payload("locations")[0])["rows"]}
+    assert rows["Tunis"]["count"] == 3
+    assert rows["Tunis"]["mean_price"] == 200_000
+    assert rows["Sfax"]["count"] == 1
+    assert rows["Sfax"]["mean_price"] is None
+
+
+def _rows(stats):
+    return {view: json.loads(stats.payload(view)[0])["rows"] for view in VIEWS}
+
+
+def test_incremental_refresh_matches_full_rebuild(tmp_path):
+    rng = np.random.default_rng(0)
+    store_dir = str(tmp_path / "store")
+    state_path = str(tmp_path / "market_stats.npz")
+
+    def batch(n):
+        frame = _listings(rng.lognormal(12, 1, n).round())
+        frame["location"] = rng.choice(["Tunis", "Ariana", "Sousse"], n)
+        frame["type"] = rng.choice(["À Vendre", "À Louer"], n)
+        frame["size"] = rng.uniform(40, 300, n).round()
+        return frame
+
+    DatasetStore(store_dir).append(batch(200))
+    incremental = MarketStats(store_dir)
+    assert incremental.refresh() == 200
+    incremental.save(state_path)
+
+    # Segments ajoutés après la matérialisation, dont une nouvelle ville
+    DatasetStore(store_dir).append(batch(150))
+    extra = batch(50)
+    extra["location"] = "Sfax"
+    DatasetStore(store_dir).append(extra)
+
+    assert incremental.refresh() == 200
+    warm = MarketStats(store_dir, state_path)
+    full = MarketStats(store_dir)
+    assert warm.refresh() == 200
+    assert full.refresh() == 400
+    assert _rows(incremental) == _rows(full) == _rows(warm)
+    assert incremental.rows == warm.rows == full.rows == 400
@@ -0,0 +1,62 @@
+import os
+import time
+
+from config import BUNDLE_DIR
+from models.bundle import ModelBundle, current_version, load_serving_bundle
+from models.predictor import NUM_COLS, PICKLE_PATHS, ServingModel
+from models.registry import ModelRegistry
+
+OTHER_BIAS = {'À Vendre': 1.01, 'À Louer': 0.99}
+
+
+def wait_for(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def make_registry(bundle_root, bias_factors):
+    return ModelRegistry(bundle_root, ServingModel,
+                         lambda: load_serving_bundle(bundle_root, PICKLE_PATHS, NUM_COLS, bias_factors))
+
+
+def test_pickle_fallback_is_not_replaced_by_stale_current(tmp_path):
+    root = str(tmp_path)
+    shipped = ModelBundle.load(os.path.join(BUNDLE_DIR, current_version(BUNDLE_DIR)))
+    shipped.save(root)
+
+    # Bundle périmé: le modèle servi est reconstruit depuis les pickles
+    registry = make_registry(root, OTHER_BIAS)
+    assert registry.active.version != shipped.version
+    assert registry.check_for_update() is False
+    assert registry.check_for_update() is False
+
+
+def test_manual_rollback_survives_watcher_until_current_changes(tmp_path):
+    root = str(tmp_path)
+    shipped = ModelBundle.load(os.path.join(BUNDLE_DIR, current_version(BUNDLE_DIR)))
+    shipped.save(root)
+    other = ModelBundle.from_pickles(PICKLE_PATHS, NUM_COLS, OTHER_BIAS)
+    other.save(root, make_current=False)
+
+    registry = make_registry(root, shipped.bias_factors)
+    assert registry.active.version == shipped.version
+    registry.load(other.version)
+    registry.activate(other.version)
+    assert registry.check_for_update() is False
+    assert registry.active.version == other.version
+
+    # Nouvelle publication: CURRENT change, la version publiée est activée
+    published = ModelBundle.from_pickles(PICKLE_PATHS, NUM_COLS, {'À Vendre': 1.02, 'À Louer': 0.98})
+    published.save(root)
+    assert registry.check_for_update() is True
+    assert wait_for(lambda: registry.active.version == published.version)
+
+    # Rechargement explicite (/models/reload): revient sur CURRENT
+    registry.activate(other.version)
+    assert registry.check_for_update() is False
+    assert registry.check_for_update(force=True) is True
+    assert wait_for(lambda: registry.active.version == published.version)
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from preprocessing.dataset import DatasetStore
+from serve import preload
+from utils.market_stats import VIEWS, MarketStats
+
+
+def test_preload_leaves_no_counters_for_forked_workers():
+    from models.predictor import prediction_cache, registry
+    from utils.metrics import metrics
+
+    preload()
+    stats = prediction_cache.stats()
+    assert (stats['size'], stats['hits'], stats['misses']) == (0, 0, 0)
+    assert registry.status()['served'] == {}
+    assert 'prediction_stage_seconds_count' not in metrics.render()
+
+
+def test_preload_builds_market_stats_before_fork(tmp_path, monkeypatch):
+    import app
+
+    store_dir = str(tmp_path / "store")
+    DatasetStore(store_dir).append(pd.DataFrame({
+        "price": [250_000.0, 900.0], "type": ["À Vendre", "À Louer"], "size": [120.0, 80.0],
+        "bathroom_count": [1.0, 1.0], "room_count": [3.0, 2.0], "location": ["Tunis", "Tunis"],
+        "category": ["Appartements", "Appartements"], "log_price": np.log([250_000.0, 900.0]),
+    }))
+    stats = MarketStats(store_dir)
+    monkeypatch.setattr(app, "market_stats", stats)
+
+    preload()
+    # Réponses déjà rendues dans le maître (sans passer par payload())
+    assert stats.rows == 2
+    assert set(stats._payloads) == set(VIEWS)
@@ -0,0 +1,401 @@
+# =============================================================================
+# market_stats.py - Statistiques du marché servies par /market/<vue>
+#
+# Tables d'agrégats matérialisées, une par vue (clé -> nombre d'annonces,
+# sommes, histogrammes du prix et du prix au m² en échelle log). Elles sont
+# complétées avec les seuls segments ajoutés au jeu en colonnes
+# (preprocessing/dataset.py) depuis la dernière mise à jour: aucune requête
+# ne relit les données brutes. Les médianes viennent des histogrammes
+# (pas de 0.004 en log10: valeurs à moins de 1 % près).
+#
+# La réponse JSON de chaque vue et son ETag sont recalculés à chaque mise à
+# jour: une requête renvoie des octets déjà prêts.
+#
+# Pas de vue par mois: les données nettoyées n'ont pas de date de
+# publication (added_at d'un segment est la date d'import, pas celle du
+# marché).
+#
+# Matérialiser les tables (démarrage à chaud du serveur), depuis
+# interface/backend:
+#     python -m utils.market_stats
+# =============================================================================
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+STATE_FORMAT_VERSION = 2
+
+# Vue -> colonnes de regroupement (prix de vente et loyers toujours séparés)
+VIEWS = {
+    'locations': ['location', 'type'],
+    'categories': ['category', 'type'],
+    'types': ['type'],
+}
+
+# Histogrammes en log10: prix de 10 à 10^8 TND, prix au m² de 0.01 à 10^6 TND
+BIN_WIDTH = 0.004
+PRICE_LOG_RANGE = (1.0, 8.0)
+PRICE_M2_LOG_RANGE = (-2.0, 6.0)
+
+
+def log_bins(values, log_range):
+    """Indice d'histogramme de chaque valeur (-1 si non positive ou non finie)"""
+    low, high = log_range
+    n_bins = int(round((high - low) / BIN_WIDTH))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        logs = np.log10(values)
+    valid = np.isfinite(logs)
+    bins = np.full(len(values), -1, dtype=np.int64)
+    bins[valid] = np.clip(((logs[valid] - low) / BIN_WIDTH).astype(np.int64), 0, n_bins - 1)
+    return bins
+
+
+def histogram_median(hist, log_range):
+    """
+    Médiane d'un histogramme log10, None si vide. Comme pandas, moyenne des
+    deux valeurs centrales pour un effectif pair; chaque valeur est placée
+    d'après son rang parmi celles de son bin.
+    """
+    total = int(hist.sum())
+    if total == 0:
+        return None
+    cumulative = np.cumsum(hist)
+
+    def order_statistic(rank):
+        """Valeur de rang rank (1 = la plus petite)"""
+        i = int(np.searchsorted(cumulative, rank))
+        before = cumulative[i - 1] if i else 0
+        position = i + (rank - before - 0.5) / hist[i]
+        return 10 ** (log_range[0] + position * BIN_WIDTH)
+
+    return float((order_statistic((total + 1) // 2) + order_statistic(total // 2 + 1)) / 2)
+
+
+class AggregateTable:
+    """
+    Table d'agrégats d'une vue: une ligne par clé de regroupement, ajout de
+    lignes quand une nouvelle clé apparaît.
+    """
+
+    def __init__(self, group_by):
+        """
+        Args:
+            group_by (list): Colonnes de la clé
+        """
+        self.group_by = list(group_by)
+        self.keys = []
+        self.index = {}
+        self.n_price_bins = int(round((PRICE_LOG_RANGE[1] - PRICE_LOG_RANGE[0]) / BIN_WIDTH))
+        self.n_m2_bins = int(round((PRICE_M2_LOG_RANGE[1] - PRICE_M2_LOG_RANGE[0]) / BIN_WIDTH))
+        self.count = np.zeros(0, dtype=np.int64)
+        # Annonces à prix fini (dénominateur de mean_price)
+        self.priced = np.zeros(0, dtype=np.int64)
+        self.price_sum = np.zeros(0)
+        self.price_hist = np.zeros((0, self.n_price_bins), dtype=np.int64)
+        self.m2_hist = np.zeros((0, self.n_m2_bins), dtype=np.int64)
+
+    def _rows(self, keys):
+        """Ligne de chaque clé distincte (lignes créées pour les nouvelles clés)"""
+        new = [key for key in keys if key not in self.index]
+        if new:
+            for key in new:
+                self.index[key] = len(self.keys)
+                self.keys.append(key)
+            grow = len(new)
+            self.count = np.concatenate([self.count, np.zeros(grow, dtype=np.int64)])
+            self.priced = np.concatenate([self.priced, np.zeros(grow, dtype=np.int64)])
+            self.price_sum = np.concatenate([self.price_sum, np.zeros(grow)])
+            self.price_hist = np.vstack([self.price_hist,
+                                         np.zeros((grow, self.n_price_bins), dtype=np.int64)])
+            self.m2_hist = np.vstack([self.m2_hist, np.zeros((grow, self.n_m2_bins), dtype=np.int64)])
+        return np.array([self.index[key] for key in keys], dtype=np.int64)
+
+    def add(self, columns, price, price_bins, m2_bins):
+        """
+        Ajoute un paquet de lignes.
+
+        Args:
+            columns (dict): Valeurs (np.ndarray) de chaque colonne de la clé
+            price (np.ndarray): Prix (valeurs non finies comptées mais hors mean_price)
+            price_bins (np.ndarray): Bins du prix (-1 = ignoré)
+            m2_bins (np.ndarray): Bins du prix au m² (-1 = ignoré)
+        """
+        if len(price) == 0:
+            return
+        stacked = np.array([columns[column] for column in self.group_by], dtype=object).T
+        keys, inverse = np.unique(stacked.astype(str), axis=0, return_inverse=True)
+        rows = self._rows([tuple(key) for key in keys])[inverse.ravel()]
+
+        n = len(self.keys)
+        self.count += np.bincount(rows, minlength=n)
+        finite = np.isfinite(price)
+        self.priced += np.bincount(rows[finite], minlength=n)
+        self.price_sum += np.bincount(rows[finite], weights=price[finite], minlength=n)
+        for hist, bins in ((self.price_hist, price_bins), (self.m2_hist, m2_bins)):
+            valid = bins >= 0
+            flat = rows[valid] * hist.shape[1] + bins[valid]
+            hist += np.bincount(flat, minlength=hist.size).reshape(hist.shape)
+
+    def records(self):
+        """Lignes de la table pour l'API, triées par clé"""
+        records = []
+        for key in sorted(self.keys):
+            row = self.index[key]
+            median_price = histogram_median(self.price_hist[row], PRICE_LOG_RANGE)
+            median_m2 = histogram_median(self.m2_hist[row], PRICE_M2_LOG_RANGE)
+            priced = int(self.priced[row])
+            records.append({
+                **dict(zip(self.group_by, key)),
+                'count': int(self.count[row]),
+                'mean_price': round(float(self.price_sum[row] / priced), 2) if priced else None,
+                'median_price': None if median_price is None else round(median_price, 2),
+                'median_price_m2': None if median_m2 is None else round(median_m2, 2),
+            })
+        return records
+
+    def arrays(self, prefix):
+        return {f'{prefix}_count': self.count, f'{prefix}_priced': self.priced,
+                f'{prefix}_price_sum': self.price_sum,
+                f'{prefix}_price_hist': self.price_hist, f'{prefix}_m2_hist': self.m2_hist}
+
+    def restore(self, keys, data, prefix):
+        self.keys = [tuple(key) for key in keys]
+        self.index = {key: row for row, key in enumerate(self.keys)}
+        self.count = data[f'{prefix}_count']
+        self.priced = data[f'{prefix}_priced']
+        self.price_sum = data[f'{prefix}_price_sum']
+        self.price_hist = data[f'{prefix}_price_hist']
+        self.m2_hist = data[f'{prefix}_m2_hist']
+
+
+class MarketStats:
+    """
+    Tables d'agrégats des vues et réponses JSON précalculées.
+
+    Les tables ne sont modifiées que par refresh() (sous verrou); les
+    réponses sont remplacées d'un bloc, les lectures ne prennent aucun verrou.
+    """
+
+    def __init__(self, dataset_dir, state_path=None):
+        """
+        Args:
+            dataset_dir (str): Jeu en colonnes (preprocessing/dataset.py)
+            state_path (str): Tables matérialisées (démarrage à chaud), optionnel
+        """
+        self.dataset_dir = dataset_dir
+        self.state_path = state_path
+        self._reset()
+        self.updated_at = None
+        self.last_error = None
+        self._payloads = {}
+        self._manifest_mtime = None
+        self._store = None
+        self._lock = threading.Lock()
+        self._started = False
+        self._stop = threading.Event()
+        self._watcher = None
+
+    def _reset(self):
+        """Tables vides"""
+        self.tables = {view: AggregateTable(group_by) for view, group_by in VIEWS.items()}
+        self.last_segment = None
+        self.last_segment_added_at = None
+        self.rows = 0
+
+    def _open_store(self):
+        """Jeu en colonnes (None s'il n'existe pas encore)"""
+        if self._store is None:
+            from config import PROJECT_ROOT
+            if PROJECT_ROOT not in sys.path:
+                sys.path.insert(0, PROJECT_ROOT)
+            from preprocessing.dataset import MANIFEST_NAME, DatasetStore
+
+            if not os.path.exists(os.path.join(self.dataset_dir, MANIFEST_NAME)):
+                return None
+            self._store = DatasetStore(self.dataset_dir)
+        return self._store
+
+    def _ensure_started(self):
+        """Premier accès: tables sauvegardées puis segments ajoutés depuis"""
+        if not self._started:
+            self.refresh()
+
+    def update(self, df):
+        """
+        Ajoute des lignes nettoyées aux tables.
+
+        Args:
+            df (pd.DataFrame): Colonnes price, size, location, category, type
+        """
+        price = df['price'].to_numpy(dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            price_m2 = price / df['size'].to_numpy(dtype=float)
+        price_bins = log_bins(price, PRICE_LOG_RANGE)
+        m2_bins = log_bins(price_m2, PRICE_M2_LOG_RANGE)
+        columns = {column: df[column].astype(str).to_numpy(dtype=object)
+                   for column in ('location', 'category', 'type')}
+        for table in self.tables.values():
+            table.add(columns, price, price_bins, m2_bins)
+        self.rows += len(df)
+
+    def _refresh_locked(self):
+        if not self._started:
+            self._started = True
+            if self.state_path and os.path.exists(self.state_path):
+                self._load_state(self.state_path)
+
+        store = self._open_store()
+        if store is None:
+            return 0
+        # Manifest inchangé: rien de nouveau (un stat, pas de lecture)
+        mtime = os.stat(os.path.join(self.dataset_dir, 'manifest.json')).st_mtime_ns
+        if mtime == self._manifest_mtime:
+            return 0
+        store.refresh()
+        self._manifest_mtime = mtime
+
+        if not self._state_matches(store):
+            # Jeu reconstruit depuis la dernière agrégation: tout est recalculé
+            self._reset()
+
+        added = 0
+        for segment, df in store.scan(['price', 'size', 'location', 'category', 'type'],
+                                      after=self.last_segment):
+            self.update(df)
+            self.last_segment = segment['id']
+            self.last_segment_added_at = segment['added_at']
+            added += len(df)
+        if added or not self._payloads:
+            self.updated_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+            self._payloads = self._render()
+        return added
+
+    def _state_matches(self, store):
+        """Le dernier segment agrégé est-il toujours celui du jeu?"""
+        if self.last_segment is None:
+            return True
+        for segment in store.segments:
+            if segment['id'] == self.last_segment:
+                return segment['added_at'] == self.last_segment_added_at
+        return False
+
+    def refresh(self):
+        """
+        Agrège les segments ajoutés depuis la dernière mise à jour.
+
+        Returns:
+            int: Nombre de lignes ajoutées
+        """
+        with self._lock:
+            return self._refresh_locked()
+
+    def _render(self):
+        """Réponses JSON (octets) et ETag de chaque vue"""
+        payloads = {}
+        for view, table in self.tables.items():
+            body = json.dumps({
+                'view': view,
+                'group_by': table.group_by,
+                'rows_total': self.rows,
+                'updated_at': self.updated_at,
+                'rows': table.records(),
+            }, ensure_ascii=False, allow_nan=False, separators=(',', ':')).encode('utf-8')
+            payloads[view] = (body, hashlib.blake2b(body, digest_size=8).hexdigest())
+        return payloads
+
+    def payload(self, view):
+        """
+        Réponse précalculée d'une vue.
+
+        Returns:
+            tuple: (corps JSON en octets, ETag) ou None si la vue est inconnue
+                ou le jeu absent
+        """
+        self._ensure_started()
+        return self._payloads.get(view)
+
+    @property
+    def available(self):
+        self._ensure_started()
+        return bool(self._payloads)
+
+    def watch(self, interval):
+        """Agrège les nouveaux segments toutes les interval secondes (thread démon)"""
+        if self._watcher is not None:
+            return
+
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.refresh()
+                    self.last_error = None
+                except Exception as e:
+                    self.last_error = str(e)
+
+        self._watcher = threading.Thread(target=loop, name="market-stats-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def save(self, path):
+        """Écrit les tables matérialisées (.npz sans pickle)"""
+        with self._lock:
+            meta = {
+                'format_version': STATE_FORMAT_VERSION,
+                'last_segment': self.last_segment,
+                'last_segment_added_at': self.last_segment_added_at,
+                'rows': self.rows,
+                'keys': {view: [list(key) for key in table.keys] for view, table in self.tables.items()},
+            }
+            arrays = {}
+            for view, table in self.tables.items():
+                arrays.update(table.arrays(view))
+            tmp_path = f'{path}.tmp-{os.getpid()}.npz'
+            np.savez(tmp_path, meta=np.array(json.dumps(meta, ensure_ascii=False)), **arrays)
+            os.replace(tmp_path, path)
+
+    def _load_state(self, path):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta.get('format_version') != STATE_FORMAT_VERSION:
+                return
+            for view, table in self.tables.items():
+                table.restore(meta['keys'][view], {name: data[name] for name in data.files
+                                                   if name.startswith(f'{view}_')}, view)
+        self.last_segment = meta['last_segment']
+        self.last_segment_added_at = meta['last_segment_added_at']
+        self.rows = meta['rows']
+
+
+def main():
+    import argparse
+
+    from config import DATASET_DIR, MARKET_STATS_PATH
+
+    parser = argparse.ArgumentParser(description="Matérialise les statistiques du marché")
+    parser.add_argument('--dataset-dir', default=DATASET_DIR, help="Jeu en colonnes")
+    parser.add_argument('--output', default=MARKET_STATS_PATH, help="Tables matérialisées (.npz)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stats = MarketStats(args.dataset_dir, args.output)
+    stats.refresh()
+    if not stats.available:
+        print(f"❌ Aucun jeu dans {args.dataset_dir}: python -m preprocessing.dataset import ...")
+        return 1
+    stats.save(args.output)
+    print(f"{stats.rows} annonces agrégées (segment {stats.last_segment}) en "
+          f"{time.perf_counter() - start:.2f} s -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
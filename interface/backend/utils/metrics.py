@@ -0,0 +1,158 @@
+import bisect
+import threading
+
+from config import METRICS_ENABLED
+
+# Bornes (s) des histogrammes: de la microseconde (étapes du chemin rapide)
+# à quelques secondes (gros lots)
+DEFAULT_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+                   1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    value = float(value)
+    if value.is_integer():
+        return str(int(value))
+    return {float('inf'): '+Inf', float('-inf'): '-Inf'}.get(value, repr(value))
+
+
+class Counter:
+    """Compteur monotone, une série par combinaison de labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        with self._lock:
+            values = dict(self._values)
+        return [f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}'
+                for labels, value in sorted(values.items())]
+
+
+class Histogram:
+    """Histogramme à bornes fixes (format Prometheus: buckets cumulés, sum, count)"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [comptes par bucket (+Inf en dernier), somme]
+        self._lock = threading.Lock()
+
+    def observe(self, value, labels=()):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += value
+
+    def render(self):
+        with self._lock:
+            series = {labels: (list(counts), total)
+                      for labels, (counts, total) in self._series.items()}
+        lines = []
+        for labels, (counts, total) in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{self.name}_bucket'
+                             f'{_format_labels(self.labelnames, labels, [("le", le)])} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, labels)} {total!r}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}')
+        return lines
+
+
+class Gauge:
+    """Jauge lue au moment du rendu: callback -> {labels: valeur}"""
+
+    kind = 'gauge'
+
+    def __init__(self, name, help_text, labelnames, callback):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+
+    def render(self):
+        return [f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}'
+                for labels, value in sorted(self.callback().items())]
+
+
+class MetricsRegistry:
+    """
+    Métriques du processus, exposées au format texte Prometheus.
+
+    Désactivé (METRICS_ENABLED=0), les appelants ne mesurent rien: ils
+    testent `metrics.enabled` avant de lire l'horloge.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._metrics = []
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def gauge(self, name, help_text, labelnames, callback):
+        return self._register(Gauge(name, help_text, labelnames, callback))
+
+    def render(self):
+        """Texte d'exposition Prometheus (version 0.0.4)"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry(enabled=METRICS_ENABLED)
+
+# Durée de chaque étape d'une prédiction (path: single = /predict, batch = /predict/batch)
+PREDICTION_STAGE_SECONDS = metrics.histogram(
+    'prediction_stage_seconds', 'Duration of each prediction stage', ('path', 'stage'))
+
+
+def stage_observer(path):
+    """
+    Callback observe(stage, secondes) pour un chemin de prédiction, ou None
+    si les métriques sont désactivées (aucune lecture d'horloge).
+    """
+    if not metrics.enabled:
+        return None
+
+    def observe(stage, seconds):
+        PREDICTION_STAGE_SECONDS.observe(seconds, (path, stage))
+    return observe
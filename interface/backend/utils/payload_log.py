@@ -0,0 +1,74 @@
+import json
+import os
+import random
+import threading
+import time
+
+
+class PayloadRecorder:
+    """
+    Journal append-only des requêtes de prédiction reçues (une ligne JSON
+    compacte par requête), rejouable par benchmarks/loadtest.py.
+
+    Format d'une ligne: {"t": horodatage, "p": chemin, "s": statut, "b": corps JSON}
+    """
+
+    def __init__(self, path, sample_rate=1.0):
+        """
+        Args:
+            path (str): Fichier journal (créé si absent)
+            sample_rate (float): Fraction des requêtes enregistrées (0 à 1)
+        """
+        self.path = path
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self._file = None
+
+    def _open(self):
+        if self._file is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            # O_APPEND: une ligne = un write, sans entrelacement entre processus
+            self._file = open(self.path, 'ab', buffering=0)
+        return self._file
+
+    def record(self, path, body, status):
+        """Ajoute une requête au journal (corps déjà décodé en JSON)"""
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        line = json.dumps({"t": round(time.time(), 3), "p": path, "s": status, "b": body},
+                          ensure_ascii=False, separators=(',', ':'))
+        data = (line + '\n').encode('utf-8')
+        with self._lock:
+            self._open().write(data)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def read_payloads(path, paths=None):
+    """
+    Relit un journal de requêtes.
+
+    Args:
+        path (str): Fichier journal
+        paths (set): Chemins à garder (None = tous)
+
+    Returns:
+        list: Entrées {"t", "p", "s", "b"} dans l'ordre d'enregistrement
+    """
+    entries = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # Dernière ligne tronquée (arrêt brutal)
+            if paths is None or entry.get("p") in paths:
+                entries.append(entry)
+    return entries
@@ -1,43 +1,55 @@
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card";
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs";
-import { BarChart, Bar, LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer, Legend, PieChart, Pie, Cell } from "recharts";
+import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer, PieChart, Pie, Cell } from "recharts";
 import { TrendingUp, BarChart3, PieChartIcon } from "lucide-react";
 
-// Données simulées - Dans votre version réelle, ces données viendront de votre API
-const cityPrices = [
-  { city: "Tunis", avgPrice: 180000, count: 450, growth: 5.2 },
-  { city: "La Marsa", avgPrice: 320000, count: 180, growth: 7.8 },
-  { city: "Sousse", avgPrice: 145000, count: 320, growth: 4.1 },
-  { city: "Hammamet", avgPrice: 250000, count: 210, growth: 6.5 },
-  { city: "Sfax", avgPrice: 135000, count: 280, growth: 3.9 },
-  { city: "Monastir", avgPrice: 160000, count: 190, growth: 4.7 },
-  { city: "Ariana", avgPrice: 195000, count: 340, growth: 5.8 },
-  { city: "Bizerte", avgPrice: 125000, count: 150, growth: 3.2 },
-];
+import { useQuery } from "@tanstack/react-query";
 
-const monthlyTrends = [
-  { month: "Jan", vente: 165000, location: 850 },
-  { month: "Fév", vente: 168000, location: 870 },
-  { month: "Mar", vente: 172000, location: 890 },
-  { month: "Avr", vente: 175000, location: 910 },
-  { month: "Mai", vente: 180000, location: 920 },
-  { month: "Jun", vente: 183000, location: 950 },
-  { month: "Jul", vente: 188000, location: 970 },
-  { month: "Aoû", vente: 192000, location: 990 },
-  { month: "Sep", vente: 195000, location: 1010 },
-  { month: "Oct", vente: 198000, location: 1030 },
-  { month: "Nov", vente: 201000, location: 1050 },
-  { month: "Déc", vente: 205000, location: 1080 },
-];
+// Agrégats précalculés par le backend (GET /market/<vue>, revalidés par ETag)
+const MARKET_API_URL = "http://localhost:5000/market";
+
+interface MarketRow {
+  location?: string;
+  category?: string;
+  type: string;
+  count: number;
+  mean_price: number | null;
+  median_price: number | null;
+  median_price_m2: number | null;
+}
 
-const propertyTypes = [
-  { name: "Appartements", value: 45, color: "hsl(210 100% 45%)" },
-  { name: "Maisons", value: 28, color: "hsl(25 95% 53%)" },
-  { name: "Villas", value: 15, color: "hsl(142 76% 36%)" },
-  { name: "Studios", value: 8, color: "hsl(195 100% 50%)" },
-  { name: "Autres", value: 4, color: "hsl(215 16% 47%)" },
+interface MarketView {
+  view: string;
+  rows_total: number;
+  updated_at: string | null;
+  rows: MarketRow[];
+}
+
+const SALE = "À Vendre";
+const CATEGORY_COLORS = [
+  "hsl(210 100% 45%)",
+  "hsl(25 95% 53%)",
+  "hsl(142 76% 36%)",
+  "hsl(195 100% 50%)",
+  "hsl(215 16% 47%)",
+  "hsl(280 65% 55%)",
 ];
 
+const useMarketView = (view: string) =>
+  useQuery<MarketView>({
+    queryKey: ["market", view],
+    queryFn: async () => {
+      const response = await fetch(`${MARKET_API_URL}/${view}`);
+      if (!response.ok) {
+        throw new Error("Statistiques du marché indisponibles");
+      }
+      return response.json();
+    },
+    staleTime: 60_000,
+  });
+
+const capitalize = (value: string) => value.replace(/(^|\s)\S/g, (c) => c.toUpperCase());
+
 const CustomTooltip = ({ active, payload, label }: any) => {
   if (active && payload && payload.length) {
     return (
@@ -55,6 +67,36 @@ const CustomTooltip = ({ active, payload, label }: any) => {
 };
 
 export default function MarketTrends() {
+  const locations = useMarketView("locations");
+  const categories = useMarketView("categories");
+
+  // Prix de vente médian des villes les plus représentées
+  const cityPrices = (locations.data?.rows ?? [])
+    .filter((row) => row.type === SALE)
+    .sort((a, b) => b.count - a.count)
+    .slice(0, 8)
+    .map((row) => ({ city: capitalize(row.location ?? ""), medianPrice: row.median_price, count: row.count }));
+
+  const categoryRows = categories.data?.rows ?? [];
+  const categoryTotal = categoryRows.reduce((total, row) => total + row.count, 0);
+  const propertyTypes = Object.entries(
+    categoryRows.reduce<Record<string, number>>((counts, row) => {
+      counts[row.category ?? ""] = (counts[row.category ?? ""] ?? 0) + row.count;
+      return counts;
+    }, {})
+  )
+    .sort(([, a], [, b]) => b - a)
+    .map(([name, count], index) => ({
+      name,
+      value: categoryTotal ? Math.round((count / categoryTotal) * 100) : 0,
+      color: CATEGORY_COLORS[index % CATEGORY_COLORS.length],
+    }));
+  const categoryPrices = categoryRows
+    .filter((row) => row.type === SALE)
+    .map((row) => ({ type: row.category, price: row.median_price }));
+
+  const unavailable = locations.isError || categories.isError;
+
   return (
     <div className="w-full max-w-6xl mx-auto space-y-6">
       <div className="text-center space-y-2">
@@ -63,12 +105,18 @@ export default function MarketTrends() {
           Analyse du Marché Immobilier
         </h2>
         <p className="text-muted-foreground">
-          Visualisez les tendances et comparez les prix à travers la Tunisie
+          Comparez les prix à travers la Tunisie
         </p>
       </div>
 
+      {unavailable && (
+        <p className="text-center text-sm text-muted-foreground">
+          Statistiques du marché indisponibles pour le moment.
+        </p>
+      )}
+
       <Tabs defaultValue="cities" className="w-full">
-        <TabsList className="grid w-full grid-cols-3 mb-6">
+        <TabsList className="grid w-full grid-cols-2 mb-6">
           <TabsTrigger value="cities" className="flex items-center gap-2">
             <BarChart3 className="h-4 w-4" />
             Prix par Ville
@@ -77,19 +125,15 @@ export default function MarketTrends() {
             <PieChartIcon className="h-4 w-4" />
             Types de Biens
           </TabsTrigger>
-          <TabsTrigger value="trends" className="flex items-center gap-2">
-            <TrendingUp className="h-4 w-4" />
-            Tendances
-          </TabsTrigger>
         </TabsList>
 
         {/* Prix par Ville */}
         <TabsContent value="cities" className="space-y-4">
           <Card className="shadow-lg border-0 bg-card/50 backdrop-blur-sm">
             <CardHeader>
-              <CardTitle>Prix Moyen par Ville</CardTitle>
+              <CardTitle>Prix Médian par Ville</CardTitle>
               <CardDescription>
-                Comparaison des prix moyens des biens immobiliers dans les principales villes tunisiennes
+                Prix de vente médians dans les villes tunisiennes les plus représentées
               </CardDescription>
             </CardHeader>
             <CardContent>
@@ -111,10 +155,10 @@ export default function MarketTrends() {
                   />
                   <Tooltip content={<CustomTooltip />} />
                   <Bar 
-                    dataKey="avgPrice" 
+                    dataKey="medianPrice" 
                     fill="hsl(var(--primary))"
                     radius={[8, 8, 0, 0]}
-                    name="Prix moyen"
+                    name="Prix médian"
                   />
                 </BarChart>
               </ResponsiveContainer>
@@ -122,56 +166,6 @@ export default function MarketTrends() {
           </Card>
         </TabsContent>
 
-        {/* Tendances Temporelles */}
-        <TabsContent value="trends" className="space-y-4">
-          <div className="grid grid-cols-1 md:grid-cols-3 gap-4">
-            <Card className="shadow-md border-0 bg-gradient-to-br from-primary/10 to-primary/5">
-              <CardContent className="pt-6">
-                <div className="flex items-center justify-between">
-                  <div>
-                    <p className="text-sm text-muted-foreground mb-1">Prix Moyen Vente</p>
-                    <p className="text-3xl font-bold text-foreground">205k TND</p>
-                    <p className="text-xs text-success mt-1">+24% cette année</p>
-                  </div>
-                  <div className="p-3 rounded-full bg-primary/20">
-                    <TrendingUp className="h-6 w-6 text-primary" />
-                  </div>
-                </div>
-              </CardContent>
-            </Card>
-
-            <Card className="shadow-md border-0 bg-gradient-to-br from-accent/10 to-accent/5">
-              <CardContent className="pt-6">
-                <div className="flex items-center justify-between">
-                  <div>
-                    <p className="text-sm text-muted-foreground mb-1">Loyer Moyen</p>
-                    <p className="text-3xl font-bold text-foreground">1,080 TND</p>
-                    <p className="text-xs text-success mt-1">+27% cette année</p>
-                  </div>
-                  <div className="p-3 rounded-full bg-accent/20">
-                    <TrendingUp className="h-6 w-6 text-accent" />
-                  </div>
-                </div>
-              </CardContent>
-            </Card>
-
-            <Card className="shadow-md border-0 bg-gradient-to-br from-success/10 to-success/5">
-              <CardContent className="pt-6">
-                <div className="flex items-center justify-between">
-                  <div>
-                    <p className="text-sm text-muted-foreground mb-1">Transactions</p>
-                    <p className="text-3xl font-bold text-foreground">2,450</p>
-                    <p className="text-xs text-success mt-1">+12% ce mois</p>
-                  </div>
-                  <div className="p-3 rounded-full bg-success/20">
-                    <BarChart3 className="h-6 w-6 text-success" />
-                  </div>
-                </div>
-              </CardContent>
-            </Card>
-          </div>
-        </TabsContent>
-
         {/* Types de Biens */}
         <TabsContent value="types" className="space-y-4">
           <div className="grid grid-cols-1 md:grid-cols-2 gap-6">
@@ -243,21 +237,15 @@ export default function MarketTrends() {
 
           <Card className="shadow-lg border-0 bg-card/50 backdrop-blur-sm">
             <CardHeader>
-              <CardTitle>Prix Moyen par Type de Bien</CardTitle>
+              <CardTitle>Prix Médian par Type de Bien</CardTitle>
               <CardDescription>
-                Comparaison des prix moyens selon la catégorie
+                Comparaison des prix de vente médians selon la catégorie
               </CardDescription>
             </CardHeader>
             <CardContent>
               <ResponsiveContainer width="100%" height={300}>
                 <BarChart 
-                  data={[
-                    { type: "Studio", price: 95000 },
-                    { type: "Appartement", price: 175000 },
-                    { type: "Maison", price: 280000 },
-                    { type: "Villa", price: 450000 },
-                    { type: "Duplex", price: 320000 },
-                  ]}
+                  data={categoryPrices}
                   margin={{ top: 20, right: 30, left: 20, bottom: 20 }}
                 >
                   <CartesianGrid strokeDasharray="3 3" stroke="hsl(var(--border))" />
@@ -276,7 +264,7 @@ export default function MarketTrends() {
                     dataKey="price" 
                     fill="hsl(var(--primary))"
                     radius={[8, 8, 0, 0]}
-                    name="Prix moyen"
+                    name="Prix médian"
                   />
                 </BarChart>
               </ResponsiveContainer>
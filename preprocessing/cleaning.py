@@ -0,0 +1,261 @@
+# =============================================================================
+# cleaning.py - Nettoyage des sorties brutes des scrapers
+#
+# Reprend les étapes de preprocessing/cleaning.ipynb (renommage, catégories,
+# plages valides par catégorie, localisation, prix, doublons, log_price) en
+# opérations vectorisées sur les colonnes, par paquets de lignes: la mémoire
+# ne dépend pas de la taille du crawl.
+#
+# Entrées: CSV ou JSONL de TayaraScraper / MubawabScraper (mélangeables).
+# Sorties: cleaned_data.csv et cleaned_data_filtered.csv (même schéma que
+# data/clean/); avec --store, les lignes filtrées sont aussi ajoutées au jeu
+# en colonnes (preprocessing/dataset.py), sauf celles qu'il contient déjà.
+#
+# Usage (depuis la racine du projet):
+#     python -m preprocessing.cleaning data/raw/tayaratn_data.csv
+#     python -m preprocessing.cleaning tayaratn_data.jsonl mubawab_data.jsonl --output-dir data/clean
+#     python -m preprocessing.cleaning data/raw/tayaratn_data.csv --store data/store
+# =============================================================================
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from scraping.utils import PRICE_JUNK
+
+from .dataset import DatasetStore
+
+CLEAN_COLUMNS = ["price", "type", "size", "bathroom_count", "room_count",
+                 "location", "category", "log_price"]
+# Colonnes brutes utiles au nettoyage (les autres ne sont pas lues)
+RAW_COLUMNS = ["title", "price", "type", "transaction_type", "surface",
+               "bathrooms", "rooms", "location", "url"]
+NUMERIC_COLUMNS = {"surface": "size", "bathrooms": "bathroom_count", "rooms": "room_count"}
+
+# Tayara: catégorie = segment de l'URL (https://www.tayara.tn/item/<catégorie>/...)
+TAYARA_URL = r"^[^/]*//[^/]+/item/([^/]*)"
+TAYARA_CATEGORIES = {
+    'appartements': 'Appartements',
+    'locations-de-vacances': 'Locations de vacances',
+    'colocations': 'Colocations',
+    'maisons-et-villas': 'Maisons et Villas',
+    'terrains-et-fermes': 'Terrains et Fermes',
+    'magasins-commerces-et-locaux-industriels': 'Magasins, Commerces et Locaux industriels',
+    'bureaux-et-plateaux': 'Bureaux et Plateaux'
+}
+# Mubawab: catégorie déduite du type de bien (à défaut du titre), premier motif trouvé
+KEYWORD_CATEGORIES = [
+    (r"colocation", 'Colocations'),
+    (r"vacances", 'Locations de vacances'),
+    (r"terrain|ferme", 'Terrains et Fermes'),
+    (r"bureau|plateau", 'Bureaux et Plateaux'),
+    (r"magasin|commerce|\blocal\b|\blocaux\b|entrep[oô]t|usine", 'Magasins, Commerces et Locaux industriels'),
+    (r"villa|maison|riad", 'Maisons et Villas'),
+    (r"appartement|studio|duplex|triplex|penthouse|s\+\d", 'Appartements'),
+]
+OTHER_CATEGORY = 'Autre Immobilier'
+# Exclues du jeu d'entraînement (surfaces des terrains trop peu fiables)
+DROPPED_CATEGORIES = ['Terrains et Fermes', OTHER_CATEGORY]
+
+# Plages valides (chambres, salles de bain, surface) par groupe de catégories
+VALID_RANGES = [
+    (['Appartements', 'Locations de vacances', 'Colocations', 'Maisons et Villas'],
+     (1, 20), (1, 15), (70, 2000)),
+    (['Magasins, Commerces et Locaux industriels', 'Bureaux et Plateaux'],
+     (1, 15), (0, 10), (20, 2000)),
+]
+
+# Plages de prix de cleaned_data_filtered.csv
+PRICE_RANGES = {"À Vendre": (10_000, 2_000_000), "À Louer": (100, 50_000)}
+
+
+def price_column(values):
+    """Version vectorisée de utils.normalize_price (NaN si non convertible)"""
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(float)
+    text = values.astype("string").str.replace(PRICE_JUNK, "", regex=True)
+    commas = text.str.count(",")
+    dots = text.str.count(r"\.")
+    european = (commas == 1) & (dots > 1)
+    text = text.mask(european, text.str.replace(".", "", regex=False))
+    text = text.mask((commas == 1) & ((dots == 0) | european), text.str.replace(",", ".", regex=False))
+    return pd.to_numeric(text, errors="coerce").astype(float)
+
+
+def number_column(values):
+    """Version vectorisée de utils.extract_number (premier entier trouvé)"""
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(float)
+    text = values.astype("string").str.replace(",", "", regex=False).str.replace(" ", "", regex=False)
+    return pd.to_numeric(text.str.extract(r"(\d+)", expand=False),
+                         errors="coerce").astype(float)
+
+
+def on_distinct(values, transform):
+    """
+    Applique une transformation de colonne aux seules valeurs distinctes
+    (lieux, types de bien: quelques dizaines pour des millions de lignes).
+    """
+    codes, uniques = pd.factorize(values)
+    result = np.asarray(transform(pd.Series(uniques, dtype="string")), dtype=object)
+    # Code -1 (valeur manquante) -> dernier élément ajouté: NaN
+    return pd.Series(np.append(result, np.nan)[codes], index=values.index)
+
+
+def keyword_category(text):
+    """Catégorie d'après le type de bien ou le titre (premier motif trouvé)"""
+    text = text.str.lower().fillna("")
+    return np.select([text.str.contains(pattern, regex=True).to_numpy(dtype=bool)
+                      for pattern, _ in KEYWORD_CATEGORIES],
+                     [category for _, category in KEYWORD_CATEGORIES], OTHER_CATEGORY)
+
+
+def category_column(raw):
+    """Catégorie de chaque annonce (URL Tayara, sinon type de bien / titre)"""
+    slug = raw["url"].astype("string").str.extract(TAYARA_URL, expand=False)
+    tayara = slug.notna().to_numpy(dtype=bool)
+    from_url = slug.map(TAYARA_CATEGORIES).fillna(OTHER_CATEGORY)
+
+    category = pd.Series(from_url.to_numpy(dtype=object), index=raw.index)
+    others = raw.loc[~tayara]
+    category[~tayara] = on_distinct(others["type"].fillna(others["title"]), keyword_category)
+    return category
+
+
+def governorate(location):
+    """Gouvernorat normalisé (Tayara: "Ariana"; Mubawab: "La Marsa  à Tunis")"""
+    return (location.str.rsplit(" à ", n=1).str[-1]
+            .str.lower().str.replace("-", " ", regex=False).str.strip())
+
+
+def clean_chunk(raw):
+    """
+    Nettoie un paquet de lignes brutes (sans les doublons entre paquets).
+
+    Args:
+        raw (DataFrame): Lignes des scrapers (colonnes manquantes = vides)
+
+    Returns:
+        DataFrame: Colonnes CLEAN_COLUMNS
+    """
+    raw = raw.reindex(columns=RAW_COLUMNS)
+    data = pd.DataFrame({"price": price_column(raw["price"])})
+
+    # Tayara: "À Louer" / "À Vendre"; Mubawab: "location" / "vente"
+    data["type"] = np.where(raw["transaction_type"].isin(["À Louer", "location"]), "À Louer", "À Vendre")
+    for column, name in NUMERIC_COLUMNS.items():
+        data[name] = number_column(raw[column])
+
+    data["location"] = on_distinct(raw["location"], governorate)
+    data["category"] = category_column(raw)
+
+    keep = ~data["category"].isin(DROPPED_CATEGORIES)
+    for categories, rooms, bathrooms, size in VALID_RANGES:
+        valid = (data["room_count"].between(*rooms) & data["bathroom_count"].between(*bathrooms)
+                 & data["size"].between(*size))
+        keep &= ~(data["category"].isin(categories) & ~valid)
+    keep &= data["price"].notna() & (data["price"] >= 10)
+    data = data[keep].copy()
+
+    # Prix de vente saisis en milliers de dinars
+    thousands = (data["type"] == "À Vendre") & (data["price"] < 10000)
+    data.loc[thousands, "price"] *= 1000
+
+    data["log_price"] = np.log10(data["price"])
+    return data[CLEAN_COLUMNS]
+
+
+def filter_prices(data):
+    """Lignes de cleaned_data_filtered.csv (prix plausibles selon le type)"""
+    keep = pd.Series(False, index=data.index)
+    for transaction, (low, high) in PRICE_RANGES.items():
+        keep |= (data["type"] == transaction) & data["price"].between(low, high)
+    return data[keep]
+
+
+def read_chunks(path, chunksize):
+    """Paquets de lignes d'un fichier brut (CSV ou JSONL)"""
+    if path.endswith((".jsonl", ".json")):
+        return pd.read_json(path, lines=True, chunksize=chunksize, dtype=False, convert_dates=False)
+    return pd.read_csv(path, chunksize=chunksize, usecols=lambda column: column in RAW_COLUMNS)
+
+
+class Deduplicator:
+    """Doublons entre paquets: empreinte (hash 64 bits) des lignes déjà écrites"""
+
+    def __init__(self):
+        # Trié: recherche dichotomique des empreintes de chaque paquet
+        self.seen = np.empty(0, dtype=np.uint64)
+
+    def __call__(self, data):
+        hashes = pd.util.hash_pandas_object(data, index=False).to_numpy()
+        new = ~pd.Series(hashes).duplicated().to_numpy()
+        if len(self.seen):
+            positions = np.searchsorted(self.seen, hashes).clip(max=len(self.seen) - 1)
+            new &= self.seen[positions] != hashes
+        self.seen = np.sort(np.concatenate([self.seen, hashes[new]]))
+        return data[new]
+
+
+def clean_files(paths, output_dir, chunksize=50_000, store_dir=None):
+    """
+    Nettoie les sorties brutes et écrit cleaned_data.csv / cleaned_data_filtered.csv.
+
+    Args:
+        paths (list): Fichiers bruts (CSV ou JSONL)
+        output_dir (str): Dossier des CSV nettoyés
+        chunksize (int): Lignes lues par paquet
+        store_dir (str): Jeu en colonnes où ajouter les lignes filtrées (None = aucun)
+
+    Returns:
+        dict: Nombre de lignes lues, nettoyées et filtrées
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    outputs = {"cleaned": os.path.join(output_dir, "cleaned_data.csv"),
+               "filtered": os.path.join(output_dir, "cleaned_data_filtered.csv")}
+    counts = {"raw": 0, "cleaned": 0, "filtered": 0}
+    deduplicate = Deduplicator()
+    store = DatasetStore(store_dir) if store_dir else None
+    first = True
+
+    for path in paths:
+        for raw in read_chunks(path, chunksize):
+            cleaned = deduplicate(clean_chunk(raw))
+            tables = {"cleaned": cleaned, "filtered": filter_prices(cleaned)}
+            for name, table in tables.items():
+                table.to_csv(outputs[name], mode="w" if first else "a", header=first, index=False)
+                counts[name] += len(table)
+            if store is not None:
+                store.append(tables["filtered"])
+            counts["raw"] += len(raw)
+            first = False
+
+    if first:
+        for path in outputs.values():
+            pd.DataFrame(columns=CLEAN_COLUMNS).to_csv(path, index=False)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nettoyage des données brutes des scrapers")
+    parser.add_argument("inputs", nargs="+", help="Sorties des scrapers (CSV ou JSONL)")
+    parser.add_argument("--output-dir", default=os.path.join("data", "clean"),
+                        help="Dossier de cleaned_data.csv et cleaned_data_filtered.csv")
+    parser.add_argument("--chunksize", type=int, default=50_000, help="Lignes lues par paquet")
+    parser.add_argument("--store", help="Jeu en colonnes où ajouter les lignes filtrées (ex. data/store)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = clean_files(args.inputs, args.output_dir, args.chunksize, args.store)
+    print(f"{counts['raw']} lignes brutes -> {counts['cleaned']} nettoyées, "
+          f"{counts['filtered']} après filtre des prix ({time.perf_counter() - start:.1f} s)")
+    print(f"Données sauvegardées dans {args.output_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,370 @@
+# =============================================================================
+# dataset.py - Jeu de données nettoyé en colonnes, partitionné
+#
+# Remplace la relecture complète de data/clean/*.csv: chaque colonne est un
+# fichier .npy ouvert en memory-map et une lecture ne touche que les
+# colonnes et les partitions (location, category) demandées.
+#
+#   <store>/manifest.json           schéma, dictionnaires, segments
+#   <store>/s000012/<colonne>.npy   un segment par ajout
+#   <store>/s000012/row_hashes.npy  empreintes des lignes du segment
+#
+# Dans un segment, les lignes sont triées par partition et le manifest
+# garde la plage [start, stop) de chaque partition: lire une partition est
+# une tranche des memory-maps. (Un dossier par partition multiplierait les
+# ouvertures de fichiers: la plupart des partitions ont quelques dizaines
+# de lignes.)
+#
+# location, category et type sont des catégorielles: codes entiers vers
+# des dictionnaires globaux du manifest (en ajout seul, les codes restent
+# stables). location et category, constantes sur la plage d'une partition,
+# ne sont pas stockées par ligne.
+#
+# Chaque ajout écrit un nouveau segment (jamais modifié ensuite) puis
+# remplace le manifest atomiquement: un lecteur voit l'état avant ou après
+# l'ajout, jamais un segment à moitié écrit. Un seul écrivain à la fois.
+#
+# Les lignes nettoyées sont uniques (doublons retirés par le nettoyage):
+# chaque segment garde l'empreinte de ses lignes et un ajout ignore celles
+# déjà présentes. Réimporter un CSV ou relancer le nettoyage avec --store
+# ne duplique rien.
+#
+# Usage (depuis la racine du projet):
+#     python -m preprocessing.dataset import data/clean/cleaned_data_filtered.csv --store data/store
+#     python -m preprocessing.dataset info --store data/store
+# =============================================================================
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+DATASET_FORMAT_VERSION = 2
+MANIFEST_NAME = "manifest.json"
+# Empreintes (hash 64 bits) des lignes d'un segment, triées
+ROW_HASHES = "row_hashes.npy"
+
+# Schéma de cleaned_data*.csv
+CATEGORICAL_COLUMNS = ["location", "category", "type"]
+NUMERIC_COLUMNS = {"price": "float64", "size": "float64", "bathroom_count": "float64",
+                   "room_count": "float64", "log_price": "float64"}
+COLUMNS = ["price", "type", "size", "bathroom_count", "room_count", "location", "category",
+           "log_price"]
+PARTITION_BY = ["location", "category"]
+# Colonnes stockées par ligne (les clés de partition sont dans le manifest)
+STORED_COLUMNS = [column for column in COLUMNS if column not in PARTITION_BY]
+
+
+class DatasetStore:
+    """
+    Jeu de données en colonnes .npy, partitionné par (location, category).
+
+    Exemple:
+        store = DatasetStore("data/store")
+        df = store.load(columns=["price", "size"], locations=["ariana"])
+    """
+
+    def __init__(self, root):
+        """
+        Args:
+            root (str): Dossier du jeu (créé au premier ajout)
+        """
+        self.root = root
+        self.manifest = self._read_manifest()
+        # Empreintes triées de toutes les lignes du jeu (lues au premier ajout)
+        self._seen = None
+
+    def _read_manifest(self):
+        path = os.path.join(self.root, MANIFEST_NAME)
+        if not os.path.exists(path):
+            return {"format_version": DATASET_FORMAT_VERSION,
+                    "columns": {**NUMERIC_COLUMNS, **{c: "category" for c in CATEGORICAL_COLUMNS}},
+                    "partition_by": PARTITION_BY,
+                    "dictionaries": {column: [] for column in CATEGORICAL_COLUMNS},
+                    "segments": [], "next_segment": 0}
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("format_version") != DATASET_FORMAT_VERSION:
+            raise ValueError(f"unsupported dataset format {manifest.get('format_version')} in {path}")
+        return manifest
+
+    def refresh(self):
+        """Relit le manifest (ajouts faits par un autre processus)"""
+        self.manifest = self._read_manifest()
+        self._seen = None
+        return self
+
+    @property
+    def dictionaries(self):
+        return self.manifest["dictionaries"]
+
+    @property
+    def segments(self):
+        return self.manifest["segments"]
+
+    @property
+    def rows(self):
+        return sum(segment["rows"] for segment in self.segments)
+
+    def partitions(self):
+        """Nombre de lignes par (location, category)"""
+        counts = {}
+        for segment in self.segments:
+            for part in segment["partitions"]:
+                key = (part["location"], part["category"])
+                counts[key] = counts.get(key, 0) + part["stop"] - part["start"]
+        return counts
+
+    def select(self, locations=None, categories=None, after=None):
+        """
+        Plages de lignes retenues par les filtres de partition.
+
+        Args:
+            locations (list): Villes à garder (None = toutes)
+            categories (list): Catégories à garder (None = toutes)
+            after (int): Seulement les segments d'identifiant supérieur
+                (lecture des ajouts depuis un segment connu)
+
+        Returns:
+            list: (segment, partitions retenues du segment), segments non vides
+        """
+        locations = None if locations is None else set(locations)
+        categories = None if categories is None else set(categories)
+        selected = []
+        for segment in self.segments:
+            if after is not None and segment["id"] <= after:
+                continue
+            parts = [part for part in segment["partitions"]
+                     if (locations is None or part["location"] in locations)
+                     and (categories is None or part["category"] in categories)]
+            if parts:
+                selected.append((segment, parts))
+        return selected
+
+    def _codes(self, column, values):
+        """Codes des valeurs dans le dictionnaire de la colonne (complété si besoin)"""
+        dictionary = self.dictionaries[column]
+        known = {value: code for code, value in enumerate(dictionary)}
+        for value in pd.unique(values):
+            if value not in known:
+                known[value] = len(dictionary)
+                dictionary.append(value)
+        return known
+
+    @staticmethod
+    def row_hashes(df):
+        """
+        Empreinte de chaque ligne. log_price (déduit de price) n'y entre pas et
+        les numériques sont arrondies: une ligne relue d'un CSV (lecture des
+        flottants à un ulp près) garde l'empreinte de la ligne calculée.
+        """
+        columns = [column for column in COLUMNS if column != "log_price"]
+        numeric = [column for column in columns if column in NUMERIC_COLUMNS]
+        canonical = df[columns].astype({column: str for column in CATEGORICAL_COLUMNS})
+        canonical[numeric] = canonical[numeric].astype("float64").round(6)
+        return pd.util.hash_pandas_object(canonical, index=False).to_numpy()
+
+    def _seen_hashes(self):
+        if self._seen is None:
+            parts = [np.load(os.path.join(self.root, segment["path"], ROW_HASHES))
+                     for segment in self.segments]
+            self._seen = np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.uint64)
+        return self._seen
+
+    def append(self, df):
+        """
+        Ajoute des lignes nettoyées (schéma de cleaned_data*.csv) dans un
+        nouveau segment. Les lignes déjà présentes dans le jeu (ou répétées
+        dans df) sont ignorées.
+
+        Args:
+            df (pd.DataFrame): Lignes à ajouter
+
+        Returns:
+            dict: Entrée du manifest du segment écrit (None si aucune ligne nouvelle)
+        """
+        missing = [column for column in COLUMNS if column not in df.columns]
+        if missing:
+            raise ValueError(f"missing columns: {missing}")
+        df = df.dropna(subset=CATEGORICAL_COLUMNS)
+        if df.empty:
+            return None
+
+        df = df.astype({column: str for column in CATEGORICAL_COLUMNS})
+        hashes = self.row_hashes(df)
+        new = ~pd.Series(hashes).duplicated().to_numpy()
+        seen = self._seen_hashes()
+        if len(seen):
+            positions = np.searchsorted(seen, hashes).clip(max=len(seen) - 1)
+            new &= seen[positions] != hashes
+        if not new.any():
+            return None
+        df, hashes = df[new], hashes[new]
+
+        type_codes = self._codes("type", df["type"])
+        self._codes("location", df["location"])
+        self._codes("category", df["category"])
+        # Tri stable par partition: chaque partition devient une plage contiguë
+        df = df.sort_values(PARTITION_BY, kind="stable")
+
+        segment_id = self.manifest["next_segment"]
+        relative = f"s{segment_id:06d}"
+        directory = os.path.join(self.root, relative)
+        os.makedirs(directory, exist_ok=True)
+        type_dtype = np.int8 if len(type_codes) <= np.iinfo(np.int8).max else np.int32
+        for column in STORED_COLUMNS:
+            if column == "type":
+                values = df["type"].map(type_codes).to_numpy(dtype=type_dtype)
+            else:
+                values = df[column].to_numpy(dtype=NUMERIC_COLUMNS[column])
+            np.save(os.path.join(directory, f"{column}.npy"), values)
+        hashes = np.sort(hashes)
+        np.save(os.path.join(directory, ROW_HASHES), hashes)
+
+        keys = df[PARTITION_BY].to_numpy(dtype=object)
+        boundaries = np.flatnonzero((keys[1:] != keys[:-1]).any(axis=1)) + 1
+        starts = np.concatenate([[0], boundaries])
+        stops = np.concatenate([boundaries, [len(df)]])
+        segment = {
+            "id": segment_id, "path": relative, "rows": len(df),
+            "added_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "partitions": [{"location": keys[start][0], "category": keys[start][1],
+                            "start": int(start), "stop": int(stop)}
+                           for start, stop in zip(starts, stops)],
+        }
+        self.manifest["segments"].append(segment)
+        self.manifest["next_segment"] = segment_id + 1
+        self._write_manifest()
+        self._seen = np.sort(np.concatenate([seen, hashes]))
+        return segment
+
+    def _write_manifest(self):
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, MANIFEST_NAME)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
+
+    def _segment_columns(self, segment, parts, columns, mmap_mode):
+        """Tableaux des colonnes demandées sur les plages retenues d'un segment"""
+        whole = sum(part["stop"] - part["start"] for part in parts) == segment["rows"]
+        arrays = {}
+        for column in columns:
+            if column in PARTITION_BY:
+                dictionary = self.dictionaries[column]
+                arrays[column] = np.concatenate([
+                    np.full(part["stop"] - part["start"], dictionary.index(part[column]), dtype=np.int32)
+                    for part in parts])
+                continue
+            values = np.load(os.path.join(self.root, segment["path"], f"{column}.npy"),
+                             mmap_mode=mmap_mode)
+            # Tranches contiguës des memory-maps: seules leurs pages sont lues
+            arrays[column] = values if whole else np.concatenate(
+                [values[part["start"]:part["stop"]] for part in parts])
+        return arrays
+
+    def _frame(self, selected, columns, mmap_mode):
+        chunks = [self._segment_columns(segment, parts, columns, mmap_mode)
+                  for segment, parts in selected]
+        data = {}
+        for column in columns:
+            parts = [chunk[column] for chunk in chunks]
+            if column in CATEGORICAL_COLUMNS:
+                codes = np.concatenate(parts) if parts else np.empty(0, dtype=np.int32)
+                data[column] = pd.Categorical.from_codes(codes, categories=self.dictionaries[column])
+            elif len(parts) == 1:
+                data[column] = parts[0]
+            else:
+                data[column] = (np.concatenate(parts) if parts
+                                else np.empty(0, dtype=NUMERIC_COLUMNS[column]))
+        return pd.DataFrame(data, columns=columns)
+
+    def load(self, columns=None, locations=None, categories=None, after=None, mmap_mode="r"):
+        """
+        Lit des colonnes et des partitions du jeu.
+
+        Args:
+            columns (list): Colonnes à lire (None = toutes, ordre de COLUMNS)
+            locations (list): Villes à lire (None = toutes)
+            categories (list): Catégories à lire (None = toutes)
+            after (int): Seulement les segments d'identifiant supérieur
+            mmap_mode (str): Mode de np.load (None = lecture complète en mémoire)
+
+        Returns:
+            pd.DataFrame: location, category et type en catégorielles
+        """
+        columns = self._check_columns(columns)
+        return self._frame(self.select(locations, categories, after), columns, mmap_mode)
+
+    def scan(self, columns=None, locations=None, categories=None, after=None, mmap_mode="r"):
+        """
+        Parcourt le jeu segment par segment (mémoire bornée par le plus gros
+        segment).
+
+        Yields:
+            tuple: (entrée du manifest du segment, pd.DataFrame des lignes retenues)
+        """
+        columns = self._check_columns(columns)
+        for segment, parts in self.select(locations, categories, after):
+            yield segment, self._frame([(segment, parts)], columns, mmap_mode)
+
+    @staticmethod
+    def _check_columns(columns):
+        columns = list(COLUMNS if columns is None else columns)
+        unknown = [column for column in columns if column not in COLUMNS]
+        if unknown:
+            raise ValueError(f"unknown columns: {unknown}")
+        return columns
+
+
+def import_csv(paths, root, chunksize=100_000):
+    """
+    Ajoute des CSV nettoyés (cleaned_data*.csv) au jeu, par paquets de lignes.
+
+    Returns:
+        tuple: (lignes ajoutées, lignes lues)
+    """
+    store = DatasetStore(root)
+    dtypes = {**NUMERIC_COLUMNS, **{column: str for column in CATEGORICAL_COLUMNS}}
+    added = read = 0
+    for path in paths:
+        for chunk in pd.read_csv(path, chunksize=chunksize, usecols=COLUMNS, dtype=dtypes):
+            segment = store.append(chunk)
+            added += segment["rows"] if segment else 0
+            read += len(chunk)
+    return added, read
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Jeu de données nettoyé en colonnes, partitionné")
+    commands = parser.add_subparsers(dest="command", required=True)
+    importer = commands.add_parser("import", help="Ajoute des CSV nettoyés au jeu")
+    importer.add_argument("inputs", nargs="+", help="CSV au schéma de data/clean/")
+    importer.add_argument("--chunksize", type=int, default=100_000, help="Lignes lues par paquet")
+    info = commands.add_parser("info", help="Résumé du jeu (lignes par partition)")
+    for command in (importer, info):
+        command.add_argument("--store", default=os.path.join("data", "store"), help="Dossier du jeu")
+    args = parser.parse_args()
+
+    if args.command == "import":
+        start = time.perf_counter()
+        added, read = import_csv(args.inputs, args.store, args.chunksize)
+        print(f"{added} lignes ajoutées à {args.store}, {read - added} déjà présentes ou "
+              f"incomplètes ({time.perf_counter() - start:.1f} s)")
+        return 0
+
+    store = DatasetStore(args.store)
+    print(f"{store.rows} lignes, {len(store.segments)} segments")
+    for (location, category), rows in sorted(store.partitions().items()):
+        print(f"  {location:<15} {category:<45} {rows:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
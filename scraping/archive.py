@@ -0,0 +1,143 @@
+import gzip
+import hashlib
+import os
+import sqlite3
+import time
+
+# Archive par défaut: data/raw/archive à la racine du projet
+DEFAULT_ARCHIVE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                   "..", "data", "raw", "archive")
+
+
+class RawArchive:
+    """
+    Archive des pages HTML brutes téléchargées.
+
+    Chaque contenu est compressé (gzip) et stocké une seule fois sous son
+    empreinte SHA-256 (objects/ab/abcdef....html.gz); un index SQLite
+    associe chaque téléchargement (URL, date) à son empreinte.
+    """
+
+    def __init__(self, root=DEFAULT_ARCHIVE_DIR, compresslevel=6, commit_every=100):
+        """
+        Args:
+            root (str): Dossier de l'archive (créé si absent)
+            compresslevel (int): Niveau de compression gzip (1 à 9)
+            commit_every (int): Nombre d'ajouts entre deux commits de l'index
+        """
+        self.root = root
+        self.compresslevel = compresslevel
+        self.commit_every = commit_every
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(root, "index.sqlite"))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS fetches (
+                url TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                sha256 TEXT NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """)
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS fetches_url ON fetches (url, fetched_at)")
+        self.conn.commit()
+        self._pending = 0
+        self.stored = 0
+        self.deduplicated = 0
+
+    def _object_path(self, digest):
+        return os.path.join(self.root, "objects", digest[:2], f"{digest}.html.gz")
+
+    def put(self, url, html, fetched_at=None):
+        """
+        Archive le HTML d'une URL (contenu déjà présent: seul l'index est mis à jour).
+
+        Returns:
+            str: Empreinte SHA-256 du contenu
+        """
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if os.path.exists(path):
+            self.deduplicated += 1
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Écriture atomique: pas d'objet tronqué en cas d'interruption
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(gzip.compress(data, self.compresslevel, mtime=0))
+            os.replace(tmp_path, path)
+            self.stored += 1
+
+        self.conn.execute("INSERT INTO fetches (url, fetched_at, sha256, size) VALUES (?, ?, ?, ?)",
+                          (url, fetched_at or time.time(), digest, len(data)))
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self.flush()
+        return digest
+
+    def get(self, url, as_of=None):
+        """
+        HTML archivé d'une URL: dernier téléchargement (ou dernier avant
+        as_of, timestamp), None si absent.
+        """
+        if as_of is None:
+            row = self.conn.execute(
+                "SELECT sha256 FROM fetches WHERE url = ? ORDER BY fetched_at DESC LIMIT 1",
+                (url,)).fetchone()
+        else:
+            row = self.conn.execute(
+                "SELECT sha256 FROM fetches WHERE url = ? AND fetched_at <= ? "
+                "ORDER BY fetched_at DESC LIMIT 1", (url, as_of)).fetchone()
+        if row is None:
+            return None
+        with open(self._object_path(row[0]), "rb") as f:
+            return gzip.decompress(f.read()).decode("utf-8")
+
+    def flush(self):
+        self.conn.commit()
+        self._pending = 0
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+class ArchiveFetcher:
+    """
+    Remplace AsyncFetcher pour re-parser une archive sans accès réseau:
+    même interface, pages lues dans l'archive.
+    """
+
+    def __init__(self, archive, as_of=None):
+        self.archive = archive
+        self.as_of = as_of
+        self.hits = 0
+        self.misses = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    def fetch_sync(self, url):
+        html = self.archive.get(url, self.as_of)
+        if html is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return html
+
+    async def fetch(self, url, priority=0):
+        return self.fetch_sync(url)
+
+    async def fetch_all(self, urls, priority=0):
+        return [self.fetch_sync(url) for url in urls]
+
+    def report(self):
+        print(f"\nArchive {self.archive.root}: {self.hits} pages relues, {self.misses} absentes")
+
+    def close(self):
+        self.archive.flush()
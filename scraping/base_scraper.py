@@ -1,18 +1,123 @@
-import requests
+import asyncio
+import os
+import signal
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from bs4 import BeautifulSoup
 from abc import ABC, abstractmethod
-from .utils import save_to_csv
+from .archive import DEFAULT_ARCHIVE_DIR, ArchiveFetcher, RawArchive
+from .fetcher import AsyncFetcher
+from .seen_index import SeenIndex, content_hash
+from .writer import Checkpoint, RecordWriter, jsonl_to_csv
+
+# Scrapers de chaque processus du pool de parsing, par (classe, options):
+# un même pool peut servir plusieurs sites
+_workers = {}
+
+
+def init_parse_worker():
+    """Initialise un processus de parsing (Ctrl-C géré par le processus principal)"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _worker(scraper_cls, options):
+    key = (scraper_cls, tuple(sorted(options.items())))
+    if key not in _workers:
+        _workers[key] = scraper_cls([], os.devnull, archive_path=None, **options)
+    return _workers[key]
+
+
+def _scan_listing_worker(scraper_cls, options, html):
+    """scan_listing dans un processus du pool: cartes renvoyées en HTML"""
+    return [(str(house), url, fingerprint)
+            for house, url, fingerprint in _worker(scraper_cls, options).scan_listing(html)]
+
+
+def _extract_records_worker(scraper_cls, options, cards_html, details, scraped_url):
+    """extract_records dans un processus du pool, à partir du HTML des cartes"""
+    scraper = _worker(scraper_cls, options)
+    soup = scraper.parse_html("".join(cards_html), scraper.LIST_STRAINER)
+    return scraper.extract_records(scraper.find_house_cards(soup), details, scraped_url)
+
+
+_WORKER_STEPS = {
+    "scan_listing": _scan_listing_worker,
+    "extract_records": _extract_records_worker,
+}
+
 
 class BaseScraper(ABC):
     """Classe de base pour tous les scrapers immobiliers"""
 
-    def __init__(self, urls, output_file):
+    # Sous-arbres utiles des pages liste / internes (SoupStrainer), seuls
+    # construits en parsing rapide; None = document entier
+    LIST_STRAINER = None
+    DETAIL_STRAINER = None
+    # Origine du site (liens relatifs des pages liste)
+    BASE_URL = None
+
+    def __init__(self, urls, output_file, concurrency=8, max_retries=3, min_interval=0.0,
+                 index_path=None, refresh_after_days=None, archive_path=DEFAULT_ARCHIVE_DIR,
+                 offline=False, archive_as_of=None, fast_parse=True, resume=False,
+                 parse_workers=None, queue_size=2, base_url=None):
+        """
+        Args:
+            urls (list): URLs des catégories à scraper
+            output_file (str): Fichier CSV de sortie
+            concurrency (int): Pages internes téléchargées en parallèle par domaine
+            max_retries (int): Nouveaux essais sur 429/5xx et erreurs réseau
+            min_interval (float): Intervalle minimal (s) entre deux requêtes vers un hôte
+            index_path (str): Index SQLite des annonces déjà vues (mode incrémental:
+                seules les annonces nouvelles ou modifiées sont scrapées)
+            refresh_after_days (float): Re-télécharger une annonce inchangée après
+                ce délai (None = jamais)
+            archive_path (str): Archive compressée des pages brutes (None = pas d'archive)
+            offline (bool): Re-parser l'archive sans accès réseau
+            archive_as_of (float): En mode offline, version des pages au plus tard
+                à ce timestamp (None = dernière)
+            fast_parse (bool): Parsing lxml limité aux sous-arbres utiles
+                (False = html.parser sur le document entier)
+            resume (bool): Reprendre un crawl interrompu depuis son checkpoint
+            parse_workers (int): Processus de parsing (None = nombre de cœurs,
+                0 = parsing dans le processus principal)
+            queue_size (int): Pages téléchargées en attente de parsing (mémoire bornée)
+            base_url (str): Origine du site à la place de BASE_URL (ex: site de test local)
+        """
         self.urls = urls
         self.output_file = output_file
+        self.base_url = base_url or self.BASE_URL
+        self.concurrency = concurrency
+        self.fast_parse = fast_parse
+        self.parse_workers = os.cpu_count() if parse_workers is None else parse_workers
+        self.queue_size = queue_size
+        self._pool = None
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
         }
-        self.all_houses = []
+        # Sortie en continu: <output>.jsonl + checkpoint, CSV exporté en fin de run
+        base = os.path.splitext(output_file)[0]
+        self.records_path = f"{base}.jsonl"
+        self.checkpoint = Checkpoint(f"{base}.checkpoint.json")
+        self.resume = resume
+        self.writer = None
+        # Transport partagé: pool de connexions, nouveaux essais, throttle, stats,
+        # archivage des pages brutes; en mode offline, lecture de l'archive seule
+        archive = RawArchive(archive_path) if archive_path else None
+        if offline:
+            if archive is None:
+                raise ValueError("offline mode requires an archive_path")
+            self.fetcher = ArchiveFetcher(archive, archive_as_of)
+        else:
+            self.fetcher = AsyncFetcher(self.headers, concurrency, max_retries=max_retries,
+                                        min_interval=min_interval, archive=archive)
+        # Pages internes déjà téléchargées pour la page liste en cours (url -> HTML)
+        self._prefetched = {}
+        # Mode incrémental (sans objet en re-parse de l'archive)
+        self.index_path = index_path if not offline else None
+        self.refresh_after_days = refresh_after_days
+        self.index = None
+        self.skipped = 0
 
     @abstractmethod
     def find_house_cards(self, soup):
@@ -20,52 +125,311 @@ class BaseScraper(ABC):
         pass
 
     @abstractmethod
-    def extract_house_data(self, house):
+    def extract_house_data(self, house, scraped_url=None):
         """Doit extraire les données d'un bien"""
         pass
 
+    def get_house_url(self, house):
+        """URL de la page interne d'un bien (None si pas de page interne à précharger)"""
+        return None
+
+    def card_fingerprint(self, house):
+        """
+        Contenu de la carte en page liste qui, s'il change, justifie de
+        re-scraper l'annonce (par défaut: tout son texte)
+        """
+        return house.get_text(" ", strip=True)
+
+    def filter_known(self, entries):
+        """
+        Mode incrémental: retire les annonces déjà vues et inchangées.
+
+        Args:
+            entries (list): Tuples (carte, url, empreinte de la carte) de scan_listing
+
+        Returns:
+            list: Entrées à scraper
+        """
+        known = self.index.lookup(url for _, url, _ in entries if url)
+        stale_before = (time.time() - self.refresh_after_days * 86400
+                        if self.refresh_after_days is not None else None)
+
+        to_scrape, unchanged = [], []
+        for entry in entries:
+            _, url, fingerprint = entry
+            previous = known.get(url)
+            if (previous is not None and previous[0] == fingerprint
+                    and (stale_before is None or previous[1] >= stale_before)):
+                unchanged.append(url)
+            else:
+                to_scrape.append(entry)
+
+        self.index.touch(unchanged)
+        self.skipped += len(unchanged)
+        return to_scrape
+
+    def scan_listing(self, html):
+        """
+        Cartes d'une page liste avec l'URL de leur page interne et leur empreinte.
+
+        Returns:
+            list: Tuples (carte, url, empreinte de la carte)
+        """
+        house_cards = self.find_house_cards(self.parse_html(html, self.LIST_STRAINER))
+        return [(house, self.get_house_url(house), content_hash(self.card_fingerprint(house)))
+                for house in house_cards]
+
+    def extract_records(self, house_cards, details, scraped_url):
+        """
+        Extrait les biens d'une page liste, pages internes déjà téléchargées.
+
+        Args:
+            house_cards (list): Cartes des biens
+            details (dict): url -> HTML des pages internes (None si en erreur)
+            scraped_url (str): URL de la catégorie
+        """
+        self._prefetched = details
+        try:
+            return [self.extract_house_data(house, scraped_url) for house in house_cards]
+        finally:
+            self._prefetched = {}
+
+    def parse_html(self, html, strainer=None):
+        """
+        Construit le BeautifulSoup d'une page.
+
+        Args:
+            html (str): HTML de la page
+            strainer (SoupStrainer): Sous-arbres à conserver en parsing rapide
+        """
+        if self.fast_parse:
+            return BeautifulSoup(html, "lxml", parse_only=strainer)
+        return BeautifulSoup(html, "html.parser")
+
+    def fetch_html(self, url):
+        """
+        HTML d'une page interne: préchargé en parallèle avec la page liste,
+        sinon téléchargé directement. None en cas d'erreur.
+        """
+        if url in self._prefetched:
+            return self._prefetched[url]
+        return self.fetcher.fetch_sync(url)
+
     def scrape_page(self, page_url):
-        """Scrape une page et retourne le BeautifulSoup"""
+        """Scrape une page liste et retourne le BeautifulSoup"""
+        html = self.fetcher.fetch_sync(page_url)
+        return self.parse_html(html, self.LIST_STRAINER) if html is not None else None
+
+    @staticmethod
+    def page_url(url, page_num):
+        return f"{url}?page={page_num}" if page_num > 1 else url
+
+    async def scrape_category_async(self, url, start_page=1):
+        """
+        Scrape toutes les pages d'une catégorie / ville.
+
+        Pipeline en trois étapes reliées par des files bornées (les
+        catégories d'un scraper sont crawlées en même temps):
+        - téléchargement (I/O): page liste, puis pages internes de ses biens
+          en parallèle (limite par domaine)
+        - parsing (CPU): cartes et pages internes parsées dans le pool de
+          processus, plusieurs pages liste à la fois
+        - écriture: biens de chaque page sur disque dans l'ordre des pages,
+          puis le checkpoint avance à la page suivante
+
+        Args:
+            url (str): URL de la catégorie
+            start_page (int): Première page (reprise d'un crawl interrompu)
+        """
+        print(f"=== Scraping category: {url} ===")
+        pages = asyncio.Queue(maxsize=self.queue_size)
+        fetching = asyncio.ensure_future(self._fetch_pages(url, start_page, pages))
+        parsing = deque()
+
+        try:
+            while True:
+                item = await pages.get()
+                if isinstance(item, Exception):
+                    raise item
+                if item is None:
+                    break
+                page_num, entries, details = item
+                parsing.append((page_num, entries, details, asyncio.ensure_future(
+                    self._in_pool("extract_records", [house for house, _, _ in entries],
+                                  details, url))))
+                # Une page en cours de parsing par processus, au-delà on écrit
+                if len(parsing) >= max(self.parse_workers, 1):
+                    await self._write_page(url, *parsing.popleft())
+
+            while parsing:
+                await self._write_page(url, *parsing.popleft())
+        finally:
+            fetching.cancel()
+            for *_, task in parsing:
+                task.cancel()
+
+    async def _fetch_pages(self, url, start_page, pages):
+        """Étape téléchargement: dépose (page, entrées, pages internes) dans la file"""
+        # Priorité = numéro de page: pages récentes de toutes les catégories d'abord
+        page_num = start_page
+        next_page = asyncio.ensure_future(
+            self.fetcher.fetch(self.page_url(url, page_num), priority=page_num))
+
         try:
-            response = requests.get(page_url, headers=self.headers, timeout=20)
-            response.raise_for_status()
-            return BeautifulSoup(response.text, "html.parser")
+            while True:
+                html = await next_page
+                if html is None:
+                    break
+
+                entries = await self._in_pool("scan_listing", html)
+                if not entries:
+                    print(f"⚠️ Aucun bien trouvé sur la page {page_num}, fin de scraping.\n")
+                    break
+
+                print(f"  → Page {page_num} : {len(entries)} biens trouvés")
+
+                if self.index is not None:
+                    found = len(entries)
+                    entries = self.filter_known(entries)
+                    if not entries:
+                        print(f"  ✓ Page {page_num} : uniquement des annonces connues, fin de scraping.\n")
+                        break
+                    print(f"    {len(entries)} nouvelles ou modifiées, "
+                          f"{found - len(entries)} inchangées")
+
+                next_page = asyncio.ensure_future(
+                    self.fetcher.fetch(self.page_url(url, page_num + 1), priority=page_num + 1))
+
+                # Pages internes en parallèle, dans l'ordre des biens
+                detail_urls = [u for _, u, _ in entries if u]
+                details = await self.fetcher.fetch_all(detail_urls, priority=page_num)
+                await pages.put((page_num, entries, dict(zip(detail_urls, details))))
+                page_num += 1
+            await pages.put(None)
         except Exception as e:
-            print(f"❌ Error loading {page_url}: {e}")
-            return None
+            await pages.put(e)
+        finally:
+            if not next_page.done():
+                next_page.cancel()
+
+    async def _write_page(self, url, page_num, entries, details, parsing):
+        """Étape écriture: biens d'une page, index incrémental, checkpoint"""
+        self.writer.write_many(await parsing)
+
+        # Annonces dont la page interne a été téléchargée: indexées
+        if self.index is not None:
+            self.index.mark_fetched([
+                (u, fingerprint, content_hash(details[u]))
+                for _, u, fingerprint in entries if u and details.get(u) is not None
+            ])
+
+        self.checkpoint.save(pages={**self.checkpoint.state["pages"], url: page_num + 1},
+                             offset=self.writer.offset, records=self.writer.count)
+
+    async def _in_pool(self, step, *args):
+        """
+        Exécute une étape de parsing (scan_listing / extract_records) dans le
+        pool de processus, ou directement sans pool. Les cartes circulent
+        sous forme de HTML entre processus.
+        """
+        if self._pool is None:
+            return getattr(self, step)(*args)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, _WORKER_STEPS[step],
+                                          type(self), self.parser_options(), *args)
+
+    def parser_options(self):
+        """Arguments du constructeur repris par les processus de parsing"""
+        return {"fast_parse": self.fast_parse, "base_url": self.base_url}
 
     def scrape_category(self, url):
         """Scrape toutes les pages d'une catégorie / ville"""
-        print(f"=== Scraping category: {url} ===")
-        page_num = 1
+        asyncio.run(self._crawl([url]))
 
-        while True:
-            page_url = f"{url}?page={page_num}" if page_num > 1 else url
-            soup = self.scrape_page(page_url)
-            if not soup:
-                break
+    def _open_output(self):
+        """Ouvre le JSONL de sortie: reprise au checkpoint ou nouveau crawl"""
+        if self.resume and self.checkpoint.load():
+            state = self.checkpoint.state
+            print(f"↻ Reprise: {state['records']} biens déjà écrits, "
+                  f"{len(state['done'])} catégories terminées")
+            self.writer = RecordWriter(self.records_path, state["offset"], state["records"])
+        else:
+            self.writer = RecordWriter(self.records_path)
+            self.checkpoint.save(done=[], pages={}, offset=0, records=0)
 
-            house_cards = self.find_house_cards(soup)
-            if not house_cards:
-                print(f"⚠️ Aucun bien trouvé sur la page {page_num}, fin de scraping.\n")
-                break
+    async def _crawl(self, urls, pool=None):
+        """
+        Crawl des catégories, en même temps.
 
-            print(f"  → Page {page_num} : {len(house_cards)} biens trouvés")
+        Args:
+            urls (list): URLs des catégories
+            pool (ProcessPoolExecutor): Pool de parsing partagé (None = pool
+                propre au scraper, selon parse_workers)
+        """
+        if self.index_path and self.index is None:
+            self.index = SeenIndex(self.index_path)
+        own_pool = pool is None and self.parse_workers > 0
+        self._pool = (ProcessPoolExecutor(self.parse_workers, initializer=init_parse_worker)
+                      if own_pool else pool)
+        self._open_output()
+        try:
+            async with self.fetcher:
+                await asyncio.gather(*(self._crawl_category(url) for url in urls
+                                       if url not in self.checkpoint.state["done"]))
+        finally:
+            if own_pool:
+                self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+            if self.index is not None:
+                self.index.close()
+                self.index = None
+
+    async def _crawl_category(self, url):
+        await self.scrape_category_async(url, self.checkpoint.state["pages"].get(url, 1))
+        state = self.checkpoint.state
+        pages = {u: p for u, p in state["pages"].items() if u != url}
+        self.checkpoint.save(done=state["done"] + [url], pages=pages)
+
+    def close(self):
+        """Ferme la sortie et le transport (aussi après une interruption)"""
+        if self.writer is not None:
+            self.writer.close()
+        self.fetcher.close()
+
+    def interrupted(self):
+        print(f"\n⏸️ Interrompu après {self.writer.count if self.writer else 0} biens: "
+              f"relancer avec resume=True (--resume) pour reprendre")
 
-            for house in house_cards:
-                data = self.extract_house_data(house, url)
-                print(data)
-                self.all_houses.append(data)
+    def finish(self):
+        """
+        Fin d'un crawl terminé: bilan, export CSV, suppression du checkpoint.
 
-            page_num += 1
+        Returns:
+            int: Nombre de biens écrits
+        """
+        print(f"\n=== SCRAPING END: {type(self).__name__} ===")
+        print(f"Total biens scrapés: {self.writer.count} ({self.records_path})")
+        if self.index_path:
+            print(f"Annonces inchangées ignorées (index {self.index_path}): {self.skipped}")
+        self.fetcher.report()
+        jsonl_to_csv(self.records_path, self.output_file)
+        self.checkpoint.remove()
+        return self.writer.count
 
     def run(self):
-        """Lance le scraping complet"""
-        print("=== SCRAPING START ===\n")
-        for url in self.urls:
-            self.scrape_category(url)
+        """
+        Lance le scraping complet.
 
-        print("\n=== SCRAPING END ===")
-        print(f"Total biens scrapés: {len(self.all_houses)}")
-        save_to_csv(self.all_houses, self.output_file)
-        return self.all_houses
+        Returns:
+            int: Nombre de biens écrits
+        """
+        print("=== SCRAPING START ===\n")
+        try:
+            asyncio.run(self._crawl(self.urls))
+        except KeyboardInterrupt:
+            self.interrupted()
+            raise
+        finally:
+            self.close()
+        return self.finish()
@@ -0,0 +1,131 @@
+# =============================================================================
+# crawl.py - Débit de bout en bout d'un scraper contre le site local
+#
+# Lance mock_site dans un processus séparé, puis un crawl complet
+# (téléchargement, parsing, écriture) pour chaque réglage demandé, et
+# rapporte débit, nouveaux essais, échecs et mémoire maximale.
+#
+# Usage (depuis la racine du projet):
+#     python -m scraping.benchmarks.crawl --site tayara --pages 10 --concurrency 1 4 8 16
+#     python -m scraping.benchmarks.crawl --site mubawab --error-rate 0.05 --throttle-rate 0.1 --seed 1
+#     python -m scraping.benchmarks.crawl --parse-workers 0 1 2 --output crawl.json
+# =============================================================================
+
+import argparse
+import contextlib
+import itertools
+import json
+import multiprocessing
+import os
+import resource
+import socket
+import sys
+import tempfile
+import time
+
+from scraping.benchmarks.mock_site import MockSite, create_server
+from scraping.scraper_mubawab import MubawabScraper
+from scraping.scraper_tayaratn import TayaraScraper
+
+SITES = {
+    "tayara": (TayaraScraper, "/listing/c/immobilier"),
+    "mubawab": (MubawabScraper, "/fr/sc/appartements-a-vendre"),
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve(site_options, port, ready):
+    """Processus du site local"""
+    server = create_server(MockSite(**site_options), port=port)
+    ready.set()
+    server.serve_forever()
+
+
+def run_crawl(site, origin, concurrency, parse_workers, max_retries, verbose=False):
+    """Un crawl complet; retourne ses mesures"""
+    scraper_cls, path = SITES[site]
+    with tempfile.TemporaryDirectory() as tmp:
+        scraper = scraper_cls([origin + path], os.path.join(tmp, f"{site}.csv"),
+                              concurrency=concurrency, parse_workers=parse_workers,
+                              max_retries=max_retries, archive_path=None, base_url=origin)
+        start = time.perf_counter()
+        with open(os.devnull, "w") as devnull, \
+                contextlib.redirect_stdout(sys.stdout if verbose else devnull):
+            records = scraper.run()
+        wall = time.perf_counter() - start
+
+    stats = list(scraper.fetcher.stats.values())
+    return {
+        "records": records,
+        "wall_s": wall,
+        "records_per_sec": records / wall if wall else 0.0,
+        "requests": sum(s.requests for s in stats),
+        "retries": sum(s.retries for s in stats),
+        "throttled": sum(s.throttled for s in stats),
+        "failed": sum(s.errors for s in stats),
+        # Pic mémoire du processus principal (ru_maxrss en Ko sous Linux)
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Débit de bout en bout contre le site local")
+    parser.add_argument("--site", choices=sorted(SITES), default="tayara")
+    parser.add_argument("--pages", type=int, default=5, help="Pages liste avec des biens")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8],
+                        help="Requêtes simultanées par domaine (plusieurs valeurs = balayage)")
+    parser.add_argument("--parse-workers", type=int, nargs="+", default=[None],
+                        help="Processus de parsing (plusieurs valeurs = balayage)")
+    parser.add_argument("--max-retries", type=int, default=3)
+    parser.add_argument("--verbose", action="store_true", help="Afficher la sortie des scrapers")
+    parser.add_argument("--output", help="Écrire les résultats (JSON)")
+    args = parser.parse_args()
+
+    site_options = {"pages": args.pages, "latency": args.latency_ms / 1000, "jitter": args.jitter,
+                    "error_rate": args.error_rate, "throttle_rate": args.throttle_rate,
+                    "retry_after": args.retry_after, "seed": args.seed}
+    port = free_port()
+    ready = multiprocessing.Event()
+    server = multiprocessing.Process(target=serve, args=(site_options, port, ready), daemon=True)
+    server.start()
+    ready.wait(10)
+    origin = f"http://127.0.0.1:{port}"
+
+    print(f"Site local {origin}: {args.site}, {args.pages} pages, latence {args.latency_ms:g} ms, "
+          f"500: {args.error_rate:.0%}, 429: {args.throttle_rate:.0%}")
+    print(f"\n{'concur.':>7s} {'parse':>5s} {'biens':>6s} {'durée s':>8s} {'biens/s':>8s} "
+          f"{'requêtes':>9s} {'essais+':>8s} {'429':>5s} {'échecs':>7s} {'RSS Mo':>7s}")
+
+    results = []
+    try:
+        for concurrency, parse_workers in itertools.product(args.concurrency, args.parse_workers):
+            r = run_crawl(args.site, origin, concurrency, parse_workers, args.max_retries, args.verbose)
+            r.update(concurrency=concurrency, parse_workers=parse_workers)
+            results.append(r)
+            workers = "auto" if parse_workers is None else str(parse_workers)
+            print(f"{concurrency:7d} {workers:>5s} {r['records']:6d} {r['wall_s']:8.2f} "
+                  f"{r['records_per_sec']:8.1f} {r['requests']:9d} {r['retries']:8d} "
+                  f"{r['throttled']:5d} {r['failed']:7d} {r['max_rss_mb']:7.0f}")
+    finally:
+        server.terminate()
+        server.join()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"site": site_options, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+# =============================================================================
+# mock_site.py - Site local imitant tayara.tn et mubawab.tn
+#
+# Sert les pages enregistrées (data/raw/tayara_page_1.html et
+# scraping/benchmarks/fixtures/) sous les mêmes formes d'URL que les vrais
+# sites, avec latence, erreurs 500 et 429 injectées:
+#     /listing/c/<catégorie>[?page=N]   page liste Tayara (liens /item/...)
+#     /item/...                         page interne Tayara
+#     /fr/sc/<catégorie>[?page=N]       page liste Mubawab (attribut linkref)
+#     /fr/a/...                         page interne Mubawab
+#     /_stats                           compteurs du serveur (JSON)
+#
+# Les pages 1 à --pages d'une catégorie contiennent des biens (URLs
+# distinctes d'une page à l'autre), les suivantes aucun: fin de pagination.
+#
+# Usage (depuis la racine du projet):
+#     python -m scraping.benchmarks.mock_site --port 8800 --latency-ms 80 --error-rate 0.02 --throttle-rate 0.05
+#     puis: TayaraScraper(["http://127.0.0.1:8800/listing/c/immobilier"], ..., base_url="http://127.0.0.1:8800")
+# =============================================================================
+
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+TAYARA_LIST = os.path.join(BENCH_DIR, "..", "..", "data", "raw", "tayara_page_1.html")
+
+# Origines réécrites vers le site local dans les pages servies
+SITE_ORIGINS = re.compile(r"https://www\.(?:tayara\.tn|mubawab\.tn)")
+# Liens vers les pages internes, rendus distincts par page liste
+ITEM_LINKS = re.compile(r'((?:href="/item/|linkref="[^"]*/fr/a/)[^"?]*)"')
+
+EMPTY_LIST = "<html><body><p>Aucune annonce</p></body></html>"
+
+
+def load_pages(prefix):
+    names = sorted(f for f in os.listdir(FIXTURES_DIR) if f.startswith(prefix))
+    pages = []
+    for name in names:
+        with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+            pages.append(f.read())
+    return pages
+
+
+class MockSite:
+    """Pages servies, pannes injectées et compteurs du site local"""
+
+    def __init__(self, pages=5, latency=0.05, jitter=0.5, error_rate=0.0, throttle_rate=0.0,
+                 retry_after=None, seed=None):
+        """
+        Args:
+            pages (int): Pages liste avec des biens par catégorie
+            latency (float): Latence moyenne d'une réponse (s)
+            jitter (float): Variation relative de la latence (0.5 = ±50%)
+            error_rate (float): Part des requêtes en erreur 500
+            throttle_rate (float): Part des requêtes refusées en 429
+            retry_after (float): En-tête Retry-After des 429 (None = absent)
+            seed (int): Graine des tirages (runs reproductibles)
+        """
+        self.pages = pages
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "bytes": 0, "statuses": {}}
+        self.origin = None
+
+        with open(TAYARA_LIST, encoding="utf-8") as f:
+            self.tayara_list = f.read()
+        self.mubawab_list = load_pages("mubawab_list_")[0]
+        self.tayara_details = load_pages("tayara_detail_")
+        self.mubawab_details = load_pages("mubawab_detail_")
+        self._cache = {}
+
+    def list_page(self, template, page_num):
+        """Page liste numéro page_num (vide au-delà de self.pages)"""
+        if page_num > self.pages:
+            return EMPTY_LIST
+        key = (id(template), page_num)
+        if key not in self._cache:
+            html = SITE_ORIGINS.sub(self.origin, template)
+            self._cache[key] = ITEM_LINKS.sub(rf'\1?p={page_num}"', html)
+        return self._cache[key]
+
+    def detail_page(self, pages, path):
+        """Page interne: une des pages enregistrées, toujours la même pour un chemin"""
+        return pages[zlib.crc32(path.encode()) % len(pages)]
+
+    def route(self, path, query):
+        """Retourne (statut, corps) pour une URL"""
+        page_num = int(query.get("page", ["1"])[0])
+        if path == "/_stats":
+            with self.lock:
+                return 200, json.dumps(self.stats)
+        if path.startswith("/listing/"):
+            return 200, self.list_page(self.tayara_list, page_num)
+        if path.startswith("/fr/sc/"):
+            return 200, self.list_page(self.mubawab_list, page_num)
+        if path.startswith("/item/"):
+            return 200, self.detail_page(self.tayara_details, path)
+        if path.startswith("/fr/a/"):
+            return 200, self.detail_page(self.mubawab_details, path)
+        return 404, "<html><body>Not found</body></html>"
+
+    def draw(self):
+        """Tire la latence et la panne éventuelle d'une requête"""
+        with self.lock:
+            delay = self.latency * (1 + self.random.uniform(-self.jitter, self.jitter))
+            roll = self.random.random()
+        if roll < self.throttle_rate:
+            return delay, 429
+        if roll < self.throttle_rate + self.error_rate:
+            return delay, 500
+        return delay, None
+
+    def record(self, status, size):
+        with self.lock:
+            self.stats["requests"] += 1
+            self.stats["bytes"] += size
+            self.stats["statuses"][str(status)] = self.stats["statuses"].get(str(status), 0) + 1
+
+
+def make_handler(site):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            delay, failure = site.draw() if url.path != "/_stats" else (0.0, None)
+            time.sleep(max(delay, 0.0))
+
+            headers = {"Content-Type": "text/html; charset=utf-8"}
+            if failure == 429:
+                status, body = 429, "<html><body>Too Many Requests</body></html>"
+                if site.retry_after is not None:
+                    headers["Retry-After"] = f"{site.retry_after:g}"
+            elif failure == 500:
+                status, body = 500, "<html><body>Internal Server Error</body></html>"
+            else:
+                status, body = site.route(url.path, parse_qs(url.query))
+
+            data = body.encode("utf-8")
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            if url.path != "/_stats":
+                site.record(status, len(data))
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def create_server(site, host="127.0.0.1", port=0):
+    """Serveur HTTP du site local (port 0 = port libre); site.origin est renseignée"""
+    server = ThreadingHTTPServer((host, port), make_handler(site))
+    server.daemon_threads = True
+    site.origin = f"http://{host}:{server.server_address[1]}"
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Site local imitant tayara.tn / mubawab.tn")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--pages", type=int, default=5, help="Pages liste avec des biens par catégorie")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Latence moyenne (ms)")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Variation relative de la latence")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Part de réponses 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Part de réponses 429")
+    parser.add_argument("--retry-after", type=float, help="Retry-After des réponses 429 (s)")
+    parser.add_argument("--seed", type=int, help="Graine des tirages")
+    args = parser.parse_args()
+
+    site = MockSite(args.pages, args.latency_ms / 1000, args.jitter, args.error_rate,
+                    args.throttle_rate, args.retry_after, args.seed)
+    server = create_server(site, args.host, args.port)
+    print(f"Site local sur {site.origin} ({args.pages} pages par catégorie)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\n{json.dumps(site.stats)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+# =============================================================================
+# parsers.py - Débit et non-régression des extracteurs, hors ligne
+#
+# Rejoue les extracteurs Tayara / Mubawab sur des pages enregistrées
+# (data/raw/tayara_page_1.html et scraping/benchmarks/fixtures/), mesure
+# pages/s et biens/s, et vérifie que les biens extraits sont identiques aux
+# sorties de référence (golden_records.json).
+#
+# Usage (depuis la racine du projet):
+#     python -m scraping.benchmarks.parsers
+#     python -m scraping.benchmarks.parsers --full-parse         # html.parser, document entier
+#     python -m scraping.benchmarks.parsers --save-baseline base.json
+#     python -m scraping.benchmarks.parsers --baseline base.json  # exit 1 si régression
+#     python -m scraping.benchmarks.parsers --update-golden       # après un changement voulu
+# =============================================================================
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from itertools import cycle
+
+from scraping.scraper_mubawab import MubawabScraper
+from scraping.scraper_tayaratn import TayaraScraper
+from scraping.utils import extract_number, normalize_price, parse_relative_date
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+GOLDEN_PATH = os.path.join(BENCH_DIR, "golden_records.json")
+TAYARA_LIST = os.path.join(BENCH_DIR, "..", "..", "data", "raw", "tayara_page_1.html")
+
+TAYARA_CATEGORY = "https://www.tayara.tn/listing/c/immobilier"
+MUBAWAB_CATEGORY = "https://www.mubawab.tn/fr/sc/appartements-a-vendre"
+
+# Entrées des helpers de utils (formats rencontrés sur les deux sites)
+PRICES = ["67000", "1 250 000 TND", "450.000,50 DT", "1.200.000,00", "3500,5", "Prix sur demande", "", None]
+NUMBERS = ["120 m²", "1 250 m²", "3 Chambres", "S+2", "2,500", "aucun", "", None]
+RELATIVE_DATES = ["5 minutes ago", "3 hours ago", "2 days ago", "1 month ago",
+                  "il y a 10 minutes", "il y a 4 heures", "il y a 6 jours", "il y a 2 mois", "hier"]
+
+
+def read_fixture(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def days_ago(date_str):
+    """Date YYYY-MM-DD -> nombre de jours avant aujourd'hui (stable d'un jour à l'autre)"""
+    if date_str is None:
+        return None
+    return (datetime.today() - datetime.strptime(date_str, "%Y-%m-%d")).days
+
+
+def stable_record(record):
+    """Bien sans les champs qui dépendent du jour d'exécution"""
+    record = dict(record)
+    record.pop("scrape_date", None)
+    if "date_posted" in record:
+        record["date_posted_days_ago"] = days_ago(record.pop("date_posted"))
+    return record
+
+
+class SiteFixtures:
+    """Page liste, pages internes et scraper (sans réseau) d'un site"""
+
+    def __init__(self, scraper_cls, category, list_file, detail_prefix, fast_parse=True):
+        self.scraper = scraper_cls([], os.devnull, archive_path=None, parse_workers=0,
+                                   fast_parse=fast_parse)
+        self.category = category
+        self.list_html = read_fixture(list_file)
+        detail_files = sorted(f for f in os.listdir(FIXTURES_DIR) if f.startswith(detail_prefix))
+        self.details = {name: read_fixture(os.path.join(FIXTURES_DIR, name)) for name in detail_files}
+
+        self.cards = self.find_cards()
+        urls = [self.scraper.get_house_url(house) for house in self.cards]
+        # Pages internes attribuées aux biens à tour de rôle
+        self.prefetched = dict(zip(urls, cycle(self.details.values())))
+        self.no_details = dict.fromkeys(urls)
+
+    def find_cards(self):
+        return self.scraper.find_house_cards(
+            self.scraper.parse_html(self.list_html, self.scraper.LIST_STRAINER))
+
+    def extract_list(self):
+        """extract_house_data sur la page liste seule (pages internes absentes)"""
+        return self.scraper.extract_records(self.cards, self.no_details, self.category)
+
+    def extract_full(self):
+        """Page liste + pages internes, comme pendant un crawl"""
+        return self.scraper.extract_records(self.find_cards(), self.prefetched, self.category)
+
+    def parse_detail(self, html, parse_fn):
+        return parse_fn(self.scraper.parse_html(html, self.scraper.DETAIL_STRAINER))
+
+
+def golden_outputs(tayara, mubawab):
+    """Sorties comparées à golden_records.json"""
+    return {
+        "tayara": {
+            "records": [stable_record(r) for r in tayara.extract_full()],
+            "parse_criteria": {name: tayara.parse_detail(html, tayara.scraper.parse_criteria)
+                               for name, html in tayara.details.items()},
+        },
+        "mubawab": {
+            "records": [stable_record(r) for r in mubawab.extract_full()],
+            "parse_internal_page": {name: mubawab.parse_detail(html, mubawab.scraper.parse_internal_page)
+                                    for name, html in mubawab.details.items()},
+        },
+        "utils": {
+            "normalize_price": [[p, normalize_price(p)] for p in PRICES],
+            "extract_number": [[n, extract_number(n)] for n in NUMBERS],
+            "parse_relative_date": [[d, days_ago(parse_relative_date(d))] for d in RELATIVE_DATES],
+        },
+    }
+
+
+def check_golden(outputs, golden):
+    """Retourne la liste des écarts avec les sorties de référence"""
+    mismatches = []
+    for site, sections in golden.items():
+        for section, expected in sections.items():
+            actual = outputs.get(site, {}).get(section)
+            if actual == expected:
+                continue
+            if isinstance(expected, list) and isinstance(actual, list) and len(actual) == len(expected):
+                for i, (a, e) in enumerate(zip(actual, expected)):
+                    if a != e:
+                        fields = sorted(k for k in set(a) | set(e) if a.get(k) != e.get(k)) \
+                            if isinstance(a, dict) else [str(e[0])]
+                        mismatches.append(f"{site}.{section}[{i}]: {', '.join(fields)}")
+            elif isinstance(expected, dict) and isinstance(actual, dict):
+                for key in sorted(set(actual) | set(expected)):
+                    if actual.get(key) != expected.get(key):
+                        mismatches.append(f"{site}.{section}[{key}]")
+            else:
+                mismatches.append(f"{site}.{section}: {len(actual or [])} vs {len(expected)} attendus")
+    return mismatches
+
+
+def measure(fn, pages, records, repeat, min_time=0.2):
+    """
+    Meilleur débit sur `repeat` séries (temps CPU).
+
+    Args:
+        fn (callable): Traite `pages` pages et produit `records` biens
+        min_time (float): Durée minimale d'une série (s), fn répété au besoin
+    """
+    calls = 1
+    start = time.process_time()
+    fn()
+    elapsed = time.process_time() - start
+    if elapsed < min_time:
+        calls = max(int(min_time / max(elapsed, 1e-6)), 1)
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.process_time()
+        for _ in range(calls):
+            fn()
+        best = min(best, (time.process_time() - start) / calls)
+    return {
+        "ms_per_call": best * 1000,
+        "pages_per_sec": pages / best if pages else None,
+        "records_per_sec": records / best if records else None,
+    }
+
+
+def run_benchmarks(tayara, mubawab, repeat):
+    results = {}
+    for name, site in (("tayara", tayara), ("mubawab", mubawab)):
+        n_cards = len(site.cards)
+        n_details = len(site.details)
+        parse_fn = (site.scraper.parse_criteria if name == "tayara"
+                    else site.scraper.parse_internal_page)
+        detail_pages = list(site.details.values())
+
+        results[f"{name}.find_house_cards"] = measure(site.find_cards, 1, n_cards, repeat)
+        results[f"{name}.extract_house_data (liste)"] = measure(site.extract_list, 1, n_cards, repeat)
+        results[f"{name}.{parse_fn.__name__} (page interne)"] = measure(
+            lambda: [site.parse_detail(html, parse_fn) for html in detail_pages], n_details, 0, repeat)
+        results[f"{name}.page liste + internes"] = measure(
+            site.extract_full, 1 + n_cards, n_cards, repeat)
+
+    results["utils.normalize_price"] = measure(
+        lambda: [normalize_price(p) for p in PRICES], 0, len(PRICES), repeat)
+    results["utils.extract_number"] = measure(
+        lambda: [extract_number(n) for n in NUMBERS], 0, len(NUMBERS), repeat)
+    results["utils.parse_relative_date"] = measure(
+        lambda: [parse_relative_date(d) for d in RELATIVE_DATES], 0, len(RELATIVE_DATES), repeat)
+    return results
+
+
+def print_results(results):
+    print(f"\n{'Benchmark':42s} {'ms/appel':>10s} {'pages/s':>10s} {'biens/s':>12s}")
+    for name, r in results.items():
+        pages = f"{r['pages_per_sec']:10.1f}" if r["pages_per_sec"] else f"{'-':>10s}"
+        records = f"{r['records_per_sec']:12.0f}" if r["records_per_sec"] else f"{'-':>12s}"
+        print(f"{name:42s} {r['ms_per_call']:10.3f} {pages} {records}")
+
+
+def compare_to_baseline(results, baseline, tolerance=0.2):
+    """Benchmarks dont le temps par appel s'est dégradé de plus de `tolerance`"""
+    regressions = []
+    for name, reference in baseline.items():
+        current = results.get(name)
+        if current is None:
+            continue
+        change = current["ms_per_call"] / reference["ms_per_call"] - 1
+        if change > tolerance:
+            regressions.append(f"{name}: {reference['ms_per_call']:.3f} -> {current['ms_per_call']:.3f} ms "
+                               f"({change * 100:+.0f}%, tolerance {tolerance * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks des extracteurs sur pages enregistrées")
+    parser.add_argument("--full-parse", action="store_true",
+                        help="html.parser sur le document entier (au lieu de lxml + SoupStrainer)")
+    parser.add_argument("--repeat", type=int, default=5, help="Séries de mesure (meilleure retenue)")
+    parser.add_argument("--update-golden", action="store_true",
+                        help="Réécrire les sorties de référence avec les sorties actuelles")
+    parser.add_argument("--output", help="Écrire les résultats (JSON)")
+    parser.add_argument("--save-baseline", help="Enregistrer les résultats comme baseline")
+    parser.add_argument("--baseline", help="Baseline à comparer (exit 1 si régression)")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Dégradation relative tolérée vs baseline")
+    args = parser.parse_args()
+
+    fast_parse = not args.full_parse
+    tayara = SiteFixtures(TayaraScraper, TAYARA_CATEGORY, TAYARA_LIST, "tayara_detail_", fast_parse)
+    mubawab = SiteFixtures(MubawabScraper, MUBAWAB_CATEGORY,
+                           os.path.join(FIXTURES_DIR, "mubawab_list_1.html"), "mubawab_detail_", fast_parse)
+    print(f"Parsing: {'lxml + SoupStrainer' if fast_parse else 'html.parser (document entier)'}")
+    print(f"Fixtures: Tayara {len(tayara.cards)} biens + {len(tayara.details)} pages internes, "
+          f"Mubawab {len(mubawab.cards)} biens + {len(mubawab.details)} pages internes")
+
+    failed = False
+    outputs = golden_outputs(tayara, mubawab)
+    if args.update_golden:
+        with open(GOLDEN_PATH, "w", encoding="utf-8") as f:
+            json.dump(outputs, f, ensure_ascii=False, indent=1, sort_keys=True)
+        print(f"Sorties de référence réécrites: {GOLDEN_PATH}")
+    else:
+        with open(GOLDEN_PATH, encoding="utf-8") as f:
+            golden = json.load(f)
+        mismatches = check_golden(outputs, golden)
+        if mismatches:
+            failed = True
+            print(f"\n❌ {len(mismatches)} écarts avec {os.path.basename(GOLDEN_PATH)}:")
+            for mismatch in mismatches:
+                print(f"  - {mismatch}")
+        else:
+            print("✓ Biens extraits identiques aux sorties de référence")
+
+    results = run_benchmarks(tayara, mubawab, args.repeat)
+    print_results(results)
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        if regressions:
+            failed = True
+            print("\n❌ Régressions vs baseline:")
+            for regression in regressions:
+                print(f"  - {regression}")
+        else:
+            print("\n✓ Aucune régression vs baseline")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
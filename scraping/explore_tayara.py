@@ -1,7 +1,21 @@
+# ============================================================
+# Exploration des pages d'annonces de tayara.tn
+# ============================================================
+# Parcourt toutes les pages de la catégorie immobilier et archive le HTML
+# brut (scraping/archive.py). Depuis la racine du projet:
+#
+#   python -m scraping.explore_tayara
+#
+# (python scraping/explore_tayara.py fonctionne aussi.)
+
 import requests
 from bs4 import BeautifulSoup
 import time
-import os
+
+try:
+    from scraping.archive import DEFAULT_ARCHIVE_DIR, RawArchive
+except ModuleNotFoundError:  # Lancé directement: scraping/ est dans sys.path
+    from archive import DEFAULT_ARCHIVE_DIR, RawArchive
 
 def explore_tayara():
     """Script d'exploration pour parcourir toutes les pages de tayara.tn"""
@@ -14,8 +28,8 @@ def explore_tayara():
     page_num = 1
     total_annonces = 0
 
-    # Créer le dossier pour sauvegarder les HTML si non existant
-    os.makedirs('../../data/raw', exist_ok=True)
+    # Pages brutes archivées (compressées, dédupliquées), re-parsables hors ligne
+    archive = RawArchive(DEFAULT_ARCHIVE_DIR)
 
     while True:
         url = base_url + str(page_num)
@@ -27,11 +41,9 @@ def explore_tayara():
 
             soup = BeautifulSoup(response.content, 'lxml')
 
-            # Sauvegarder le HTML pour inspection
-            html_file = f'../../data/raw/tayara_page_{page_num}.html'
-            with open(html_file, 'w', encoding='utf-8') as f:
-                f.write(soup.prettify())
-            print(f" HTML sauvegardé dans {html_file}")
+            # Archiver la réponse brute pour inspection / re-parse
+            digest = archive.put(url, response.text)
+            print(f" HTML archivé dans {archive.root} ({digest[:12]})")
 
             # Trouver les annonces
             articles = soup.find_all('article')
@@ -56,6 +68,7 @@ def explore_tayara():
             print(f" Erreur: {e}")
             break
 
+    archive.close()
     print(f"\nScraping terminé. Total d'annonces trouvées: {total_annonces}")
 
 if __name__ == "__main__":
@@ -0,0 +1,319 @@
+import asyncio
+import contextlib
+import heapq
+import itertools
+import random
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+
+# Statuts qui justifient un nouvel essai (le site demande de ralentir ou est en erreur)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Statuts qui font ralentir le rythme des requêtes vers l'hôte
+THROTTLE_STATUSES = {429, 503}
+
+
+def retry_after_seconds(value):
+    """Délai demandé par l'en-tête Retry-After (secondes ou date HTTP), None si absent"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class HostStats:
+    """Compteurs d'un hôte: requêtes, statuts, nouveaux essais, erreurs, latences"""
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.throttled = 0
+        self.bytes = 0
+        self.statuses = {}
+        self.latencies = []
+
+    def record(self, status, latency, size=0):
+        self.requests += 1
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        self.latencies.append(latency)
+        self.bytes += size
+
+    def percentile(self, q):
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class HostThrottle:
+    """
+    Espacement adaptatif des requêtes vers un hôte: l'intervalle double
+    quand le site répond 429/503 et décroît progressivement après chaque
+    succès, sans descendre sous min_interval.
+    """
+
+    def __init__(self, min_interval=0.0, max_interval=30.0):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self._next_slot = 0.0
+
+    def reserve(self):
+        """Réserve le prochain créneau d'envoi; retourne l'attente en secondes"""
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        return slot - now
+
+    def slow_down(self, retry_after=None):
+        self.interval = min(max(self.interval * 2, 0.1), self.max_interval)
+        pause = retry_after if retry_after is not None else self.interval
+        self._next_slot = max(self._next_slot, time.monotonic() + pause)
+
+    def speed_up(self):
+        self.interval = max(self.min_interval, self.interval * 0.9)
+
+
+class PriorityLimiter:
+    """
+    Limite de requêtes simultanées dont la file d'attente est ordonnée par
+    priorité (plus petite d'abord, puis ordre d'arrivée): les premières
+    pages des catégories passent avant les pages profondes.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.active = 0
+        self._waiters = []
+        self._order = itertools.count()
+
+    async def acquire(self, priority=0):
+        if self.active < self.capacity and not self._waiters:
+            self.active += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # Place déjà attribuée au moment de l'annulation: la rendre
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        """Libère une place: transmise au premier en attente, sinon rendue"""
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    @contextlib.asynccontextmanager
+    async def slot(self, priority=0):
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+class AsyncFetcher:
+    """
+    Couche de transport partagée des scrapers.
+
+    - connexions keep-alive réutilisées (pool par hôte, client async et
+      session requests pour les appels synchrones)
+    - limite de requêtes simultanées par domaine, et limite globale optionnelle
+      partagée entre scrapers, servies par priorité (numéro de page)
+    - nouveaux essais avec backoff exponentiel sur 429/5xx et erreurs réseau
+    - ralentissement adaptatif par hôte quand le site proteste
+    - compteurs par hôte (report())
+    - archivage optionnel des pages téléchargées (RawArchive)
+    """
+
+    def __init__(self, headers=None, per_domain_limit=8, timeout=20, max_retries=3,
+                 backoff=0.5, min_interval=0.0, max_interval=30.0, archive=None, limiter=None):
+        """
+        Args:
+            headers (dict): En-têtes envoyés avec chaque requête
+            per_domain_limit (int): Requêtes simultanées maximales par domaine
+            timeout (float): Timeout d'une requête en secondes
+            max_retries (int): Nouveaux essais après un échec temporaire
+            backoff (float): Attente de base (s) avant un nouvel essai, doublée à chaque essai
+            min_interval (float): Intervalle minimal (s) entre deux requêtes vers un hôte
+            max_interval (float): Intervalle maximal atteint en ralentissant
+            archive (RawArchive): Archive des pages téléchargées (None = pas d'archive)
+            limiter (PriorityLimiter): Limite globale de requêtes simultanées
+                partagée entre scrapers (None = pas de limite globale)
+        """
+        self.headers = headers or {}
+        self.per_domain_limit = per_domain_limit
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.archive = archive
+        self.limiter = limiter
+        self.stats = {}
+        self._throttles = {}
+        self._host_limiters = {}
+        self._client = None
+        self._session = None
+
+    async def __aenter__(self):
+        limits = httpx.Limits(max_connections=None,
+                              max_keepalive_connections=self.per_domain_limit * 4)
+        self._client = httpx.AsyncClient(headers=self.headers, timeout=self.timeout,
+                                         follow_redirects=True, limits=limits)
+        self._host_limiters = {}  # Liés à la boucle asyncio en cours
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._client.aclose()
+        self._client = None
+
+    @property
+    def session(self):
+        """Session requests (keep-alive) pour les appels synchrones"""
+        if self._session is None:
+            self._session = requests.Session()
+            self._session.headers.update(self.headers)
+        return self._session
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+        if self.archive is not None:
+            self.archive.flush()
+
+    def _archive(self, url, html):
+        if self.archive is not None:
+            self.archive.put(url, html)
+        return html
+
+    def _host(self, url):
+        host = urlsplit(url).netloc
+        if host not in self.stats:
+            self.stats[host] = HostStats()
+            self._throttles[host] = HostThrottle(self.min_interval, self.max_interval)
+        return host
+
+    def _host_limiter(self, host):
+        if host not in self._host_limiters:
+            self._host_limiters[host] = PriorityLimiter(self.per_domain_limit)
+        return self._host_limiters[host]
+
+    def _retry_delay(self, attempt, retry_after=None):
+        """Backoff exponentiel avec jitter (ou délai imposé par Retry-After)"""
+        if retry_after is not None:
+            return retry_after
+        return self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+    def _after_response(self, host, status, latency, size, headers):
+        """Met à jour stats et throttle; retourne le délai avant nouvel essai ou None"""
+        stats = self.stats[host]
+        throttle = self._throttles[host]
+        stats.record(status, latency, size)
+        if status in THROTTLE_STATUSES:
+            stats.throttled += 1
+            retry_after = retry_after_seconds(headers.get('Retry-After'))
+            throttle.slow_down(retry_after)
+            return retry_after
+        if status < 400:
+            throttle.speed_up()
+        return None
+
+    async def fetch(self, url, priority=0):
+        """
+        Retourne le HTML de la page, ou None en cas d'erreur définitive.
+
+        Args:
+            url (str): URL de la page
+            priority (int): Priorité dans les files d'attente (plus petite d'abord)
+        """
+        host = self._host(url)
+        stats = self.stats[host]
+        async with self._host_limiter(host).slot(priority):
+            for attempt in range(self.max_retries + 1):
+                await asyncio.sleep(self._throttles[host].reserve())
+                start = time.monotonic()
+                try:
+                    async with (self.limiter.slot(priority) if self.limiter is not None
+                                else contextlib.nullcontext()):
+                        response = await self._client.get(url)
+                except httpx.HTTPError as e:
+                    stats.record('error', time.monotonic() - start)
+                    error = e
+                    retry_after = None
+                else:
+                    retry_after = self._after_response(
+                        host, response.status_code, time.monotonic() - start,
+                        len(response.content), response.headers)
+                    if response.status_code < 400:
+                        return self._archive(url, response.text)
+                    error = f"HTTP {response.status_code}"
+                    if response.status_code not in RETRY_STATUSES:
+                        break
+                if attempt < self.max_retries:
+                    stats.retries += 1
+                    await asyncio.sleep(self._retry_delay(attempt, retry_after))
+        stats.errors += 1
+        print(f"❌ Error loading {url}: {error}")
+        return None
+
+    async def fetch_all(self, urls, priority=0):
+        """Télécharge plusieurs pages en parallèle; résultats dans l'ordre des URLs"""
+        return await asyncio.gather(*(self.fetch(url, priority) for url in urls))
+
+    def fetch_sync(self, url):
+        """Version synchrone de fetch (même politique de nouveaux essais)"""
+        host = self._host(url)
+        stats = self.stats[host]
+        for attempt in range(self.max_retries + 1):
+            time.sleep(self._throttles[host].reserve())
+            start = time.monotonic()
+            try:
+                response = self.session.get(url, timeout=self.timeout)
+            except requests.RequestException as e:
+                stats.record('error', time.monotonic() - start)
+                error = e
+                retry_after = None
+            else:
+                retry_after = self._after_response(
+                    host, response.status_code, time.monotonic() - start,
+                    len(response.content), response.headers)
+                if response.status_code < 400:
+                    return self._archive(url, response.text)
+                error = f"HTTP {response.status_code}"
+                if response.status_code not in RETRY_STATUSES:
+                    break
+            if attempt < self.max_retries:
+                stats.retries += 1
+                time.sleep(self._retry_delay(attempt, retry_after))
+        stats.errors += 1
+        print(f"❌ Error loading {url}: {error}")
+        return None
+
+    def report(self):
+        """Affiche les compteurs par hôte"""
+        print(f"\n{'Hôte':28s} {'requêtes':>9s} {'essais+':>8s} {'429/503':>8s} {'échecs':>7s} "
+              f"{'moy ms':>8s} {'p95 ms':>8s} {'Mo':>7s} {'interv. s':>9s}")
+        for host, stats in self.stats.items():
+            mean = sum(stats.latencies) / len(stats.latencies) if stats.latencies else 0.0
+            print(f"{host:28s} {stats.requests:9d} {stats.retries:8d} {stats.throttled:8d} "
+                  f"{stats.errors:7d} {mean * 1000:8.1f} {stats.percentile(0.95) * 1000:8.1f} "
+                  f"{stats.bytes / 1e6:7.1f} {self._throttles[host].interval:9.2f}")
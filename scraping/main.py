@@ -1,25 +1,17 @@
-from .scraper_tayaratn import TayaraScraper
-from .scraper_mubawab import MubawabScraper
+import argparse
+
+from .scheduler import DEFAULT_CONFIG, CrawlScheduler, load_config
 
 if __name__ == "__main__":
-    
-    # URLs
-    tayara_urls = [
-        "https://www.tayara.tn/listing/c/immobilier",
-        "https://www.tayara.tn/listing/c/immoneuf",
-    ]
-    
-    mubawab_urls = [
-        "https://www.mubawab.tn/fr/sc/appartements-a-vendre",
-        "https://www.mubawab.tn/fr/sc/appartements-a-louer"
-    ]
-    
-    # Scraping tayaratn
-    # tayara_scraper = TayaraScraper(tayara_urls, 'tayaratn_data.csv')
-    # tayara_scraper.run()
-    
-    # Scraping mubawab
-    mubawab_scraper = MubawabScraper(mubawab_urls, 'mubawab_data.csv')
-    mubawab_scraper.run()
-    
-    
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scraping des annonces immobilières")
+    parser.add_argument("--config", default=DEFAULT_CONFIG,
+                        help="Sites, catégories et budgets de crawl (JSON)")
+    parser.add_argument("--site", action="append",
+                        help="Site à crawler (répétable, défaut: tous les sites activés)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Reprendre un crawl interrompu depuis son checkpoint")
+    args = parser.parse_args()
+
+    # Tous les sites en même temps: durée du site le plus lent
+    scheduler = CrawlScheduler(load_config(args.config), sites=args.site, resume=args.resume)
+    scheduler.run()
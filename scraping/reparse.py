@@ -0,0 +1,38 @@
+import argparse
+from datetime import datetime
+
+from .archive import DEFAULT_ARCHIVE_DIR
+from .scheduler import DEFAULT_CONFIG, SCRAPERS, load_config
+
+# ============================================================
+# Re-parse hors ligne de l'archive des pages brutes
+# ============================================================
+# Rejoue le scraping d'un site à partir des pages archivées (aucune
+# requête réseau): utile après une correction des extracteurs ou l'ajout
+# d'un champ, sans re-télécharger les annonces.
+#
+#   python -m scraping.reparse --site tayara --output tayaratn_data.csv
+#   python -m scraping.reparse --site mubawab --as-of 2025-01-31
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-parse des pages archivées")
+    parser.add_argument("--site", choices=sorted(SCRAPERS), required=True)
+    parser.add_argument("--archive", default=DEFAULT_ARCHIVE_DIR, help="Dossier de l'archive")
+    parser.add_argument("--output", help="CSV de sortie (défaut: <site>_reparsed.csv)")
+    parser.add_argument("--as-of", help="Version des pages à cette date (YYYY-MM-DD[THH:MM])")
+    parser.add_argument("--url", action="append",
+                        help="URL de catégorie (répétable, défaut: celles de la configuration)")
+    parser.add_argument("--config", default=DEFAULT_CONFIG, help="Configuration des sites (JSON)")
+    args = parser.parse_args()
+
+    scraper_cls = SCRAPERS[args.site]
+    urls = load_config(args.config)["sites"][args.site]["urls"]
+    as_of = datetime.fromisoformat(args.as_of).timestamp() if args.as_of else None
+    scraper = scraper_cls(args.url or urls, args.output or f"{args.site}_reparsed.csv",
+                          archive_path=args.archive, offline=True, archive_as_of=as_of)
+    scraper.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .archive import DEFAULT_ARCHIVE_DIR, RawArchive
+from .base_scraper import init_parse_worker
+from .fetcher import PriorityLimiter
+from .scraper_mubawab import MubawabScraper
+from .scraper_tayaratn import TayaraScraper
+
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "crawl_config.json")
+
+SCRAPERS = {
+    "tayara": TayaraScraper,
+    "mubawab": MubawabScraper,
+}
+
+# Réglages d'un site transmis tels quels au constructeur du scraper
+SITE_OPTIONS = ("concurrency", "min_interval", "max_retries", "index_path",
+                "refresh_after_days", "queue_size", "base_url")
+
+
+def load_config(path=DEFAULT_CONFIG):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class CrawlScheduler:
+    """
+    Crawl de tous les sites configurés en même temps, dans une seule boucle
+    asyncio.
+
+    - budget de politesse par site: requêtes simultanées et intervalle
+      minimal par domaine, nouveaux essais
+    - limite globale de requêtes simultanées partagée entre les sites,
+      servie par priorité: premières pages (annonces récentes) d'abord
+    - un seul pool de processus de parsing et une seule archive des pages
+      brutes (archive_path, null = pas d'archive) pour tous les sites
+    """
+
+    def __init__(self, config, sites=None, resume=False):
+        """
+        Args:
+            config (dict): Configuration (voir crawl_config.json)
+            sites (list): Sites à crawler (None = tous les sites activés)
+            resume (bool): Reprendre les crawls interrompus depuis leur checkpoint
+        """
+        self.global_concurrency = config.get("global_concurrency")
+        workers = config.get("parse_workers")
+        self.parse_workers = os.cpu_count() if workers is None else workers
+        archive_path = config.get("archive_path", DEFAULT_ARCHIVE_DIR)
+        self.archive = RawArchive(archive_path) if archive_path else None
+        self.scrapers = {}
+        for name, site in config["sites"].items():
+            if sites is not None and name not in sites:
+                continue
+            if sites is None and not site.get("enabled", True):
+                continue
+            options = {key: site[key] for key in SITE_OPTIONS if key in site}
+            self.scrapers[name] = SCRAPERS[site.get("scraper", name)](
+                site["urls"], site["output"], resume=resume, archive_path=None,
+                parse_workers=self.parse_workers, **options)
+            self.scrapers[name].fetcher.archive = self.archive
+        self.failures = {}
+
+    async def _crawl_all(self):
+        limiter = PriorityLimiter(self.global_concurrency) if self.global_concurrency else None
+        pool = (ProcessPoolExecutor(self.parse_workers, initializer=init_parse_worker)
+                if self.parse_workers > 0 else None)
+        for scraper in self.scrapers.values():
+            scraper.fetcher.limiter = limiter
+        try:
+            results = await asyncio.gather(
+                *(scraper._crawl(scraper.urls, pool) for scraper in self.scrapers.values()),
+                return_exceptions=True)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+        # Un site en échec n'interrompt pas les autres
+        for name, result in zip(self.scrapers, results):
+            if isinstance(result, Exception):
+                self.failures[name] = result
+
+    def run(self):
+        """
+        Crawl complet de tous les sites.
+
+        Returns:
+            dict: Nombre de biens écrits par site (None si le site a échoué)
+        """
+        print(f"=== SCRAPING START: {', '.join(self.scrapers)} ===\n")
+        start = time.perf_counter()
+        try:
+            asyncio.run(self._crawl_all())
+        except KeyboardInterrupt:
+            for scraper in self.scrapers.values():
+                scraper.interrupted()
+            raise
+        finally:
+            for scraper in self.scrapers.values():
+                scraper.close()
+            if self.archive is not None:
+                self.archive.close()
+
+        counts = {}
+        for name, scraper in self.scrapers.items():
+            if name in self.failures:
+                print(f"\n❌ {name}: {self.failures[name]!r} (relancer avec --resume)")
+                counts[name] = None
+            else:
+                counts[name] = scraper.finish()
+        print(f"\n=== {sum(c or 0 for c in counts.values())} biens en "
+              f"{time.perf_counter() - start:.1f} s ===")
+        return counts
@@ -1,16 +1,47 @@
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
+import soupsieve as sv
 from scraping.base_scraper import BaseScraper
-from .utils import normalize_price, extract_number
+from .utils import normalize_price, extract_number, class_strainer
+
+# Sélecteurs CSS compilés une seule fois
+TITLE = sv.compile("h2.listingTit a")
+PRICE = sv.compile(".priceTag")
+LOCATION = sv.compile(".listingH3")
+FIRST_PICTURE = sv.compile("div.adSlider img.firstPicture")
+SLIDER_PICTURE = sv.compile("div.adSlider img")
+DETAIL_FEATURES = sv.compile(".adDetailFeature")
+CARD_FINGERPRINT = sv.compile("h2.listingTit a, .priceTag, .listingH3, .adDetailFeature")
+PROPERTY_TYPE = sv.compile(".adMainFeatureContent .adMainFeatureContentLabel:-soup-contains('Type de bien') + .adMainFeatureContentValue")
+FEATURES = sv.compile(".adFeature")
+EXTRA_FEATURES = sv.compile(".extraFeatures")
+MAIN_FEATURES = sv.compile(".adMainFeature")
+MAIN_FEATURE_LABEL = sv.compile(".adMainFeatureContentLabel")
+MAIN_FEATURE_VALUE = sv.compile(".adMainFeatureContentValue")
+DESCRIPTION = sv.compile(".blockProp p")
 
 class MubawabScraper(BaseScraper):
     """Scraper complet pour mubawab.tn (listings + pages internes)"""
 
+    # Page liste: boîtes d'annonces; page interne: blocs de caractéristiques et description
+    LIST_STRAINER = class_strainer("listingBox", name="div")
+    DETAIL_STRAINER = class_strainer("adDetailFeature", "adMainFeature", "adMainFeatureContent",
+                                     "adFeature", "blockProp")
+    BASE_URL = "https://www.mubawab.tn"
+
     def find_house_cards(self, soup):
         """Trouve toutes les annonces dans la page"""
         return soup.find_all("div", class_="listingBox")
+
+    def get_house_url(self, house):
+        """URL de la page interne d'une annonce"""
+        return house.get("linkref")
     
+    def card_fingerprint(self, house):
+        """Titre, prix, localisation et caractéristiques de la carte"""
+        parts = [tag.get_text(strip=True) for tag in
+                 CARD_FINGERPRINT.select(house)]
+        return "|".join(parts)
+
     def _get_transaction_type_from_url(self, scraped_url):
         """Détermine le type de transaction depuis l'URL"""
         if "appartements-a-vendre" in scraped_url.lower() or "a-vendre" in scraped_url.lower():
@@ -22,7 +53,7 @@ class MubawabScraper(BaseScraper):
     def extract_house_data(self, house, scraped_url=None):
         """Extrait les données d'une annonce"""
         # URL listing
-        url = house.get("linkref")
+        url = self.get_house_url(house)
         
         # Transaction type depuis l'URL principale
         if scraped_url:
@@ -31,22 +62,22 @@ class MubawabScraper(BaseScraper):
             transaction_type = None
 
         # Titre
-        title_tag = house.select_one("h2.listingTit a")
+        title_tag = TITLE.select_one(house)
         title = title_tag.get_text(strip=True) if title_tag else None
 
         # Prix
-        price_tag = house.select_one(".priceTag")
+        price_tag = PRICE.select_one(house)
         price = normalize_price(price_tag.get_text(strip=True)) if price_tag else None
 
         # Localisation
-        location_tag = house.select_one(".listingH3")
+        location_tag = LOCATION.select_one(house)
         location = location_tag.get_text(strip=True).replace("\n", " ") if location_tag else None
 
         # Image principale
-        img_tag = house.select_one("div.adSlider img.firstPicture")
+        img_tag = FIRST_PICTURE.select_one(house)
         if not img_tag:
             # fallback: première image du slider
-            img_tag = house.select_one("div.adSlider img")
+            img_tag = SLIDER_PICTURE.select_one(house)
         if not img_tag:
             # fallback ultime: n'importe quelle image dans la box
             img_tag = house.find("img")
@@ -88,7 +119,7 @@ class MubawabScraper(BaseScraper):
         }
         
         # Chercher dans adDetails
-        ad_details = house.select(".adDetailFeature")
+        ad_details = DETAIL_FEATURES.select(house)
         for detail in ad_details:
             text = detail.get_text(strip=True)
             
@@ -113,7 +144,7 @@ class MubawabScraper(BaseScraper):
         }
 
         # === Détails principaux (surface, chambres, salles de bain) ===
-        ad_details = soup.select(".adDetailFeature")
+        ad_details = DETAIL_FEATURES.select(soup)
         for detail in ad_details:
             text = detail.get_text(strip=True)
             
@@ -126,15 +157,15 @@ class MubawabScraper(BaseScraper):
 
         # === Caractéristiques générales ===
         # Type de bien
-        type_element = soup.select_one(".adMainFeatureContent .adMainFeatureContentLabel:-soup-contains('Type de bien') + .adMainFeatureContentValue")
+        type_element = PROPERTY_TYPE.select_one(soup)
         if type_element:
             data["type"] = type_element.get_text(strip=True)
 
         # === Options/Équipements ===
         # Chercher les icônes de caractéristiques
-        feature_divs = soup.select(".adFeature")
+        feature_divs = FEATURES.select(soup)
         for feature in feature_divs:
-            if feature.select_one(".extraFeatures"):
+            if EXTRA_FEATURES.select_one(feature):
                 continue
             
             text = feature.get_text(strip=True)
@@ -142,10 +173,10 @@ class MubawabScraper(BaseScraper):
                 data["options"].append(text)
 
         # Aussi chercher dans les adMainFeature (État, Étage, etc.)
-        main_features = soup.select(".adMainFeature")
+        main_features = MAIN_FEATURES.select(soup)
         for feature in main_features:
-            label = feature.select_one(".adMainFeatureContentLabel")
-            value = feature.select_one(".adMainFeatureContentValue")
+            label = MAIN_FEATURE_LABEL.select_one(feature)
+            value = MAIN_FEATURE_VALUE.select_one(feature)
             if label and value:
                 label_text = label.get_text(strip=True)
                 value_text = value.get_text(strip=True)
@@ -154,7 +185,7 @@ class MubawabScraper(BaseScraper):
                     data["options"].append(f"{label_text}: {value_text}")
 
         # === Description ===
-        desc_block = soup.select_one(".blockProp p")
+        desc_block = DESCRIPTION.select_one(soup)
         if desc_block:
             data["description"] = desc_block.get_text(" ", strip=True)
 
@@ -165,12 +196,9 @@ class MubawabScraper(BaseScraper):
         if not url:
             return {}
 
-        try:
-            resp = requests.get(url, timeout=10)
-            resp.raise_for_status()
-        except Exception as e:
-            print(f"⚠️  Erreur HTTP {url}: {e}")
+        html = self.fetch_html(url)
+        if html is None:
             return {}
 
-        soup = BeautifulSoup(resp.text, "html.parser")
+        soup = self.parse_html(html, self.DETAIL_STRAINER)
         return self.parse_internal_page(soup)
\ No newline at end of file
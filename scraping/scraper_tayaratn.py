@@ -1,22 +1,50 @@
 import re
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
+import soupsieve as sv
+from bs4 import SoupStrainer
 from scraping.base_scraper import BaseScraper
-from .utils import normalize_price, parse_relative_date, extract_number
+from .utils import normalize_price, parse_relative_date, extract_number, class_strainer
+
+# Sélecteurs CSS compilés une seule fois
+INFO_SPANS = sv.compile("div.flex.items-center.space-x-1 span")
+AGENCY_SPAN = sv.compile("div.flex.flex-col.items-end span")
+CRITERIA_ITEMS = sv.compile("ul li")
+CRITERIA_LABEL = sv.compile("span.text-gray-600\\/80")
+CRITERIA_VALUE = sv.compile("span.text-gray-700\\/80")
+DESCRIPTION = sv.compile("p.whitespace-pre-line")
 
 class TayaraScraper(BaseScraper):
     """Scraper complet pour tayara.tn (listings + pages internes)"""
 
+    # Page liste: cartes d'annonces; page interne: listes de critères et paragraphes
+    LIST_STRAINER = class_strainer("mx-0", name="article")
+    DETAIL_STRAINER = SoupStrainer(["ul", "li", "p"])
+    BASE_URL = "https://www.tayara.tn"
+
     def find_house_cards(self, soup):
         """Trouve tous les articles immobiliers dans la page"""
         return soup.find_all("article", class_="mx-0")
 
-    def extract_house_data(self, house):
+    def get_house_url(self, house):
+        """URL de la page interne d'une annonce"""
+        link_tag = house.find("a", href=True)
+        return f"{self.base_url}{link_tag['href']}" if link_tag else None
+
+    def card_fingerprint(self, house):
+        """Titre, prix et image de la carte (sans la date relative, qui change chaque jour)"""
+        title_tag = house.find("h2", class_="card-title")
+        price_tag = house.find("data", {"value": True})
+        img_tag = house.find("img", src=True)
+        return "|".join([
+            title_tag.get_text(strip=True) if title_tag else "",
+            price_tag.get("value") if price_tag else "",
+            img_tag["src"] if img_tag else "",
+        ])
+
+    def extract_house_data(self, house, scraped_url=None):
         """Extrait les données d'une annonce (page liste + page interne)"""
         # URL listing
-        link_tag = house.find("a", href=True)
-        url = f"https://www.tayara.tn{link_tag['href']}" if link_tag else None
+        url = self.get_house_url(house)
 
         # Titre
         title_tag = house.find("h2", class_="card-title")
@@ -27,13 +55,13 @@ class TayaraScraper(BaseScraper):
         price = normalize_price(price_tag.get("value")) if price_tag else None
 
         # Type de bien (peu fiable en page liste)
-        type_tag = house.select_one("div.flex.items-center.space-x-1 span")
+        type_tag = INFO_SPANS.select_one(house)
         property_type = type_tag.get_text(strip=True) if type_tag else None
 
         # Localisation + date
         location = None
         date_posted = None
-        loc_tags = house.select("div.flex.items-center.space-x-1 span")
+        loc_tags = INFO_SPANS.select(house)
         if loc_tags and len(loc_tags) >= 2:
             text = loc_tags[-1].get_text(strip=True)
             parts = text.split(",")
@@ -46,7 +74,7 @@ class TayaraScraper(BaseScraper):
         image_url = img_tag["src"] if img_tag else None
 
         # Agence
-        agency_tag = house.select_one("div.flex.flex-col.items-end span")
+        agency_tag = AGENCY_SPAN.select_one(house)
         agency = agency_tag.get_text(strip=True) if agency_tag else None
 
         # Date de scraping
@@ -88,7 +116,7 @@ class TayaraScraper(BaseScraper):
         }
 
         # Les critères sont dans des <li> avec structure complexe de spans
-        li_elements = soup.select("ul li")
+        li_elements = CRITERIA_ITEMS.select(soup)
         
         if not li_elements:
             # Fallback: chercher dans toute la page
@@ -96,8 +124,8 @@ class TayaraScraper(BaseScraper):
         
         for li in li_elements:
             # Cible UNIQUEMENT les spans avec classes spécifiques (évite span parent)
-            label_span = li.select_one("span.text-gray-600\\/80")
-            value_span = li.select_one("span.text-gray-700\\/80")
+            label_span = CRITERIA_LABEL.select_one(li)
+            value_span = CRITERIA_VALUE.select_one(li)
             
             if not label_span or not value_span:
                 continue
@@ -134,20 +162,17 @@ class TayaraScraper(BaseScraper):
         if not url:
             return {}
         
-        try:
-            resp = requests.get(url, timeout=10)
-            resp.raise_for_status()
-        except Exception as e:
-            print(f"  ⚠️  Erreur HTTP {url}: {e}")
+        html = self.fetch_html(url)
+        if html is None:
             return {}
 
-        soup = BeautifulSoup(resp.text, "html.parser")
+        soup = self.parse_html(html, self.DETAIL_STRAINER)
         
         # Parse les critères
         data = self.parse_criteria(soup)
 
         # Description - avec multiples fallbacks
-        desc_tag = soup.select_one("p.whitespace-pre-line")
+        desc_tag = DESCRIPTION.select_one(soup)
         if not desc_tag:
             # Fallback 1: chercher p avec text-sm
             desc_tag = soup.find("p", class_=lambda x: x and "text-sm" in x)
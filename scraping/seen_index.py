@@ -0,0 +1,79 @@
+import hashlib
+import sqlite3
+import time
+
+
+def content_hash(text):
+    """Empreinte courte (SHA-256 tronqué) d'un contenu texte"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+class SeenIndex:
+    """
+    Index persistant (SQLite) des annonces déjà scrapées, par URL.
+
+    Pour chaque annonce: empreinte de la carte en page liste (détecte un
+    changement de prix, titre...), empreinte de la page interne, dates de
+    première vue, dernière vue et dernier téléchargement.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS listings (
+                url TEXT PRIMARY KEY,
+                card_hash TEXT,
+                content_hash TEXT,
+                first_seen REAL,
+                last_seen REAL,
+                last_fetched REAL
+            )
+        """)
+        self.conn.commit()
+
+    def lookup(self, urls):
+        """Retourne {url: (card_hash, last_fetched)} pour les URLs déjà connues"""
+        known = {}
+        urls = list(urls)
+        # Par paquets: limite du nombre de paramètres SQLite
+        for i in range(0, len(urls), 500):
+            chunk = urls[i:i + 500]
+            rows = self.conn.execute(
+                f"SELECT url, card_hash, last_fetched FROM listings "
+                f"WHERE url IN ({','.join('?' * len(chunk))})", chunk)
+            for url, card_hash, last_fetched in rows:
+                known[url] = (card_hash, last_fetched)
+        return known
+
+    def touch(self, urls):
+        """Met à jour la date de dernière vue d'annonces inchangées"""
+        now = time.time()
+        self.conn.executemany("UPDATE listings SET last_seen = ? WHERE url = ?",
+                              [(now, url) for url in urls])
+        self.conn.commit()
+
+    def mark_fetched(self, rows):
+        """
+        Enregistre des annonces téléchargées.
+
+        Args:
+            rows (list): Tuples (url, card_hash, content_hash)
+        """
+        now = time.time()
+        self.conn.executemany("""
+            INSERT INTO listings (url, card_hash, content_hash, first_seen, last_seen, last_fetched)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                card_hash = excluded.card_hash,
+                content_hash = excluded.content_hash,
+                last_seen = excluded.last_seen,
+                last_fetched = excluded.last_fetched
+        """, [(url, card, content, now, now, now) for url, card, content in rows])
+        self.conn.commit()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM listings").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
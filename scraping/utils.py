@@ -1,17 +1,17 @@
-import pandas as pd
 import re
+from bs4 import SoupStrainer
 from datetime import datetime, timedelta
 
-def save_to_csv(products, filename):
-    df = pd.DataFrame(products)
-    df.to_csv(filename, index=False, encoding='utf-8-sig')
-    print(f"\nDonnées sauvegardées dans {filename}")
-    return df
+# Expressions compilées une seule fois (helpers appelés pour chaque bien)
+PRICE_JUNK = re.compile(r"[^\d,\.]")
+RELATIVE_DATE_EN = re.compile(r"(\d+)\s+(minute|minutes|hour|hours|day|days|month|months)\s+ago")
+RELATIVE_DATE_FR = re.compile(r"il y a (\d+)\s*(minute|minutes|heure|heures|jour|jours|mois)")
+DIGITS = re.compile(r"\d+")
 
 def normalize_price(price_str):
     if not price_str:
         return None
-    cleaned = re.sub(r"[^\d,\.]", "", price_str)
+    cleaned = PRICE_JUNK.sub("", price_str)
     if cleaned.count(",") == 1 and cleaned.count(".") > 1:
         cleaned = cleaned.replace(".", "").replace(",", ".")
     elif cleaned.count(",") == 1 and cleaned.count(".") == 0:
@@ -20,9 +20,6 @@ def normalize_price(price_str):
         return float(cleaned)
     except:
         return None
-    
-from datetime import datetime, timedelta
-import re
 
 def parse_relative_date(text):
     """Convert relative date in English or French to YYYY-MM-DD"""
@@ -30,7 +27,7 @@ def parse_relative_date(text):
     text = text.lower().strip()
     
     # English
-    match = re.search(r"(\d+)\s+(minute|minutes|hour|hours|day|days|month|months)\s+ago", text)
+    match = RELATIVE_DATE_EN.search(text)
     if match:
         value, unit = int(match.group(1)), match.group(2)
         if unit.startswith("minute"):
@@ -43,7 +40,7 @@ def parse_relative_date(text):
             return (now - timedelta(days=30*value)).strftime("%Y-%m-%d")
     
     # French
-    match_fr = re.search(r"il y a (\d+)\s*(minute|minutes|heure|heures|jour|jours|mois)", text)
+    match_fr = RELATIVE_DATE_FR.search(text)
     if match_fr:
         value, unit = int(match_fr.group(1)), match_fr.group(2)
         if unit.startswith("minute"):
@@ -62,5 +59,16 @@ def extract_number(text):
     """Extrait le premier nombre trouvé dans une chaîne"""
     if not text:
         return None
-    numbers = re.findall(r"\d+", str(text).replace(",", "").replace(" ", ""))
-    return int(numbers[0]) if numbers else None
+    match = DIGITS.search(str(text).replace(",", "").replace(" ", ""))
+    return int(match.group()) if match else None
+
+
+def class_strainer(*classes, name=None):
+    """
+    SoupStrainer des éléments portant l'une des classes CSS données.
+
+    Pendant le parsing, l'attribut class n'est pas encore découpé en
+    classes: il est testé par expression régulière pour accepter class="a b".
+    """
+    pattern = re.compile(r"(?:^|\s)(?:%s)(?:\s|$)" % "|".join(map(re.escape, classes)))
+    return SoupStrainer(name, class_=pattern)
@@ -0,0 +1,118 @@
+import json
+import os
+
+import pandas as pd
+
+
+class RecordWriter:
+    """
+    Écriture en continu des biens scrapés (JSON Lines, un bien par ligne).
+
+    Les biens sont écrits par paquets (une page liste) puis synchronisés
+    sur disque: un arrêt brutal ne perd au plus que la page en cours, et la
+    mémoire ne dépend pas de la taille du crawl.
+    """
+
+    def __init__(self, path, resume_offset=None, resume_count=0):
+        """
+        Args:
+            path (str): Fichier JSONL
+            resume_offset (int): Reprise: taille du fichier au dernier checkpoint
+                (les lignes écrites après sont supprimées); None = nouveau fichier
+            resume_count (int): Reprise: nombre de biens déjà écrits
+        """
+        self.path = path
+        if resume_offset is None:
+            self.file = open(path, "w", encoding="utf-8")
+            self.count = 0
+        else:
+            if not os.path.exists(path) or os.path.getsize(path) < resume_offset:
+                raise ValueError(f"{path} is shorter than its checkpoint, cannot resume")
+            self.file = open(path, "a", encoding="utf-8")
+            self.file.truncate(resume_offset)
+            self.count = resume_count
+
+    def write_many(self, records):
+        """Écrit un paquet de biens et le synchronise sur disque"""
+        if not records:
+            return
+        self.file.write("".join(json.dumps(record, ensure_ascii=False) + "\n"
+                                for record in records))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.count += len(records)
+
+    @property
+    def offset(self):
+        """Taille du fichier (octets) après le dernier paquet"""
+        return os.fstat(self.file.fileno()).st_size
+
+    def close(self):
+        self.file.close()
+
+
+class Checkpoint:
+    """
+    Position du crawl: catégories terminées, prochaine page de chaque
+    catégorie en cours, taille du fichier de sortie. Réécrite atomiquement
+    après chaque page.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.state = {"done": [], "pages": {}, "offset": 0, "records": 0}
+
+    def load(self):
+        """Charge le checkpoint existant; retourne False s'il n'y en a pas"""
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, encoding="utf-8") as f:
+            self.state.update(json.load(f))
+        return True
+
+    def save(self, **changes):
+        self.state.update(changes)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.path)
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def jsonl_to_csv(jsonl_path, csv_path, chunksize=5000):
+    """
+    Convertit le JSONL d'un crawl en CSV, par paquets (mémoire constante).
+
+    Returns:
+        int: Nombre de biens exportés
+    """
+    columns = None
+    total = 0
+
+    def write(chunk):
+        nonlocal columns
+        df = pd.DataFrame(chunk)
+        if columns is None:
+            columns = list(df.columns)
+            df.to_csv(csv_path, index=False, encoding="utf-8-sig")
+        else:
+            df.reindex(columns=columns).to_csv(csv_path, mode="a", header=False,
+                                               index=False, encoding="utf-8")
+
+    with open(jsonl_path, encoding="utf-8") as f:
+        chunk = []
+        for line in f:
+            chunk.append(json.loads(line))
+            if len(chunk) >= chunksize:
+                write(chunk)
+                total += len(chunk)
+                chunk = []
+        if chunk or columns is None:
+            write(chunk)
+            total += len(chunk)
+
+    print(f"\nDonnées sauvegardées dans {csv_path}")
+    return total